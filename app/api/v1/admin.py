@@ -1,30 +1,52 @@
 """Admin API endpoints."""
-from fastapi import APIRouter, Depends, Query, Request
+import shutil
+import tempfile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Query, Request, UploadFile
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
+from pydantic import ValidationError
 from app.schemas.admin import (
     AdminLoginRequest,
     AdminUserResponse,
     AdjustPointsRequest,
     UpdateUserRequest,
-    AuditLogResponse
+    AuditLogResponse,
+    JobStatusResponse,
 )
 from app.schemas.user import UserProfileResponse
 from app.schemas.order import OrderResponse
-from app.schemas.benefit import BenefitResponse, CreateBenefitRequest, DistributeBenefitRequest
+from app.schemas.benefit import (
+    BenefitResponse, BenefitDistributionResponse, CreateBenefitRequest, DistributeBenefitRequest, BenefitCampaignSegment,
+)
 from app.schemas.common import SuccessResponse, ErrorResponse
 from app.utils.pagination import PaginatedResponse
 from app.middleware.auth import get_current_admin, security
 from app.models.admin import AdminUser
 from app.models.order import OrderStatus
+from app.models.user import MemberLevel
 from app.services.admin_service import AdminService
 from app.services.point_service import PointService
 from app.services.benefit_service import BenefitService
-from app.dependencies import get_admin_service, get_point_service, get_benefit_service
+from app.services.member_import_service import detect_format, run_import_job, JOB_KIND as IMPORT_JOB_KIND
+from app.services.point_bulk_adjust_service import file_batch_key, run_bulk_adjust_job, JOB_KIND as BULK_ADJUST_JOB_KIND
+from app.services.level_entitlement_service import drain_level_changes
+from app.services.benefit_campaign_service import (
+    BenefitCampaignService, run_campaign_job, JOB_KIND as CAMPAIGN_JOB_KIND,
+)
+from app.core.job_store import job_store
+from app.services.order_settlement_service import run_settlement_job, JOB_KIND as SETTLEMENT_JOB_KIND
+from app.dependencies import (
+    get_admin_service, get_point_service, get_benefit_service,
+    get_benefit_campaign_service,
+)
 from app.utils.timezone_utils import to_beijing_time
 from app.utils.data_masking import mask_email, mask_id_card_last_four
 from app.core.error_codes import ErrorCode, BusinessException
 from app.config import settings
+from app.db.query_stats import query_budget
+from app.middleware.idempotency import idempotent
+from app.repositories.order_repository import OrderRepository
+from app.utils.export import streaming_export
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -52,7 +74,7 @@ async def admin_login(
     }
 
 
-@router.get("/users", response_model=PaginatedResponse[UserProfileResponse])
+@router.get("/users", response_model=PaginatedResponse[UserProfileResponse], dependencies=[Depends(query_budget(6))])
 async def list_users(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -96,10 +118,11 @@ async def list_users(
     return PaginatedResponse.create(items, total, page, page_size)
 
 
-@router.patch("/users/{user_id}", response_model=SuccessResponse)
+@router.patch("/users/{user_id}", response_model=SuccessResponse, dependencies=[Depends(query_budget(8))])
 async def update_user(
     user_id: int,
     update_request: UpdateUserRequest,
+    background_tasks: BackgroundTasks,
     request: Request = None,
     current_admin: AdminUser = Depends(get_current_admin),
     admin_service: AdminService = Depends(get_admin_service),
@@ -110,6 +133,9 @@ async def update_user(
         raise BusinessException(ErrorCode.PERMISSION_DENIED)
 
     user = admin_service.update_user(user_id, update_request)
+    if update_request.member_level is not None:
+        # Newly entitled benefits go out after the response is sent.
+        background_tasks.add_task(drain_level_changes)
 
     # Log action
     admin_service.log_action(
@@ -124,7 +150,7 @@ async def update_user(
     return SuccessResponse(message="用户更新成功")
 
 
-@router.post("/users/{user_id}/lock", response_model=SuccessResponse)
+@router.post("/users/{user_id}/lock", response_model=SuccessResponse, dependencies=[Depends(query_budget(8))])
 async def lock_user(
     user_id: int,
     reason: str,
@@ -152,7 +178,50 @@ async def lock_user(
     return SuccessResponse(message="用户已锁定")
 
 
-@router.post("/points/adjust", response_model=SuccessResponse)
+@router.post("/users/import", response_model=JobStatusResponse, status_code=202)
+async def import_members(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    request: Request = None,
+    current_admin: AdminUser = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    """
+    Queue a bulk member import from a CSV or NDJSON upload (admin).
+
+    Poll GET /admin/jobs/{id} for per-chunk progress and row errors.
+    """
+    # Check permission
+    if not admin_service.check_permission(current_admin.id, "users.import"):
+        raise BusinessException(ErrorCode.PERMISSION_DENIED)
+
+    fmt = format or detect_format(file.filename)
+
+    # Spool the upload to disk; the request's file is closed once the response is sent.
+    with tempfile.NamedTemporaryFile(prefix="members_import_", suffix=f".{fmt}", delete=False) as spool:
+        shutil.copyfileobj(file.file, spool)
+
+    job = job_store.create(
+        IMPORT_JOB_KIND,
+        created_by=current_admin.id,
+        permission="users.import",
+        params={"filename": file.filename, "format": fmt},
+    )
+    background_tasks.add_task(
+        run_import_job,
+        job["id"],
+        spool.name,
+        fmt,
+        file.filename,
+        current_admin.id,
+        getattr(request.state, 'trace_id', None),
+    )
+
+    return JobStatusResponse(**job)
+
+
+@router.post("/points/adjust", response_model=SuccessResponse, dependencies=[Depends(query_budget(8)), Depends(idempotent())])
 async def adjust_points(
     adjust_request: AdjustPointsRequest,
     request: Request = None,
@@ -186,7 +255,71 @@ async def adjust_points(
     return SuccessResponse(message="积分调整成功")
 
 
-@router.post("/benefits", response_model=BenefitResponse)
+@router.post("/points/bulk-adjust", response_model=JobStatusResponse, status_code=202)
+async def bulk_adjust_points(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    reason: str = Form(..., max_length=500),
+    batch_key: Optional[str] = Form(None, max_length=64, pattern=r"^[A-Za-z0-9_.-]+$"),
+    request: Request = None,
+    current_admin: AdminUser = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    """
+    Queue a bulk point adjustment from a CSV upload (admin).
+
+    CSV columns: user_id, points, optional reason. Reusing a batch_key never
+    applies the same file line twice; without one the key is derived from the
+    file content, so uploading the same file again is a no-op. Poll
+    GET /admin/jobs/{id} for progress.
+    """
+    # Check permission
+    if not admin_service.check_permission(current_admin.id, "points.bulk_adjust"):
+        raise BusinessException(ErrorCode.PERMISSION_DENIED)
+
+    # Spool the upload to disk; the request's file is closed once the response is sent.
+    with tempfile.NamedTemporaryFile(prefix="points_bulk_adjust_", suffix=".csv", delete=False) as spool:
+        shutil.copyfileobj(file.file, spool)
+    batch_key = batch_key or file_batch_key(spool.name)
+
+    job = job_store.create(
+        BULK_ADJUST_JOB_KIND,
+        created_by=current_admin.id,
+        permission="points.bulk_adjust",
+        params={"filename": file.filename, "reason": reason, "batch_key": batch_key},
+    )
+    background_tasks.add_task(
+        run_bulk_adjust_job,
+        job["id"],
+        spool.name,
+        current_admin.id,
+        reason,
+        batch_key,
+        getattr(request.state, 'trace_id', None),
+    )
+
+    return JobStatusResponse(**job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    current_admin: AdminUser = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    """Get background job status, progress and row errors (admin)."""
+    job = job_store.get(job_id)
+    if not job:
+        raise BusinessException(ErrorCode.RESOURCE_NOT_FOUND)
+
+    # Check permission
+    if not admin_service.check_permission(current_admin.id, job["permission"]):
+        raise BusinessException(ErrorCode.PERMISSION_DENIED)
+
+    return JobStatusResponse(**job)
+
+
+@router.post("/benefits", response_model=BenefitResponse, dependencies=[Depends(query_budget(8))])
 async def create_benefit(
     benefit_request: CreateBenefitRequest,
     request: Request = None,
@@ -204,7 +337,8 @@ async def create_benefit(
         description=benefit_request.description,
         benefit_type=benefit_request.benefit_type,
         member_level=benefit_request.member_level,
-        value=benefit_request.value
+        value=benefit_request.value,
+        stock=benefit_request.stock
     )
 
     # Log action
@@ -224,12 +358,13 @@ async def create_benefit(
         benefit_type=benefit.benefit_type,
         member_level=benefit.member_level,
         value=benefit.value,
+        stock=benefit.stock,
         is_active=benefit.is_active,
         created_at=to_beijing_time(benefit.created_at)
     )
 
 
-@router.post("/benefits/distribute", response_model=SuccessResponse)
+@router.post("/benefits/distribute", response_model=SuccessResponse, dependencies=[Depends(query_budget(8))])
 async def distribute_benefit(
     distribute_request: DistributeBenefitRequest,
     request: Request = None,
@@ -265,7 +400,129 @@ async def distribute_benefit(
     return SuccessResponse(message="权益发放成功")
 
 
-@router.get("/orders", response_model=PaginatedResponse[OrderResponse])
+@router.post("/benefits/campaigns", response_model=JobStatusResponse, status_code=202)
+async def create_benefit_campaign(
+    background_tasks: BackgroundTasks,
+    benefit_id: int = Form(...),
+    period: str = Form(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    member_level: Optional[MemberLevel] = Form(None),
+    signup_from: Optional[date] = Form(None),
+    signup_to: Optional[date] = Form(None),
+    min_points: Optional[int] = Form(None),
+    max_points: Optional[int] = Form(None),
+    file: Optional[UploadFile] = File(None),
+    request: Request = None,
+    current_admin: AdminUser = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+    campaign_service: BenefitCampaignService = Depends(get_benefit_campaign_service),
+):
+    """
+    Queue a benefit distribution to a user segment (admin).
+
+    Filters (member level, signup days in Beijing time, available points) are
+    combined with AND; an uploaded file of user ids, one per line, further
+    restricts the segment. Users who already have the benefit for the period
+    are skipped. Poll GET /admin/jobs/{id} for progress and throughput.
+    """
+    # Check permission
+    if not admin_service.check_permission(current_admin.id, "benefits.distribute"):
+        raise BusinessException(ErrorCode.PERMISSION_DENIED)
+
+    try:
+        segment = BenefitCampaignSegment(
+            member_level=member_level,
+            signup_from=signup_from,
+            signup_to=signup_to,
+            min_points=min_points,
+            max_points=max_points,
+        )
+    except ValidationError as e:
+        raise BusinessException(ErrorCode.INVALID_INPUT, details="; ".join(err["msg"] for err in e.errors()))
+
+    campaign_service.check_campaign(benefit_id, segment, has_user_ids=file is not None)
+
+    path = None
+    if file is not None:
+        # Spool the upload to disk; the request's file is closed once the response is sent.
+        with tempfile.NamedTemporaryFile(prefix="benefit_campaign_", suffix=".txt", delete=False) as spool:
+            shutil.copyfileobj(file.file, spool)
+        path = spool.name
+
+    job = job_store.create(
+        CAMPAIGN_JOB_KIND,
+        created_by=current_admin.id,
+        permission="benefits.distribute",
+        params={
+            "benefit_id": benefit_id,
+            "period": period,
+            "segment": segment.model_dump(mode="json", exclude_none=True),
+            "filename": file.filename if file is not None else None,
+        },
+    )
+    background_tasks.add_task(
+        run_campaign_job,
+        job["id"],
+        benefit_id,
+        period,
+        segment,
+        path,
+        current_admin.id,
+        getattr(request.state, 'trace_id', None),
+    )
+
+    return JobStatusResponse(**job)
+
+
+@router.get(
+    "/users/{user_id}/benefits/archive",
+    response_model=PaginatedResponse[BenefitDistributionResponse],
+    dependencies=[Depends(query_budget(6))],
+)
+async def list_archived_user_benefits(
+    user_id: int,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    request: Request = None,
+    current_admin: AdminUser = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+    benefit_service: BenefitService = Depends(get_benefit_service)
+):
+    """List a user's archived benefit distributions (admin)."""
+    # Check permission
+    if not admin_service.check_permission(current_admin.id, "benefits.view"):
+        raise BusinessException(ErrorCode.PERMISSION_DENIED)
+
+    skip = (page - 1) * page_size
+    rows, total = benefit_service.get_archived_user_benefits(user_id, skip, page_size)
+
+    items = [
+        BenefitDistributionResponse(
+            id=r.id,
+            benefit_id=r.benefit_id,
+            benefit_name=r.benefit_name,
+            benefit_type=r.benefit_type,
+            period=r.period,
+            distributed_at=to_beijing_time(r.distributed_at),
+            expires_at=to_beijing_time(r.expires_at),
+            is_used=r.is_used,
+            used_at=to_beijing_time(r.used_at),
+        )
+        for r in rows
+    ]
+
+    admin_service.log_action(
+        admin_user_id=current_admin.id,
+        action="list",
+        resource="benefit_archive",
+        resource_id=str(user_id),
+        details=f"page={page}, page_size={page_size}",
+        trace_id=getattr(request.state, 'trace_id', None) if request else None,
+    )
+
+    return PaginatedResponse.create(items, total, page, page_size)
+
+
+@router.get("/orders", response_model=PaginatedResponse[OrderResponse], dependencies=[Depends(query_budget(6))])
 async def list_all_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -320,7 +577,80 @@ async def list_all_orders(
     return PaginatedResponse.create(items, total, page, page_size)
 
 
-@router.get("/audit-logs", response_model=PaginatedResponse[AuditLogResponse])
+@router.get("/orders/export", dependencies=[Depends(query_budget(6))])
+async def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    request: Request = None,
+    current_admin: AdminUser = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    """Stream all orders matching the filters as CSV or NDJSON (admin)."""
+    # Check permission
+    if not admin_service.check_permission(current_admin.id, "orders.view"):
+        raise BusinessException(ErrorCode.PERMISSION_DENIED)
+
+    admin_service.log_action(
+        admin_user_id=current_admin.id,
+        action="export",
+        resource="orders",
+        details=f"format={format}, status={status}, start_date={start_date}, end_date={end_date}",
+        trace_id=getattr(request.state, 'trace_id', None)
+    )
+
+    return streaming_export(
+        lambda db: OrderRepository(db).iter_all(status, start_date, end_date, settings.EXPORT_YIELD_PER),
+        [
+            "id", "order_no", "user_id", "amount", "status", "product_name",
+            "paid_at", "completed_at", "cancelled_at", "refunded_at", "created_at",
+        ],
+        format,
+        "orders",
+    )
+
+
+@router.post("/orders/settle", response_model=JobStatusResponse, status_code=202)
+async def settle_orders(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    request: Request = None,
+    current_admin: AdminUser = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    """
+    Queue a bulk settlement of an upload with one order id per line (admin).
+
+    Poll GET /admin/jobs/{id} for received/settled/skipped/invalid counts.
+    """
+    # Check permission
+    if not admin_service.check_permission(current_admin.id, "orders.settle"):
+        raise BusinessException(ErrorCode.PERMISSION_DENIED)
+
+    # Spool the upload to disk; the request's file is closed once the response is sent.
+    with tempfile.NamedTemporaryFile(prefix="orders_settle_", suffix=".txt", delete=False) as spool:
+        shutil.copyfileobj(file.file, spool)
+
+    job = job_store.create(
+        SETTLEMENT_JOB_KIND,
+        created_by=current_admin.id,
+        permission="orders.settle",
+        params={"filename": file.filename},
+    )
+    background_tasks.add_task(
+        run_settlement_job,
+        job["id"],
+        spool.name,
+        file.filename,
+        current_admin.id,
+        getattr(request.state, 'trace_id', None),
+    )
+
+    return JobStatusResponse(**job)
+
+
+@router.get("/audit-logs", response_model=PaginatedResponse[AuditLogResponse], dependencies=[Depends(query_budget(6))])
 async def list_audit_logs(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
@@ -1,5 +1,5 @@
 """Benefits API endpoints."""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from typing import List
 from app.schemas.benefit import BenefitResponse, BenefitDistributionResponse
 from app.utils.pagination import PaginatedResponse
@@ -8,11 +8,13 @@ from app.models.user import User
 from app.services.benefit_service import BenefitService
 from app.dependencies import get_benefit_service
 from app.utils.timezone_utils import to_beijing_time
+from app.db.query_stats import query_budget
+from app.middleware.idempotency import idempotent
 
 router = APIRouter(prefix="/benefits", tags=["Benefits"])
 
 
-@router.get("", response_model=List[BenefitResponse])
+@router.get("", response_model=List[BenefitResponse], dependencies=[Depends(query_budget(16))])
 async def list_benefits(
     current_user: User = Depends(get_current_user),
     benefit_service: BenefitService = Depends(get_benefit_service)
@@ -20,7 +22,7 @@ async def list_benefits(
     """List available benefits for current user's level."""
     # Auto-distribute monthly benefits on first access.
     try:
-        benefit_service.distribute_current_monthly_benefits(current_user.id)
+        benefit_service.distribute_current_monthly_benefits(current_user.id, current_user.member_level)
     except Exception:
         # Do not block normal browsing if benefit distribution fails.
         pass
@@ -35,6 +37,7 @@ async def list_benefits(
             benefit_type=b.benefit_type,
             member_level=b.member_level,
             value=b.value,
+            stock=b.stock,
             is_active=b.is_active,
             created_at=to_beijing_time(b.created_at)
         )
@@ -42,45 +45,56 @@ async def list_benefits(
     ]
 
 
-@router.get("/my-benefits", response_model=PaginatedResponse[BenefitDistributionResponse])
+@router.get("/my-benefits", response_model=PaginatedResponse[BenefitDistributionResponse], dependencies=[Depends(query_budget(12))])
 async def get_my_benefits(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    active_only: bool = Query(False, description="Only benefits that have not expired"),
+    unused_only: bool = Query(False, description="Only benefits that have not been used"),
     current_user: User = Depends(get_current_user),
     benefit_service: BenefitService = Depends(get_benefit_service)
 ):
     """Get user's distributed benefits."""
     # Auto-distribute monthly benefits on first access.
     try:
-        benefit_service.distribute_current_monthly_benefits(current_user.id)
+        benefit_service.distribute_current_monthly_benefits(current_user.id, current_user.member_level)
     except Exception:
         pass
 
     skip = (page - 1) * page_size
-    distributions, total = benefit_service.get_user_benefits(current_user.id, skip, page_size)
+    rows, total = benefit_service.get_user_benefits(
+        current_user.id, skip, page_size, active_only=active_only, unused_only=unused_only
+    )
 
-    benefit_ids = list({d.benefit_id for d in distributions})
-    benefits = benefit_service.get_benefits_by_ids(benefit_ids)
-    benefit_by_id = {b.id: b for b in benefits}
+    items = [_distribution_response(row, row.benefit_name, row.benefit_type) for row in rows]
+    return PaginatedResponse.create(items, total, page, page_size)
 
-    items = []
-    for d in distributions:
-        benefit = benefit_by_id.get(d.benefit_id)
-        if not benefit:
-            continue
 
-        items.append(
-            BenefitDistributionResponse(
-                id=d.id,
-                benefit_id=d.benefit_id,
-                benefit_name=benefit.name,
-                benefit_type=benefit.benefit_type,
-                period=d.period,
-                distributed_at=to_beijing_time(d.distributed_at),
-                expires_at=to_beijing_time(d.expires_at),
-                is_used=d.is_used,
-                used_at=to_beijing_time(d.used_at),
-            )
-        )
+@router.post(
+    "/my-benefits/{distribution_id}/redeem",
+    response_model=BenefitDistributionResponse,
+    dependencies=[Depends(query_budget(6)), Depends(idempotent())],
+)
+async def redeem_benefit(
+    distribution_id: int,
+    idempotency_key: str = Header(..., alias="Idempotency-Key", min_length=1, max_length=128),
+    current_user: User = Depends(get_current_user),
+    benefit_service: BenefitService = Depends(get_benefit_service)
+):
+    """Use a distributed benefit once. Retrying with the same Idempotency-Key returns the original redemption."""
+    distribution, benefit = benefit_service.redeem_benefit(current_user.id, distribution_id, idempotency_key)
+    return _distribution_response(distribution, benefit.name, benefit.benefit_type)
 
-    return PaginatedResponse.create(items, total, page, page_size)
+
+def _distribution_response(d, benefit_name: str, benefit_type) -> BenefitDistributionResponse:
+    return BenefitDistributionResponse(
+        id=d.id,
+        benefit_id=d.benefit_id,
+        benefit_name=benefit_name,
+        benefit_type=benefit_type,
+        period=d.period,
+        distributed_at=to_beijing_time(d.distributed_at),
+        expires_at=to_beijing_time(d.expires_at),
+        is_used=d.is_used,
+        used_at=to_beijing_time(d.used_at),
+    )
@@ -7,11 +7,12 @@ from app.services.member_service import MemberService
 from app.dependencies import get_member_service
 from app.utils.timezone_utils import to_beijing_time
 from app.utils.data_masking import mask_email, mask_id_card_last_four
+from app.db.query_stats import query_budget
 
 router = APIRouter(prefix="/members", tags=["Members"])
 
 
-@router.get("/me", response_model=UserProfileResponse)
+@router.get("/me", response_model=UserProfileResponse, dependencies=[Depends(query_budget(2))])
 async def get_profile(
     current_user: User = Depends(get_current_user)
 ):
@@ -31,7 +32,7 @@ async def get_profile(
     )
 
 
-@router.patch("/me", response_model=UserProfileResponse)
+@router.patch("/me", response_model=UserProfileResponse, dependencies=[Depends(query_budget(4))])
 async def update_profile(
     request: UpdateProfileRequest,
     current_user: User = Depends(get_current_user),
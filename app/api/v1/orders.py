@@ -10,6 +10,8 @@ from app.models.order import OrderStatus
 from app.utils.timezone_utils import to_beijing_time
 from app.services.order_service import OrderService
 from app.dependencies import get_order_service
+from app.db.query_stats import query_budget
+from app.middleware.idempotency import idempotent
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -31,7 +33,7 @@ def _to_order_response(o) -> OrderResponse:
     )
 
 
-@router.post("", response_model=OrderResponse)
+@router.post("", response_model=OrderResponse, dependencies=[Depends(query_budget(6))])
 async def create_order(
     request: CreateOrderRequest,
     current_user: User = Depends(get_current_user),
@@ -47,7 +49,7 @@ async def create_order(
     return _to_order_response(order)
 
 
-@router.post("/{order_id}/complete", response_model=OrderResponse)
+@router.post("/{order_id}/complete", response_model=OrderResponse, dependencies=[Depends(query_budget(10)), Depends(idempotent())])
 async def complete_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
@@ -58,7 +60,7 @@ async def complete_order(
     return _to_order_response(order)
 
 
-@router.post("/{order_id}/refund", response_model=OrderResponse)
+@router.post("/{order_id}/refund", response_model=OrderResponse, dependencies=[Depends(query_budget(12)), Depends(idempotent())])
 async def refund_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
@@ -69,7 +71,7 @@ async def refund_order(
     return _to_order_response(order)
 
 
-@router.get("", response_model=PaginatedResponse[OrderResponse])
+@router.get("", response_model=PaginatedResponse[OrderResponse], dependencies=[Depends(query_budget(4))])
 async def list_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -1,18 +1,24 @@
 """Points API endpoints."""
-from fastapi import APIRouter, Depends, Query
-from app.schemas.user import PointBalanceResponse, PointTransactionResponse
+from fastapi import APIRouter, Depends, Header, Query
+from app.schemas.user import PointBalanceResponse, PointTransactionResponse, RedeemPointsRequest, PointSummaryResponse
 from app.utils.pagination import PaginatedResponse
 from app.middleware.auth import get_current_user
 from app.models.user import User
 from app.services.point_service import PointService
 from app.dependencies import get_point_service
-from app.utils.timezone_utils import to_beijing_time
+from app.utils.timezone_utils import to_beijing_time, current_beijing_period
+from app.db.query_stats import query_budget
+from app.middleware.idempotency import idempotent
+from app.config import settings
+from app.repositories.point_repository import PointRepository
+from app.utils.export import streaming_export
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter(prefix="/points", tags=["Points"])
 
 
-@router.get("/balance", response_model=PointBalanceResponse)
+@router.get("/balance", response_model=PointBalanceResponse, dependencies=[Depends(query_budget(2))])
 async def get_balance(
     current_user: User = Depends(get_current_user)
 ):
@@ -23,7 +29,20 @@ async def get_balance(
     )
 
 
-@router.get("/transactions", response_model=PaginatedResponse[PointTransactionResponse])
+@router.get("/summary", response_model=PointSummaryResponse, dependencies=[Depends(query_budget(3))])
+async def get_summary(
+    start_period: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    end_period: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    current_user: User = Depends(get_current_user),
+    point_service: PointService = Depends(get_point_service)
+):
+    """Monthly earned/spent totals (Beijing months); defaults to the current year to date."""
+    end_period = end_period or current_beijing_period()
+    start_period = start_period or f"{end_period[:4]}-01"
+    return point_service.get_summary(current_user.id, start_period, end_period)
+
+
+@router.get("/transactions", response_model=PaginatedResponse[PointTransactionResponse], dependencies=[Depends(query_budget(4))])
 async def get_transactions(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -50,3 +69,47 @@ async def get_transactions(
     ]
 
     return PaginatedResponse.create(items, total, page, page_size)
+
+
+@router.get("/transactions/export", dependencies=[Depends(query_budget(2))])
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """Stream the full point transaction history as CSV or NDJSON."""
+    user_id = current_user.id
+
+    return streaming_export(
+        lambda db: PointRepository(db).iter_by_user(user_id, start_date, end_date, settings.EXPORT_YIELD_PER),
+        ["id", "transaction_type", "reason", "points", "balance_after", "order_id", "description", "created_at"],
+        format,
+        "point_transactions",
+    )
+
+
+@router.post("/redeem", response_model=PointTransactionResponse, dependencies=[Depends(query_budget(8)), Depends(idempotent())])
+async def redeem_points(
+    redeem_request: RedeemPointsRequest,
+    idempotency_key: str = Header(..., alias="Idempotency-Key", min_length=1, max_length=128),
+    current_user: User = Depends(get_current_user),
+    point_service: PointService = Depends(get_point_service)
+):
+    """Redeem points. Retrying with the same Idempotency-Key returns the original transaction."""
+    t = point_service.redeem_points(
+        current_user.id,
+        redeem_request.points,
+        idempotency_key,
+        redeem_request.description,
+    )
+
+    return PointTransactionResponse(
+        id=t.id,
+        transaction_type=t.transaction_type.value,
+        reason=t.reason.value,
+        points=t.points,
+        balance_after=t.balance_after,
+        description=t.description,
+        created_at=to_beijing_time(t.created_at)
+    )
@@ -28,6 +28,27 @@ class Settings(BaseSettings):
         validation_alias="DATABASE_URL",
     )
 
+    # Database connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = Field(default=10, validation_alias="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=20, validation_alias="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT_SECONDS: int = Field(default=30, validation_alias="DB_POOL_TIMEOUT_SECONDS")
+    # Recycle connections older than this many seconds (-1 disables recycling).
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE_SECONDS")
+    # Pre-ping costs one round trip per checkout; recycling usually makes it unnecessary.
+    DB_POOL_PRE_PING: bool = Field(default=False, validation_alias="DB_POOL_PRE_PING")
+    # Per-statement timeout applied on every PostgreSQL connection (0 disables).
+    DB_STATEMENT_TIMEOUT_MS: int = Field(default=5000, validation_alias="DB_STATEMENT_TIMEOUT_MS")
+    DB_LOCK_TIMEOUT_MS: int = Field(default=2000, validation_alias="DB_LOCK_TIMEOUT_MS")
+
+    # Per-request SQL accounting
+    # Strict mode turns exceeded route query budgets into errors (enabled in tests).
+    DB_QUERY_BUDGET_STRICT: bool = Field(default=False, validation_alias="DB_QUERY_BUDGET_STRICT")
+    # Identical statements repeated this many times in one request are logged as N+1 suspects.
+    DB_N_PLUS_ONE_THRESHOLD: int = Field(default=5, validation_alias="DB_N_PLUS_ONE_THRESHOLD")
+
+    # Metrics: /metrics requires "Authorization: Bearer <METRICS_TOKEN>"; empty disables the endpoint.
+    METRICS_TOKEN: str = Field(default="", validation_alias="METRICS_TOKEN")
+
     # Redis
     REDIS_URL: str = Field(default="redis://localhost:6379/0", validation_alias="REDIS_URL")
 
@@ -42,6 +63,70 @@ class Settings(BaseSettings):
     LOGIN_FAILURE_LIMIT: int = Field(default=5, validation_alias="LOGIN_FAILURE_LIMIT")
     LOGIN_LOCK_MINUTES: int = Field(default=15, validation_alias="LOGIN_LOCK_MINUTES")
 
+    # HTTP Idempotency-Key handling (routes opt in with Depends(idempotent()))
+    IDEMPOTENCY_ENABLED: bool = Field(default=True, validation_alias="IDEMPOTENCY_ENABLED")
+    IDEMPOTENCY_TTL_SECONDS: int = Field(default=86400, validation_alias="IDEMPOTENCY_TTL_SECONDS")
+    # Pending claims expire after this unless refreshed (every third of it) by the running request.
+    IDEMPOTENCY_LOCK_SECONDS: int = Field(default=60, validation_alias="IDEMPOTENCY_LOCK_SECONDS")
+    IDEMPOTENCY_WAIT_SECONDS: float = Field(default=10.0, validation_alias="IDEMPOTENCY_WAIT_SECONDS")
+
+    # Points
+    # Redis lock around idempotent point writes; the ledger's unique idempotency key
+    # already guarantees correctness, so this only saves duplicate work.
+    POINTS_IDEMPOTENCY_LOCK_ENABLED: bool = Field(default=False, validation_alias="POINTS_IDEMPOTENCY_LOCK_ENABLED")
+    # Days until earned points expire; 0 disables expiry (no lots are opened).
+    POINTS_EXPIRY_DAYS: int = Field(default=365, validation_alias="POINTS_EXPIRY_DAYS")
+    POINTS_EXPIRY_BATCH_SIZE: int = Field(default=1000, validation_alias="POINTS_EXPIRY_BATCH_SIZE")
+
+    # Member levels: minimum lifetime earned points per level (bronze is the floor)
+    MEMBER_LEVEL_THRESHOLDS: str = Field(default="silver:1000,gold:5000,platinum:20000", validation_alias="MEMBER_LEVEL_THRESHOLDS")
+    MEMBER_LEVEL_RECALC_CHUNK_SIZE: int = Field(default=5000, validation_alias="MEMBER_LEVEL_RECALC_CHUNK_SIZE")
+    # Queued level changes handled per benefit entitlement batch
+    LEVEL_ENTITLEMENT_BATCH_SIZE: int = Field(default=500, validation_alias="LEVEL_ENTITLEMENT_BATCH_SIZE")
+
+    # Seconds a worker trusts its benefit catalog version before re-reading it from Redis
+    BENEFIT_CATALOG_RECHECK_SECONDS: float = Field(default=1.0, validation_alias="BENEFIT_CATALOG_RECHECK_SECONDS")
+
+    # Monthly benefit distribution job
+    BENEFIT_DISTRIBUTION_CHUNK_SIZE: int = Field(default=2000, validation_alias="BENEFIT_DISTRIBUTION_CHUNK_SIZE")
+    BENEFIT_DISTRIBUTION_PAUSE_SECONDS: float = Field(default=0.1, validation_alias="BENEFIT_DISTRIBUTION_PAUSE_SECONDS")
+
+    # Segment-targeted benefit campaigns (admin background jobs)
+    BENEFIT_CAMPAIGN_CHUNK_SIZE: int = Field(default=2000, validation_alias="BENEFIT_CAMPAIGN_CHUNK_SIZE")
+    BENEFIT_CAMPAIGN_PAUSE_SECONDS: float = Field(default=0.05, validation_alias="BENEFIT_CAMPAIGN_PAUSE_SECONDS")
+
+    # Expired benefit distribution archival job
+    BENEFIT_ARCHIVE_RETENTION_DAYS: int = Field(default=180, validation_alias="BENEFIT_ARCHIVE_RETENTION_DAYS")
+    BENEFIT_ARCHIVE_BATCH_SIZE: int = Field(default=1000, validation_alias="BENEFIT_ARCHIVE_BATCH_SIZE")
+    BENEFIT_ARCHIVE_MAX_ROWS_PER_SECOND: float = Field(default=2000, validation_alias="BENEFIT_ARCHIVE_MAX_ROWS_PER_SECOND")
+
+    # Points reconciliation job
+    POINTS_RECONCILE_CHUNK_SIZE: int = Field(default=5000, validation_alias="POINTS_RECONCILE_CHUNK_SIZE")
+    POINTS_RECONCILE_YIELD_PER: int = Field(default=1000, validation_alias="POINTS_RECONCILE_YIELD_PER")
+
+    # Point rollup rebuild job
+    POINTS_ROLLUP_REBUILD_CHUNK_SIZE: int = Field(default=1000, validation_alias="POINTS_ROLLUP_REBUILD_CHUNK_SIZE")
+
+    # Bulk point adjustment
+    POINTS_BULK_ADJUST_CHUNK_SIZE: int = Field(default=2000, validation_alias="POINTS_BULK_ADJUST_CHUNK_SIZE")
+    POINTS_BULK_ADJUST_MAX_ERRORS: int = Field(default=1000, validation_alias="POINTS_BULK_ADJUST_MAX_ERRORS")
+
+    # Background job status retention
+    JOB_TTL_SECONDS: int = Field(default=7 * 24 * 3600, validation_alias="JOB_TTL_SECONDS")
+
+    # Bulk member import
+    MEMBER_IMPORT_CHUNK_SIZE: int = Field(default=5000, validation_alias="MEMBER_IMPORT_CHUNK_SIZE")
+    MEMBER_IMPORT_MAX_ERRORS: int = Field(default=1000, validation_alias="MEMBER_IMPORT_MAX_ERRORS")
+
+    # Streaming exports
+    EXPORT_YIELD_PER: int = Field(default=1000, validation_alias="EXPORT_YIELD_PER")
+
+    # Bulk order settlement
+    ORDER_SETTLEMENT_CHUNK_SIZE: int = Field(default=2000, validation_alias="ORDER_SETTLEMENT_CHUNK_SIZE")
+
+    # Order numbers: seconds a process holds its Redis-leased node id between renewals
+    ORDER_NO_NODE_LEASE_SECONDS: int = Field(default=60, validation_alias="ORDER_NO_NODE_LEASE_SECONDS")
+
     # Verification Code
     VERIFICATION_CODE_LENGTH: int = Field(default=6, validation_alias="VERIFICATION_CODE_LENGTH")
     VERIFICATION_CODE_EXPIRY_MINUTES: int = Field(default=5, validation_alias="VERIFICATION_CODE_EXPIRY_MINUTES")
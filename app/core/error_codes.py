@@ -27,7 +27,13 @@ class ErrorCode:
 
     # Business logic errors (5xxx)
     BENEFIT_ALREADY_DISTRIBUTED = ("BENEFIT_ALREADY_DISTRIBUTED", "权益已发放")
+    BENEFIT_ALREADY_USED = ("BENEFIT_ALREADY_USED", "权益已使用")
+    BENEFIT_EXPIRED = ("BENEFIT_EXPIRED", "权益已过期")
+    BENEFIT_OUT_OF_STOCK = ("BENEFIT_OUT_OF_STOCK", "权益已领完")
     IDEMPOTENCY_CONFLICT = ("IDEMPOTENCY_CONFLICT", "操作已执行，请勿重复提交")
+    IDEMPOTENCY_KEY_REUSED = ("IDEMPOTENCY_KEY_REUSED", "幂等键已用于其他请求")
+    REQUEST_IN_PROGRESS = ("REQUEST_IN_PROGRESS", "请求处理中，请稍后重试")
+    ORDER_STATUS_CONFLICT = ("ORDER_STATUS_CONFLICT", "订单状态已变更，请刷新后重试")
 
     # Validation errors (6xxx)
     INVALID_INPUT = ("INVALID_INPUT", "输入参数无效")
@@ -0,0 +1,77 @@
+"""In-process domain events.
+
+Services record events on their session with ``publish_after_commit``; they
+are delivered to subscribers once the session commits and dropped if it
+rolls back, so subscribers never see changes that did not persist.
+Subscribers run synchronously in the committing thread after the commit, so
+they must use their own session for any database work.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Type
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from app.core.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_events"
+
+metrics.describe("domain_events_total", "Domain events published by type")
+metrics.describe("domain_event_handler_errors_total", "Domain event handlers that raised")
+
+
+@dataclass(frozen=True)
+class MemberLevelChanged:
+    """A user's member level changed."""
+    user_id: int
+    old_level: str
+    new_level: str
+    source: str
+
+
+class EventBus:
+    """Synchronous publish/subscribe keyed by event class."""
+
+    def __init__(self):
+        self._handlers: Dict[Type, List[Callable]] = defaultdict(list)
+
+    def subscribe(self, event_type: Type, handler: Callable) -> None:
+        """Call ``handler(event)`` for every published event of ``event_type``."""
+        if handler not in self._handlers[event_type]:
+            self._handlers[event_type].append(handler)
+
+    def unsubscribe(self, event_type: Type, handler: Callable) -> None:
+        if handler in self._handlers[event_type]:
+            self._handlers[event_type].remove(handler)
+
+    def publish(self, event) -> None:
+        """Deliver an event now. Handler errors are logged and do not reach the publisher."""
+        metrics.inc("domain_events_total", labels={"type": type(event).__name__})
+        for handler in list(self._handlers[type(event)]):
+            try:
+                handler(event)
+            except Exception:
+                metrics.inc("domain_event_handler_errors_total", labels={"type": type(event).__name__})
+                logger.exception("Event handler %r failed for %r", handler, event)
+
+
+event_bus = EventBus()
+
+
+def publish_after_commit(db: Session, event) -> None:
+    """Queue an event on the session; it is published when the session commits."""
+    db.info.setdefault(_PENDING_KEY, []).append(event)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for pending in session.info.pop(_PENDING_KEY, []):
+        event_bus.publish(pending)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,69 @@
+"""Background job status store backed by Redis."""
+import json
+import uuid
+from typing import Optional
+from app.config import settings
+from app.utils.redis_client import redis_client
+from app.utils.timezone_utils import utc_now
+
+
+class JobStatus:
+    """Job lifecycle states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobStore:
+    """
+    Status, progress and capped error reports of background jobs.
+
+    Each job is one JSON document under ``jobs:{id}`` that expires after
+    ``JOB_TTL_SECONDS``. A job has a single writer (its runner), so plain
+    read-modify-write updates are safe.
+    """
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"jobs:{job_id}"
+
+    def _save(self, job: dict) -> dict:
+        job["updated_at"] = utc_now().isoformat()
+        redis_client.set(self._key(job["id"]), json.dumps(job, ensure_ascii=False), ex=settings.JOB_TTL_SECONDS)
+        return job
+
+    def create(self, kind: str, created_by: int, permission: str, params: dict = None) -> dict:
+        """Register a queued job. ``permission`` is required to read its status."""
+        return self._save({
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": JobStatus.QUEUED,
+            "permission": permission,
+            "created_by": created_by,
+            "params": params or {},
+            "created_at": utc_now().isoformat(),
+            "finished_at": None,
+            "progress": {},
+            "errors": [],
+            "errors_truncated": False,
+            "error": None,
+        })
+
+    def get(self, job_id: str) -> Optional[dict]:
+        raw = redis_client.get(self._key(job_id))
+        return json.loads(raw) if raw else None
+
+    def update(self, job_id: str, **fields) -> Optional[dict]:
+        """Merge fields into a job; finished states also stamp ``finished_at``."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        if fields.get("status") in (JobStatus.COMPLETED, JobStatus.FAILED):
+            job["finished_at"] = utc_now().isoformat()
+        return self._save(job)
+
+
+# Global job store instance
+job_store = JobStore()
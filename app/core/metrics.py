@@ -0,0 +1,127 @@
+"""In-process metrics registry.
+
+Counters, gauges and summaries are kept per worker process and rendered in
+Prometheus text exposition format by the ``/metrics`` endpoint.
+"""
+import threading
+from typing import Dict, Tuple
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict = None) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in key)
+    return "{" + inner + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe metrics registry."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        # name -> label key -> [count, sum, max]
+        self._summaries: Dict[str, Dict[LabelKey, list]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Register help text for a metric."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, labels: dict = None) -> None:
+        """Increment a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: dict = None) -> None:
+        """Set a gauge value."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def add_gauge(self, name: str, delta: float, labels: dict = None) -> None:
+        """Add delta to a gauge value."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, labels: dict = None) -> None:
+        """Record an observation for a summary (count, sum, max)."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            stats = series.get(key)
+            if stats is None:
+                series[key] = [1, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                if value > stats[2]:
+                    stats[2] = value
+
+    def get(self, name: str, labels: dict = None) -> float:
+        """Get current counter or gauge value (0 if absent)."""
+        key = _label_key(labels)
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name].get(key, 0)
+            if name in self._gauges:
+                return self._gauges[name].get(key, 0)
+            if name in self._summaries:
+                stats = self._summaries[name].get(key)
+                return stats[0] if stats else 0
+        return 0
+
+    def reset(self) -> None:
+        """Drop all recorded series."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in store[name].items():
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+
+            for name in sorted(self._summaries):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} summary")
+                for key, (count, total, _) in self._summaries[name].items():
+                    labels = _format_labels(key)
+                    lines.append(f"{name}_count{labels} {count}")
+                    lines.append(f"{name}_sum{labels} {total}")
+
+            # Summaries have no max series; the largest observation is its own gauge.
+            for name in sorted(self._summaries):
+                lines.append(f"# HELP {name}_max Largest observation of {name}")
+                lines.append(f"# TYPE {name}_max gauge")
+                for key, (_, _, maximum) in self._summaries[name].items():
+                    lines.append(f"{name}_max{_format_labels(key)} {maximum}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry instance
+metrics = MetricsRegistry()
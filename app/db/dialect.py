@@ -0,0 +1,27 @@
+"""Dialect-specific SQL helpers (PostgreSQL in production, SQLite in tests)."""
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def is_postgresql(db: Session) -> bool:
+    """Whether the session is bound to PostgreSQL."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def upsert_insert(db: Session, table):
+    """
+    INSERT construct supporting ``on_conflict_do_nothing`` / ``on_conflict_do_update``.
+
+    Both PostgreSQL and SQLite implement ``INSERT ... ON CONFLICT``.
+    """
+    if is_postgresql(db):
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def beijing_period(db: Session, column):
+    """SQL expression for the Beijing calendar month (``YYYY-MM``) of a UTC timestamp column."""
+    if is_postgresql(db):
+        return func.to_char(func.timezone("Asia/Shanghai", column), "YYYY-MM")
+    return func.strftime("%Y-%m", column, "+8 hours")
@@ -0,0 +1,65 @@
+"""Connection pool telemetry.
+
+Exports checkout wait time plus in-use / overflow connection counts so pools
+can be sized per worker from real numbers.
+"""
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from app.core.metrics import metrics
+
+
+metrics.describe("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection")
+metrics.describe("db_pool_checkout_timeouts_total", "Checkouts that gave up waiting for a connection")
+metrics.describe("db_pool_connections_in_use", "Connections currently checked out of the pool")
+metrics.describe("db_pool_connections_overflow", "Connections opened beyond pool_size")
+metrics.describe("db_pool_connections_idle", "Connections idle in the pool")
+metrics.describe("db_pool_connects_total", "New DBAPI connections opened")
+metrics.describe("db_pool_invalidations_total", "Connections invalidated (disconnects, errors)")
+
+
+def _publish_pool_gauges(pool) -> None:
+    metrics.set_gauge("db_pool_connections_in_use", pool.checkedout())
+    metrics.set_gauge("db_pool_connections_overflow", max(pool.overflow(), 0))
+    metrics.set_gauge("db_pool_connections_idle", pool.checkedin())
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+
+    The in-use / overflow / idle gauges are published after each checkout
+    and return, once the pool's own counts are up to date (checkin events
+    fire before the connection is back in the pool).
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.inc("db_pool_checkout_timeouts_total")
+            raise
+        finally:
+            metrics.observe("db_pool_checkout_wait_seconds", time.perf_counter() - start)
+            _publish_pool_gauges(self)
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            _publish_pool_gauges(self)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach pool event listeners that count new and invalidated connections."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.inc("db_pool_connects_total")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.inc("db_pool_invalidations_total")
@@ -0,0 +1,134 @@
+"""Per-request SQL statement accounting.
+
+Engine events count statements and DB time into a ``QueryStats`` object bound
+to the current request (keyed by trace_id). Routes declare a statement budget
+with ``query_budget(n)``; tests can use ``assert_max_queries(n)`` directly.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request runs more statements than its budget."""
+
+
+class QueryStats:
+    """Statement count and DB time collected for one unit of work."""
+
+    def __init__(self, trace_id: str = None):
+        self.trace_id = trace_id
+        self.count = 0
+        self.total_time = 0.0
+        self.budget: Optional[int] = None
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed at least ``threshold`` times (likely N+1 patterns)."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Get stats collector for the current request, if any."""
+    return _current_stats.get()
+
+
+def begin_query_stats(trace_id: str = None):
+    """Start collecting statements for the current context. Returns a reset token."""
+    return _current_stats.set(QueryStats(trace_id))
+
+
+def end_query_stats(token) -> None:
+    """Stop collecting statements for the current context."""
+    _current_stats.reset(token)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach cursor execution listeners that feed the current QueryStats."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_stack = conn.info.get("query_start_time")
+        if not start_stack:
+            return
+        elapsed = time.perf_counter() - start_stack.pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+
+def query_budget(max_statements: int):
+    """
+    FastAPI dependency declaring the statement budget of a route.
+
+    Usage: ``@router.get("/x", dependencies=[Depends(query_budget(5))])``
+    """
+
+    def _declare_budget() -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_statements
+
+    return _declare_budget
+
+
+def check_budget(stats: QueryStats, label: str) -> None:
+    """Log (and in strict mode raise) when a request exceeded its budget or fanned out."""
+    repeated = stats.repeated_statements(settings.DB_N_PLUS_ONE_THRESHOLD)
+    for sql, n in repeated:
+        logger.warning(
+            "Possible N+1 in %s (trace_id=%s): statement executed %d times: %s", label, stats.trace_id, n, sql[:200]
+        )
+
+    if stats.over_budget:
+        message = f"{label} executed {stats.count} SQL statements, budget is {stats.budget}"
+        logger.warning("%s (trace_id=%s)", message, stats.trace_id)
+        if settings.DB_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+
+
+@contextmanager
+def count_queries():
+    """Count statements executed inside the block. Yields the QueryStats."""
+    token = begin_query_stats()
+    try:
+        yield _current_stats.get()
+    finally:
+        end_query_stats(token)
+
+
+@contextmanager
+def assert_max_queries(max_statements: int):
+    """Fail if the block executes more than ``max_statements`` statements."""
+    with count_queries() as stats:
+        yield stats
+    if stats.count > max_statements:
+        executed = "\n".join(f"{n}x {sql}" for sql, n in stats.statements.most_common())
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_statements} SQL statements, got {stats.count}:\n{executed}"
+        )
@@ -3,23 +3,52 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from app.config import settings
+from app.db.pool_metrics import InstrumentedQueuePool, instrument_engine
+from app.db import query_stats
 
 database_url = settings.DATABASE_URL
 is_sqlite = database_url.startswith("sqlite")
 
-# Create engine
-engine_kwargs = {"pool_pre_ping": True}
-if is_sqlite:
-    # SQLite is used for local/unit tests; keep configuration compatible.
-    engine_kwargs.update(
-        connect_args={"check_same_thread": False},
+
+def _postgres_connect_options() -> str:
+    """Server-side session options applied to every new PostgreSQL connection."""
+    options = []
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        options.append(f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}")
+    if settings.DB_LOCK_TIMEOUT_MS > 0:
+        options.append(f"-c lock_timeout={settings.DB_LOCK_TIMEOUT_MS}")
+    return " ".join(options)
+
+
+def engine_options(url: str) -> dict:
+    """create_engine keyword arguments for ``url``; pool settings come from config (PostgreSQL only)."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        # SQLite is used for local/unit tests; keep configuration compatible.
+        options.update(
+            connect_args={"check_same_thread": False},
+        )
+        if url.endswith(":memory:"):
+            options["poolclass"] = StaticPool
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
     )
-    if database_url.endswith(":memory:"):
-        engine_kwargs["poolclass"] = StaticPool
-else:
-    engine_kwargs.update(pool_size=10, max_overflow=20)
+    connect_options = _postgres_connect_options()
+    if connect_options:
+        options["connect_args"] = {"options": connect_options}
+    return options
+
 
-engine = create_engine(database_url, **engine_kwargs)
+# Create engine
+engine = create_engine(database_url, **engine_options(database_url))
+instrument_engine(engine)
+query_stats.instrument_engine(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
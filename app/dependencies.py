@@ -8,6 +8,7 @@ from app.services.benefit_service import BenefitService
 from app.services.admin_service import AdminService
 from app.services.order_service import OrderService
 from app.services.member_service import MemberService
+from app.services.benefit_campaign_service import BenefitCampaignService
 
 
 def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
@@ -38,3 +39,8 @@ def get_order_service(db: Session = Depends(get_db)) -> OrderService:
 def get_member_service(db: Session = Depends(get_db)) -> MemberService:
     """Get member service."""
     return MemberService(db)
+
+
+def get_benefit_campaign_service(db: Session = Depends(get_db)) -> BenefitCampaignService:
+    """Get benefit campaign service."""
+    return BenefitCampaignService(db)
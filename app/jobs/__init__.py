@@ -0,0 +1 @@
+"""Batch jobs and operator commands (run with ``python -m app.jobs.<name>``)."""
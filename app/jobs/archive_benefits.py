@@ -0,0 +1,45 @@
+"""
+Archive expired benefit distributions.
+
+Usage:
+    python -m app.jobs.archive_benefits
+    python -m app.jobs.archive_benefits --retention-days 90 --batch-size 500 --max-rows-per-second 1000
+
+Moves distributions that expired more than the retention window ago into
+benefit_distribution_archive in rate-limited batches. Safe to interrupt and
+rerun.
+"""
+import argparse
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.benefit_archive_service import BenefitArchiveService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive expired benefit distributions")
+    parser.add_argument("--retention-days", type=int, default=None, help="Keep distributions this long after expiry")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per transaction")
+    parser.add_argument("--max-rows-per-second", type=float, default=None, help="Delete rate ceiling, 0 for none")
+    parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        summary = BenefitArchiveService(db).archive_expired(
+            retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            max_rows_per_second=args.max_rows_per_second,
+            max_batches=args.max_batches,
+        )
+    finally:
+        db.close()
+
+    print(f"batches={summary.batches} archived={summary.archived}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Distribute a month's benefits to all users by member level.
+
+Usage:
+    python -m app.jobs.distribute_benefits
+    python -m app.jobs.distribute_benefits --period 2024-03 --chunk-size 2000 --pause 0.2
+    python -m app.jobs.distribute_benefits --period 2024-03 --restart
+
+Schedule it shortly after each month rollover (Beijing time), e.g. from cron
+at 00:05 on day 1, so users do not pay for distribution on their first
+request. Reruns resume from the period's checkpoint; --restart starts from the
+first user again (already distributed rows are skipped either way).
+"""
+import argparse
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.benefit_distribution_service import BenefitDistributionService
+from app.utils.timezone_utils import current_beijing_period
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Distribute monthly benefits")
+    parser.add_argument("--period", default=None, help="YYYY-MM, defaults to the current Beijing month")
+    parser.add_argument("--chunk-size", type=int, default=None, help="User ids per transaction")
+    parser.add_argument("--pause", type=float, default=None, help="Seconds to sleep between chunks")
+    parser.add_argument("--start-id", type=int, default=None)
+    parser.add_argument("--end-id", type=int, default=None, help="Exclusive")
+    parser.add_argument("--restart", action="store_true", help="Ignore the period's checkpoint")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    period = args.period or current_beijing_period()
+
+    db = SessionLocal()
+    try:
+        service = BenefitDistributionService(db)
+        if args.restart:
+            service.clear_checkpoint(period)
+        summary = service.distribute_period(
+            period,
+            chunk_size=args.chunk_size,
+            pause_seconds=args.pause,
+            start_id=args.start_id,
+            end_id=args.end_id,
+        )
+    finally:
+        db.close()
+
+    print(f"period={summary.period} start_id={summary.start_id} chunks={summary.chunks} distributed={summary.distributed}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
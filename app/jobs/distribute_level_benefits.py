@@ -0,0 +1,43 @@
+"""
+Distribute benefits newly entitled by member level changes.
+
+Usage:
+    python -m app.jobs.distribute_level_benefits
+    python -m app.jobs.distribute_level_benefits --batch-size 1000 --max-batches 50
+
+Level changes are queued in Redis when they commit; admin edits and the level
+recalculation job drain the queue themselves. Run this from cron (e.g. every
+few minutes) to pick up promotions from the earn path and any batch that
+failed and was re-queued.
+"""
+import argparse
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.level_entitlement_service import LevelEntitlementService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Distribute benefits for member level changes")
+    parser.add_argument("--batch-size", type=int, default=None, help="Queued changes per transaction")
+    parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        summary = LevelEntitlementService(db).drain(batch_size=args.batch_size, max_batches=args.max_batches)
+    finally:
+        db.close()
+
+    print(
+        f"batches={summary.batches} events={summary.events} users={summary.users} "
+        f"distributed={summary.distributed}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Nightly point expiry sweep.
+
+Usage:
+    python -m app.jobs.expire_points
+    python -m app.jobs.expire_points --batch-size 5000 --pause 0.05
+
+Expires every point lot whose expiry date has passed, writing one ``expire``
+ledger row per lot. Safe to re-run: closed lots are never touched again.
+"""
+import argparse
+import sys
+from datetime import datetime
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.point_expiry_service import PointExpiryService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Expire due point lots")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between batches")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None, help="ISO timestamp (UTC); defaults to now")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        summary = PointExpiryService(db).expire_due(args.now, args.batch_size, args.max_batches, args.pause)
+    finally:
+        db.close()
+
+    print(
+        f"batches={summary.batches} lots={summary.lots_expired} "
+        f"points={summary.points_expired} users={summary.users_affected}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
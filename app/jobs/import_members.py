@@ -0,0 +1,53 @@
+"""
+Bulk import members from a CSV or NDJSON file.
+
+Usage:
+    python -m app.jobs.import_members members.csv
+    python -m app.jobs.import_members members.ndjson --chunk-size 10000
+
+CSV files need a header row with at least an ``email`` column; ``nickname``
+and ``member_level`` are optional. NDJSON files hold one object per line.
+"""
+import argparse
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.member_import_service import MemberImportService, SUPPORTED_FORMATS, detect_format
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import members")
+    parser.add_argument("path", help="CSV/NDJSON file, or '-' for stdin")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--show-errors", type=int, default=20, help="Row errors to print at the end")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    fmt = args.format or detect_format(args.path)
+
+    def on_progress(report):
+        print(
+            f"rows={report.total_rows} imported={report.imported} "
+            f"duplicates={report.duplicates} failed={report.failed}",
+            file=sys.stderr,
+        )
+
+    db = SessionLocal()
+    try:
+        if args.path == "-":
+            report = MemberImportService(db).import_stream(sys.stdin, fmt, args.chunk_size, on_progress)
+        else:
+            with open(args.path, encoding="utf-8-sig", newline="") as stream:
+                report = MemberImportService(db).import_stream(stream, fmt, args.chunk_size, on_progress)
+    finally:
+        db.close()
+
+    for error in report.errors[:args.show_errors]:
+        print(f"line {error.line}: {error.error}", file=sys.stderr)
+
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
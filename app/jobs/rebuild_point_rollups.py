@@ -0,0 +1,43 @@
+"""
+Rebuild monthly point rollups from the ledger.
+
+Usage:
+    python -m app.jobs.rebuild_point_rollups
+    python -m app.jobs.rebuild_point_rollups --start-id 1 --end-id 100000 --chunk-size 500
+"""
+import argparse
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.repositories.user_repository import UserRepository
+from app.services.point_rollup_service import PointRollupService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild monthly point rollups")
+    parser.add_argument("--start-id", type=int, default=None)
+    parser.add_argument("--end-id", type=int, default=None, help="Exclusive")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Users per transaction")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        min_id, max_id = UserRepository(db).id_bounds()
+        if min_id is None:
+            print("No users to rebuild", file=sys.stderr)
+            return 0
+
+        start_id = args.start_id if args.start_id is not None else min_id
+        end_id = args.end_id if args.end_id is not None else max_id + 1
+        written = PointRollupService(db).rebuild_range(start_id, end_id, args.chunk_size)
+    finally:
+        db.close()
+
+    print(f"rollup_rows={written}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Recompute member levels from lifetime earned points.
+
+Usage:
+    python -m app.jobs.recalculate_member_levels
+    python -m app.jobs.recalculate_member_levels --allow-demotion --chunk-size 2000 --after-id 150000
+
+Levels are normally promoted on the earn path; run this after changing
+MEMBER_LEVEL_THRESHOLDS or backfilling points. Without --allow-demotion users
+are only ever promoted, so manual upgrades are kept. Benefits newly entitled
+by the changed levels are distributed for the current period once the
+recalculation finishes.
+"""
+import argparse
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.level_entitlement_service import LevelEntitlementService, register_level_change_handlers
+from app.services.member_level_service import MemberLevelService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute member levels")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Users per transaction")
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this user id")
+    parser.add_argument("--allow-demotion", action="store_true", help="Also lower levels above the earned one")
+    parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between chunks")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    register_level_change_handlers()
+
+    db = SessionLocal()
+    try:
+        changed = MemberLevelService(db).recalculate_all(
+            chunk_size=args.chunk_size,
+            allow_demotion=args.allow_demotion,
+            after_id=args.after_id,
+            pause_seconds=args.pause,
+        )
+        entitlements = LevelEntitlementService(db).drain()
+    finally:
+        db.close()
+
+    print(f"changed={changed} benefits_distributed={entitlements.distributed}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
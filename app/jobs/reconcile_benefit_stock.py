@@ -0,0 +1,43 @@
+"""
+Reconcile limited benefit stock counters with the database.
+
+Usage:
+    python -m app.jobs.reconcile_benefit_stock
+    python -m app.jobs.reconcile_benefit_stock --repair
+
+Copies each Redis stock counter into benefits.stock_remaining, rebuilds
+counters that are missing (e.g. after losing Redis) and prints one NDJSON
+record per counter that differs from stock minus distributions. With
+--repair, drifted counters (above or below the database value) are rebuilt
+from the database. The exit code is 1 when a counter was above the database
+value and left as is.
+"""
+import argparse
+import json
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.benefit_inventory import benefit_inventory
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcile limited benefit stock counters")
+    parser.add_argument("--repair", action="store_true", help="Rebuild counters that differ from the database value")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        drifted = benefit_inventory.reconcile(db, repair=args.repair)
+    finally:
+        db.close()
+
+    for record in drifted:
+        print(json.dumps(record))
+    print(f"drifted={len(drifted)}", file=sys.stderr)
+    return 1 if any(r["drift"] > 0 for r in drifted) and not args.repair else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Reconcile user point balances against the ledger and write checkpoints.
+
+Usage:
+    python -m app.jobs.reconcile_points --workers 4 --checkpoint --output drift.ndjson
+
+The user-id space is split into ranges processed in parallel, each worker with
+its own session. Every range is walked in chunks, so memory stays bounded no
+matter how large the ledger is. Drift records are written as NDJSON. The exit
+code is 1 when any drift was found.
+"""
+import argparse
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config import settings
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.repositories.user_repository import UserRepository
+from app.services.point_reconciliation_service import PointReconciliationService, ReconciliationSummary
+
+
+def split_ranges(start_id: int, end_id: int, range_size: int) -> list[tuple[int, int]]:
+    """Split [start_id, end_id) into consecutive ranges of at most range_size ids."""
+    return [(lo, min(lo + range_size, end_id)) for lo in range(start_id, end_id, range_size)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcile point balances with the ledger")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=settings.POINTS_RECONCILE_CHUNK_SIZE)
+    parser.add_argument("--chunks-per-range", type=int, default=10, help="Chunks handed to a worker at a time")
+    parser.add_argument("--start-id", type=int, default=None)
+    parser.add_argument("--end-id", type=int, default=None, help="Exclusive")
+    parser.add_argument("--checkpoint", action="store_true", help="Advance checkpoints for users without drift")
+    parser.add_argument("--output", default="-", help="Drift report path (NDJSON), '-' for stdout")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        min_id, max_id = UserRepository(db).id_bounds()
+    finally:
+        db.close()
+    if min_id is None:
+        print("No users to reconcile", file=sys.stderr)
+        return 0
+
+    start_id = args.start_id if args.start_id is not None else min_id
+    end_id = args.end_id if args.end_id is not None else max_id + 1
+    ranges = split_ranges(start_id, end_id, args.chunk_size * args.chunks_per_range)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    write_lock = threading.Lock()
+
+    def on_drift(record: dict) -> None:
+        line = json.dumps(record)
+        with write_lock:
+            out.write(line + "\n")
+
+    def run_range(bounds: tuple[int, int]) -> ReconciliationSummary:
+        session = SessionLocal()
+        try:
+            return PointReconciliationService(session).reconcile_range(
+                bounds[0], bounds[1], args.chunk_size, args.checkpoint, on_drift
+            )
+        finally:
+            session.close()
+
+    total = ReconciliationSummary()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for summary in pool.map(run_range, ranges):
+                total.merge(summary)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"users_checked={total.users_checked} users_with_drift={total.users_with_drift} "
+        f"checkpoints_written={total.checkpoints_written}",
+        file=sys.stderr,
+    )
+    return 1 if total.users_with_drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Bulk settle orders and award their points.
+
+Usage:
+    python -m app.jobs.settle_orders order_ids.txt
+    cat order_ids.txt | python -m app.jobs.settle_orders - --chunk-size 5000
+
+The input holds one order id per line (extra comma-separated columns are
+ignored). Orders that are not pending/paid, or were already settled, are
+skipped, so a file can safely be replayed. Promotions it causes are queued for
+app.jobs.distribute_level_benefits.
+"""
+import argparse
+import sys
+from app.core.logging_config import setup_logging
+from app.db.session import SessionLocal
+from app.services.level_entitlement_service import register_level_change_handlers
+from app.services.order_settlement_service import OrderSettlementService, SettlementReport, parse_order_ids
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk settle orders")
+    parser.add_argument("path", help="File with one order id per line, or '-' for stdin")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    register_level_change_handlers()
+    report = SettlementReport()
+
+    db = SessionLocal()
+    try:
+        service = OrderSettlementService(db)
+        if args.path == "-":
+            service.settle_stream(parse_order_ids(sys.stdin, report), args.chunk_size, report)
+        else:
+            with open(args.path, encoding="utf-8-sig") as stream:
+                service.settle_stream(parse_order_ids(stream, report), args.chunk_size, report)
+    finally:
+        db.close()
+
+    print(
+        f"received={report.received} settled={report.settled} skipped={report.skipped} "
+        f"invalid={report.invalid} points={report.points_awarded} users={report.users_credited}",
+        file=sys.stderr,
+    )
+    return 1 if report.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,32 @@
 """Main FastAPI application."""
 import uuid
 import logging
-from fastapi import FastAPI, Request, status
+import secrets
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.utils.redis_client import redis_client
+from app.core.order_numbers import order_numbers
 from app.middleware.error_handler import error_handler_middleware
 from app.middleware.request_id import request_id_middleware
+from app.middleware.query_stats import query_stats_middleware
+from app.middleware.idempotency import idempotency_middleware
 from app.api.v1 import auth, members, points, benefits, orders, admin
 from app.core.error_codes import ErrorCode
 from app.core.logging_config import setup_logging
+from app.core.metrics import metrics
+from app.middleware.auth import security
+from app.services.level_entitlement_service import register_level_change_handlers
 
 
 setup_logging()
 logger = logging.getLogger(__name__)
+register_level_change_handlers()
 
 
 @asynccontextmanager
@@ -61,6 +70,7 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     if settings.APP_ENV != "test":
+        order_numbers.release()
         redis_client.disconnect()
         logger.info("Redis disconnected")
 
@@ -84,6 +94,8 @@ app.add_middleware(
 
 # Custom middleware
 app.middleware("http")(request_id_middleware)
+app.middleware("http")(query_stats_middleware)
+app.middleware("http")(idempotency_middleware)
 app.middleware("http")(error_handler_middleware)
 
 # Exception handlers
@@ -157,3 +169,16 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Prometheus-style metrics for this worker process; requires the METRICS_TOKEN bearer token."""
+    if not settings.METRICS_TOKEN:
+        raise StarletteHTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not credentials or not secrets.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
+        raise StarletteHTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"code": ErrorCode.UNAUTHORIZED[0], "message": ErrorCode.UNAUTHORIZED[1]},
+        )
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -10,6 +10,19 @@ from app.core.logging_config import trace_id_var
 logger = logging.getLogger(__name__)
 
 
+def business_error_response(e: BusinessException, trace_id: str) -> JSONResponse:
+    """The 400 response for a business exception."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={
+            "code": e.code,
+            "message": e.message,
+            "trace_id": trace_id,
+            "details": e.details
+        }
+    )
+
+
 async def error_handler_middleware(request: Request, call_next):
     """Global error handler middleware."""
     trace_id = str(uuid.uuid4())
@@ -22,15 +35,7 @@ async def error_handler_middleware(request: Request, call_next):
 
     except BusinessException as e:
         # Business logic exception
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "code": e.code,
-                "message": e.message,
-                "trace_id": trace_id,
-                "details": e.details
-            }
-        )
+        return business_error_response(e, trace_id)
 
     except Exception as e:
         # Unexpected exception
@@ -0,0 +1,192 @@
+"""HTTP Idempotency-Key middleware."""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+import uuid
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from app.config import settings
+from app.core.error_codes import ErrorCode, BusinessException
+from app.core.metrics import metrics
+from app.core.security import decode_access_token
+from app.middleware.error_handler import business_error_response
+from app.utils.redis_client import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAY_HEADER = "Idempotent-Replayed"
+
+metrics.describe("http_idempotency_total", "Idempotency-Key requests by outcome")
+
+
+def idempotent(ttl_seconds: int = None):
+    """
+    Dependency factory marking a route as idempotent.
+
+    Usage:
+        @router.post("/things", dependencies=[Depends(idempotent())])
+
+    Requests to a marked route that carry an ``Idempotency-Key`` header run
+    once; the first response is stored in Redis for ``ttl_seconds`` (default
+    ``IDEMPOTENCY_TTL_SECONDS``) and replayed for retries. The dependency
+    itself does nothing at request time; the middleware reads the marker.
+    """
+    def _idempotent_route() -> None:
+        return None
+
+    _idempotent_route.idempotency_ttl = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+    return _idempotent_route
+
+
+def _route_ttl(request: Request):
+    """TTL declared by the matching route's ``idempotent()`` dependency, or None."""
+    for route in request.app.router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            for dependency in route.dependencies:
+                ttl = getattr(dependency.dependency, "idempotency_ttl", None)
+                if ttl:
+                    return ttl
+            return None
+    return None
+
+
+def _caller(request: Request) -> str:
+    """The token's subject ("role:id"), so a retry with a refreshed token keeps its key."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = decode_access_token(token)
+            return f"{payload.get('role')}:{payload.get('sub')}"
+        except BusinessException:
+            pass
+    # Missing or invalid credentials are rejected by the route; keep such callers apart anyway.
+    return authorization
+
+
+def _cache_key(request: Request, idempotency_key: str) -> str:
+    # Keys are scoped to the authenticated caller and the endpoint.
+    scope = "\n".join([
+        _caller(request),
+        request.method,
+        request.url.path,
+        idempotency_key,
+    ])
+    return f"idempotency:http:{hashlib.sha256(scope.encode()).hexdigest()}"
+
+
+async def _keep_claim(key: str, pending: str) -> None:
+    """Extend a pending claim while its request runs, so slow routes are not run twice."""
+    interval = settings.IDEMPOTENCY_LOCK_SECONDS / 3
+    while True:
+        await asyncio.sleep(interval)
+        if await run_in_threadpool(redis_client.get, key) != pending:
+            return
+        await run_in_threadpool(redis_client.expire, key, settings.IDEMPOTENCY_LOCK_SECONDS)
+
+
+def _replay(record: dict) -> Response:
+    response = Response(
+        content=base64.b64decode(record["body"]),
+        status_code=record["status"],
+        media_type=record.get("media_type"),
+    )
+    response.headers[REPLAY_HEADER] = "true"
+    return response
+
+
+async def idempotency_middleware(request: Request, call_next):
+    """
+    Run each (caller, endpoint, Idempotency-Key) once and replay its response.
+
+    The first request claims the key with ``SET NX`` and stores the response
+    (status < 500, including business errors) when done. Concurrent duplicates
+    poll until it is stored and get the same response; once stored, retries
+    never reach the route or the database. A key reused with a different
+    request body is rejected. The claim expires after
+    ``IDEMPOTENCY_LOCK_SECONDS`` and is refreshed while the request runs, so
+    only a crashed worker lets a duplicate take over. 5xx responses and other
+    exceptions release the key so the client can retry. Redis calls run in the threadpool so waiting
+    duplicates do not block the event loop.
+    """
+    idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not idempotency_key or not settings.IDEMPOTENCY_ENABLED or request.method in ("GET", "HEAD", "OPTIONS"):
+        return await call_next(request)
+
+    ttl = _route_ttl(request)
+    if not ttl:
+        return await call_next(request)
+
+    key = _cache_key(request, idempotency_key)
+    fingerprint = hashlib.sha256(await request.body()).hexdigest()
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.02
+
+    owner = uuid.uuid4().hex
+    while True:
+        pending = json.dumps({"state": "pending", "fingerprint": fingerprint, "owner": owner})
+        if await run_in_threadpool(redis_client.set, key, pending, ex=settings.IDEMPOTENCY_LOCK_SECONDS, nx=True):
+            break
+
+        raw = await run_in_threadpool(redis_client.get, key)
+        if raw is None:
+            # The first request failed and released the key; try to claim it.
+            continue
+
+        record = json.loads(raw)
+        if record["fingerprint"] != fingerprint:
+            metrics.inc("http_idempotency_total", labels={"outcome": "mismatch"})
+            raise BusinessException(ErrorCode.IDEMPOTENCY_KEY_REUSED)
+        if record["state"] == "done":
+            metrics.inc("http_idempotency_total", labels={"outcome": "replayed"})
+            return _replay(record)
+
+        if time.monotonic() >= deadline:
+            metrics.inc("http_idempotency_total", labels={"outcome": "timeout"})
+            raise BusinessException(ErrorCode.REQUEST_IN_PROGRESS)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+    keeper = asyncio.create_task(_keep_claim(key, pending))
+    try:
+        try:
+            response = await call_next(request)
+        except BusinessException as e:
+            # A business error is the route's answer; store it like any other 4xx.
+            response = business_error_response(e, getattr(request.state, "trace_id", None))
+            body = response.body
+        else:
+            body = b"".join([chunk async for chunk in response.body_iterator])
+    except BaseException:
+        await run_in_threadpool(redis_client.delete, key)
+        raise
+    finally:
+        keeper.cancel()
+
+    if response.status_code >= 500:
+        await run_in_threadpool(redis_client.delete, key)
+    else:
+        await run_in_threadpool(redis_client.set, key, json.dumps({
+            "state": "done",
+            "fingerprint": fingerprint,
+            "status": response.status_code,
+            "media_type": response.headers.get("content-type"),
+            "body": base64.b64encode(body).decode(),
+        }), ex=ttl)
+        metrics.inc("http_idempotency_total", labels={"outcome": "stored"})
+        logger.debug("Stored idempotent response for %s %s", request.method, request.url.path)
+
+    passthrough = Response(content=body, status_code=response.status_code)
+    # raw_headers keeps repeated headers such as Set-Cookie.
+    passthrough.raw_headers = response.raw_headers
+    return passthrough
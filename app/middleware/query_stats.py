@@ -0,0 +1,37 @@
+"""Per-request SQL statement accounting middleware."""
+from fastapi import Request
+from app.core.error_codes import BusinessException
+from app.core.metrics import metrics
+from app.db.query_stats import begin_query_stats, end_query_stats, current_query_stats, check_budget
+from app.middleware.error_handler import business_error_response
+
+
+metrics.describe("http_request_db_statements", "SQL statements executed per request")
+metrics.describe("http_request_db_seconds", "Total DB time per request")
+metrics.describe("http_request_db_budget_exceeded_total", "Requests that exceeded their declared query budget")
+
+
+async def query_stats_middleware(request: Request, call_next):
+    """Count SQL statements and DB time per request and expose them as headers/metrics."""
+    token = begin_query_stats(getattr(request.state, "trace_id", None))
+    stats = current_query_stats()
+    try:
+        try:
+            response = await call_next(request)
+        except BusinessException as e:
+            # Built here rather than in the outer error handler so 400s carry the headers too.
+            response = business_error_response(e, getattr(request.state, "trace_id", None))
+
+        route = request.scope.get("route")
+        label = f"{request.method} {getattr(route, 'path', request.url.path)}"
+        metrics.observe("http_request_db_statements", stats.count, labels={"route": label})
+        metrics.observe("http_request_db_seconds", stats.total_time, labels={"route": label})
+        if stats.over_budget:
+            metrics.inc("http_request_db_budget_exceeded_total", labels={"route": label})
+        check_budget(stats, label)
+
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+        return response
+    finally:
+        end_query_stats(token)
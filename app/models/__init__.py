@@ -1,8 +1,11 @@
 """Initialize all models."""
 from app.models.user import User, MemberLevel, Gender
 from app.models.point_transaction import PointTransaction, PointTransactionType, PointTransactionReason
-from app.models.benefit import Benefit, BenefitDistribution, BenefitType
+from app.models.benefit import Benefit, BenefitDistribution, BenefitDistributionArchive, BenefitType
 from app.models.order import Order, OrderStatus
+from app.models.point_checkpoint import PointBalanceCheckpoint
+from app.models.point_lot import PointLot
+from app.models.point_rollup import PointRollup
 from app.models.admin import AdminUser, Role, Permission, AuditLog, role_permissions, admin_user_roles
 
 __all__ = [
@@ -12,8 +15,12 @@ __all__ = [
     "PointTransaction",
     "PointTransactionType",
     "PointTransactionReason",
+    "PointBalanceCheckpoint",
+    "PointLot",
+    "PointRollup",
     "Benefit",
     "BenefitDistribution",
+    "BenefitDistributionArchive",
     "BenefitType",
     "Order",
     "OrderStatus",
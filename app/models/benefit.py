@@ -30,6 +30,11 @@ class Benefit(Base):
     member_level = Column(Enum(MemberLevel, native_enum=False, values_callable=_enum_values), nullable=False, index=True)
     value = Column(String(100))  # e.g., "100" for 100 points, "10%" for discount
 
+    # Total units that may ever be distributed; NULL means unlimited.
+    stock = Column(Integer)
+    # Remaining units as last reconciled from the Redis counter (informational).
+    stock_remaining = Column(Integer)
+
     is_active = Column(Boolean, default=True, nullable=False)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -50,8 +55,35 @@ class BenefitDistribution(Base):
 
     is_used = Column(Boolean, default=False, nullable=False)
     used_at = Column(DateTime(timezone=True))
+    # Client request key of the redemption, so a retried redeem is recognized.
+    used_request_key = Column(String(128))
 
     __table_args__ = (
         UniqueConstraint('user_id', 'benefit_id', 'period', name='uq_user_benefit_period'),
         Index('idx_user_expires', 'user_id', 'expires_at'),
+        # Archival scans expired rows oldest first.
+        Index('idx_benefit_distributions_expires', 'expires_at', 'id'),
+    )
+
+
+class BenefitDistributionArchive(Base):
+    """Expired benefit distribution moved out of ``benefit_distributions`` (same id)."""
+    __tablename__ = "benefit_distribution_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    benefit_id = Column(Integer, nullable=False)
+
+    period = Column(String(7), nullable=False)
+    distributed_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    is_used = Column(Boolean, nullable=False)
+    used_at = Column(DateTime(timezone=True))
+    used_request_key = Column(String(128))
+
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_benefit_archive_user_expires', 'user_id', 'expires_at'),
     )
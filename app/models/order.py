@@ -18,6 +18,25 @@ class OrderStatus(str, enum.Enum):
     REFUNDED = "refunded"
 
 
+# Allowed status changes; anything not listed is rejected.
+ORDER_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.PAID, OrderStatus.COMPLETED, OrderStatus.CANCELLED, OrderStatus.REFUNDED},
+    OrderStatus.PAID: {OrderStatus.COMPLETED, OrderStatus.CANCELLED, OrderStatus.REFUNDED},
+    OrderStatus.COMPLETED: {OrderStatus.REFUNDED},
+    OrderStatus.CANCELLED: set(),
+    OrderStatus.REFUNDED: set(),
+}
+
+
+def can_transition(current: OrderStatus, target: OrderStatus) -> bool:
+    return OrderStatus(target) in ORDER_TRANSITIONS[OrderStatus(current)]
+
+
+def transition_sources(target: OrderStatus) -> list:
+    """Statuses an order may be in to move to ``target``."""
+    return [status for status, targets in ORDER_TRANSITIONS.items() if OrderStatus(target) in targets]
+
+
 class Order(Base):
     """Order model."""
     __tablename__ = "orders"
@@ -33,6 +52,8 @@ class Order(Base):
         nullable=False,
         index=True,
     )
+    # Bumped by every status change; transitions are conditional on it.
+    version = Column(Integer, default=1, server_default="1", nullable=False)
 
     product_name = Column(String(200))
     product_description = Column(String(1000))
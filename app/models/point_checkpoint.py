@@ -0,0 +1,22 @@
+"""Point balance checkpoint model."""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class PointBalanceCheckpoint(Base):
+    """
+    Verified per-user balance as of a ledger position.
+
+    Reconciliation only needs to sum ledger rows after ``last_transaction_id``
+    and compare checkpoint + delta with the denormalized user balance.
+    """
+    __tablename__ = "point_balance_checkpoints"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_transaction_id = Column(Integer, nullable=False, default=0)
+    available_points = Column(Integer, nullable=False, default=0)
+    total_earned_points = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
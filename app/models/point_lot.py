@@ -0,0 +1,41 @@
+"""Point lot model."""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class PointLot(Base):
+    """
+    A batch of earned points with its own expiry date.
+
+    Every credit opens a lot; debits consume open lots FIFO (soonest expiry
+    first) and the expiry sweep zeroes whatever is left once ``expires_at``
+    passes. Balances earned before lots existed are not backed by a lot and
+    never expire.
+    """
+    __tablename__ = "point_lots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    transaction_id = Column(Integer, ForeignKey("point_transactions.id"), nullable=False)
+
+    points = Column(Integer, nullable=False)
+    remaining_points = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Partial indexes: only open lots are ever consumed or swept.
+        Index(
+            'idx_point_lots_user_open', 'user_id', 'expires_at', 'id',
+            postgresql_where=text('remaining_points > 0'),
+            sqlite_where=text('remaining_points > 0'),
+        ),
+        Index(
+            'idx_point_lots_expiry_open', 'expires_at', 'id',
+            postgresql_where=text('remaining_points > 0'),
+            sqlite_where=text('remaining_points > 0'),
+        ),
+    )
@@ -0,0 +1,32 @@
+"""Point rollup model."""
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+from app.models.point_transaction import PointTransactionReason
+
+
+def _enum_values(enum_cls):
+    return [e.value for e in enum_cls]
+
+
+class PointRollup(Base):
+    """
+    Monthly point totals per member and reason, maintained alongside the ledger.
+
+    ``period`` is the Beijing calendar month (``YYYY-MM``), matching the rest
+    of the app's period handling.
+    """
+    __tablename__ = "point_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    period = Column(String(7), primary_key=True)
+    reason = Column(
+        Enum(PointTransactionReason, native_enum=False, values_callable=_enum_values, length=50),
+        primary_key=True,
+    )
+
+    points_earned = Column(Integer, nullable=False, default=0)
+    points_spent = Column(Integer, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
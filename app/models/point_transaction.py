@@ -14,6 +14,7 @@ class PointTransactionType(str, enum.Enum):
     EARN = "earn"
     DEDUCT = "deduct"
     ADJUST = "adjust"
+    EXPIRE = "expire"
 
 
 class PointTransactionReason(str, enum.Enum):
@@ -22,6 +23,8 @@ class PointTransactionReason(str, enum.Enum):
     ORDER_REFUND = "order_refund"
     ADMIN_ADJUST = "admin_adjust"
     BENEFIT_REWARD = "benefit_reward"
+    POINTS_REDEEM = "points_redeem"
+    POINTS_EXPIRE = "points_expire"
 
 
 class PointTransaction(Base):
@@ -46,4 +49,5 @@ class PointTransaction(Base):
 
     __table_args__ = (
         Index('idx_point_transactions_user_created', 'user_id', 'created_at'),
+        Index('idx_point_transactions_user_id_id', 'user_id', 'id'),
     )
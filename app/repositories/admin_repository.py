@@ -1,7 +1,7 @@
 """Admin repository."""
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 from app.models.admin import AdminUser, Role, Permission, AuditLog, role_permissions, admin_user_roles
 
 
@@ -13,11 +13,11 @@ class AdminRepository:
 
     def get_admin_by_username(self, username: str) -> Optional[AdminUser]:
         """Get admin by username."""
-        return self.db.query(AdminUser).filter(AdminUser.username == username).first()
+        return self.db.scalars(select(AdminUser).where(AdminUser.username == username).limit(1)).first()
 
     def get_admin_by_id(self, admin_id: int) -> Optional[AdminUser]:
-        """Get admin by ID."""
-        return self.db.query(AdminUser).filter(AdminUser.id == admin_id).first()
+        """Get admin by ID (identity map first, then a cached primary-key load)."""
+        return self.db.get(AdminUser, admin_id)
 
     def get_admin_roles(self, admin_id: int) -> List[Role]:
         """Get admin roles."""
@@ -31,6 +31,15 @@ class AdminRepository:
             role_permissions, Permission.id == role_permissions.c.permission_id
         ).filter(role_permissions.c.role_id == role_id).all()
 
+    def get_admin_permissions(self, admin_id: int) -> List[tuple[str, str]]:
+        """Get (resource, action) pairs granted to an admin through all roles in one query."""
+        rows = self.db.query(Permission.resource, Permission.action).join(
+            role_permissions, Permission.id == role_permissions.c.permission_id
+        ).join(
+            admin_user_roles, role_permissions.c.role_id == admin_user_roles.c.role_id
+        ).filter(admin_user_roles.c.admin_user_id == admin_id).distinct().all()
+        return [(resource, action) for resource, action in rows]
+
     def create_audit_log(
         self,
         admin_user_id: int,
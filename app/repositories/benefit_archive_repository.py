@@ -0,0 +1,85 @@
+"""Benefit distribution archive repository."""
+from datetime import datetime
+from typing import List
+from sqlalchemy import delete, desc, func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.db.dialect import upsert_insert
+from app.models.benefit import Benefit, BenefitDistribution, BenefitDistributionArchive
+
+_COLUMNS = [
+    "id", "user_id", "benefit_id", "period", "distributed_at",
+    "expires_at", "is_used", "used_at", "used_request_key",
+]
+
+
+class BenefitArchiveRepository:
+    """Benefit distribution archive repository."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_expired_ids(self, cutoff: datetime, limit: int) -> List[int]:
+        """Ids of distributions that expired before ``cutoff``, oldest first, via the expiry index."""
+        stmt = select(BenefitDistribution.id).where(
+            BenefitDistribution.expires_at < cutoff
+        ).order_by(BenefitDistribution.expires_at, BenefitDistribution.id).limit(limit)
+        return list(self.db.scalars(stmt))
+
+    def archive(self, distribution_ids: List[int]) -> int:
+        """
+        Copy distributions into the archive and delete them. Does not commit.
+
+        The copy is ``INSERT ... SELECT ... ON CONFLICT (id) DO NOTHING``, so
+        re-running a batch that was archived but not deleted is harmless.
+
+        Returns:
+            Number of distributions deleted
+        """
+        if not distribution_ids:
+            return 0
+
+        source = select(*[getattr(BenefitDistribution, column) for column in _COLUMNS]).where(
+            BenefitDistribution.id.in_(distribution_ids)
+        )
+        stmt = upsert_insert(self.db, BenefitDistributionArchive.__table__).from_select(
+            _COLUMNS, source
+        ).on_conflict_do_nothing(index_elements=["id"])
+        self.db.execute(stmt)
+
+        result = self.db.execute(
+            delete(BenefitDistribution).where(BenefitDistribution.id.in_(distribution_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+    def list_user_archive(self, user_id: int, skip: int = 0, limit: int = 20) -> tuple[List[Row], int]:
+        """
+        List a user's archived distributions joined with their benefit, newest first.
+
+        Rows: (id, benefit_id, benefit_name, benefit_type, period,
+        distributed_at, expires_at, is_used, used_at).
+        """
+        total = self.db.execute(
+            select(func.count(BenefitDistributionArchive.id)).where(BenefitDistributionArchive.user_id == user_id)
+        ).scalar_one()
+
+        stmt = select(
+            BenefitDistributionArchive.id,
+            BenefitDistributionArchive.benefit_id,
+            Benefit.name.label("benefit_name"),
+            Benefit.benefit_type,
+            BenefitDistributionArchive.period,
+            BenefitDistributionArchive.distributed_at,
+            BenefitDistributionArchive.expires_at,
+            BenefitDistributionArchive.is_used,
+            BenefitDistributionArchive.used_at,
+        ).join(
+            Benefit, Benefit.id == BenefitDistributionArchive.benefit_id
+        ).where(
+            BenefitDistributionArchive.user_id == user_id
+        ).order_by(
+            desc(BenefitDistributionArchive.expires_at), desc(BenefitDistributionArchive.id)
+        ).offset(skip).limit(limit)
+
+        return self.db.execute(stmt).all(), total
@@ -1,10 +1,12 @@
 """Benefit repository."""
 from typing import Optional, List
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, func, select, update, literal, Boolean, DateTime, Integer, String
 from datetime import datetime
-from app.models.benefit import Benefit, BenefitDistribution, BenefitType
-from app.models.user import MemberLevel
+from app.db.dialect import upsert_insert
+from app.models.benefit import Benefit, BenefitDistribution, BenefitDistributionArchive, BenefitType
+from app.models.user import User, MemberLevel
 
 
 class BenefitRepository:
@@ -23,7 +25,8 @@ class BenefitRepository:
         benefit_type: BenefitType,
         member_level: MemberLevel,
         description: str = None,
-        value: str = None
+        value: str = None,
+        stock: int = None
     ) -> Benefit:
         """Create benefit."""
         benefit = Benefit(
@@ -32,6 +35,8 @@ class BenefitRepository:
             benefit_type=benefit_type,
             member_level=member_level,
             value=value,
+            stock=stock,
+            stock_remaining=stock,
             is_active=True
         )
         self.db.add(benefit)
@@ -47,6 +52,43 @@ class BenefitRepository:
             )
         ).all()
 
+    def list_limited_stock(self) -> List[tuple[int, int]]:
+        """(benefit_id, stock) of every benefit with a stock limit."""
+        stmt = select(Benefit.id, Benefit.stock).where(Benefit.stock.isnot(None)).order_by(Benefit.id)
+        return [(benefit_id, stock) for benefit_id, stock in self.db.execute(stmt)]
+
+    def count_distributions(self, benefit_id: int) -> int:
+        """Distributions ever made of a benefit, archived ones included."""
+        live = self.db.execute(
+            select(func.count(BenefitDistribution.id)).where(BenefitDistribution.benefit_id == benefit_id)
+        ).scalar_one()
+        archived = self.db.execute(
+            select(func.count(BenefitDistributionArchive.id)).where(BenefitDistributionArchive.benefit_id == benefit_id)
+        ).scalar_one()
+        return live + archived
+
+    def lock_stock(self, benefit_id: int) -> None:
+        """
+        Lock a benefit row until the transaction ends. Does not commit.
+
+        FOR UPDATE conflicts with the key-share lock every distribution
+        INSERT takes on its benefit row, so this waits for inserted but
+        uncommitted distributions and holds off new ones.
+        """
+        self.db.execute(select(Benefit.id).where(Benefit.id == benefit_id).with_for_update())
+
+    def set_stock_remaining(self, remaining: dict) -> None:
+        """Store reconciled remaining stock per benefit id. Does not commit."""
+        for benefit_id, value in remaining.items():
+            self.db.execute(
+                update(Benefit).where(Benefit.id == benefit_id).values(stock_remaining=value),
+                execution_options={"synchronize_session": False},
+            )
+
+    def list_catalog(self) -> List[Benefit]:
+        """List every benefit, active or not, in id order."""
+        return self.db.query(Benefit).order_by(Benefit.id).all()
+
     def list_all(self, skip: int = 0, limit: int = 50) -> tuple[List[Benefit], int]:
         """List all benefits."""
         query = self.db.query(Benefit)
@@ -89,14 +131,201 @@ class BenefitRepository:
         self.db.flush()
         return distribution
 
+    def get_user_distribution(self, distribution_id: int, user_id: int) -> Optional[BenefitDistribution]:
+        """Get a distribution owned by the user."""
+        return self.db.query(BenefitDistribution).filter(
+            and_(
+                BenefitDistribution.id == distribution_id,
+                BenefitDistribution.user_id == user_id
+            )
+        ).first()
+
+    def mark_used(self, distribution_id: int, user_id: int, request_key: str, now: datetime) -> Optional[Row]:
+        """
+        Mark a distribution used with one conditional UPDATE ... RETURNING.
+
+        Only an unused, unexpired distribution owned by the user is updated, so
+        concurrent redemptions of the same distribution have exactly one
+        winner. Does not commit.
+
+        Returns:
+            The updated distribution's columns (attribute access like the
+            model), or None if nothing matched
+        """
+        stmt = update(BenefitDistribution).where(
+            BenefitDistribution.id == distribution_id,
+            BenefitDistribution.user_id == user_id,
+            BenefitDistribution.is_used == False,
+            BenefitDistribution.expires_at > now,
+        ).values(
+            is_used=True,
+            used_at=now,
+            used_request_key=request_key,
+        ).returning(
+            BenefitDistribution.id,
+            BenefitDistribution.benefit_id,
+            BenefitDistribution.period,
+            BenefitDistribution.distributed_at,
+            BenefitDistribution.expires_at,
+            BenefitDistribution.is_used,
+            BenefitDistribution.used_at,
+        )
+
+        return self.db.execute(stmt, execution_options={"synchronize_session": False}).first()
+
+    def distribute_range(self, period: str, expires_at: datetime, start_id: int, end_id: int) -> int:
+        """
+        Distribute a period's active benefits to users with ``start_id <= id < end_id``.
+
+        One ``INSERT INTO benefit_distributions SELECT ... FROM users JOIN
+        benefits ON member_level ... ON CONFLICT (user_id, benefit_id, period)
+        DO NOTHING``, so users who already received a benefit this period are
+        skipped. Limited-stock benefits are left to the per-request path,
+        which claims their stock one unit at a time. Does not commit.
+
+        Returns:
+            Number of distributions inserted
+        """
+        source = select(
+            User.id,
+            Benefit.id,
+            literal(period, String(7)),
+            literal(expires_at, DateTime(timezone=True)),
+            literal(False, Boolean),
+        ).join(
+            Benefit, and_(
+                Benefit.member_level == User.member_level,
+                Benefit.is_active == True,
+                Benefit.stock.is_(None),
+            )
+        ).where(
+            User.id >= start_id, User.id < end_id
+        )
+
+        stmt = upsert_insert(self.db, BenefitDistribution.__table__).from_select(
+            ["user_id", "benefit_id", "period", "expires_at", "is_used"], source
+        ).on_conflict_do_nothing(index_elements=["user_id", "benefit_id", "period"])
+        return self.db.execute(stmt).rowcount
+
+    def distribute_pairs(self, pairs: List[tuple[int, int]], period: str, expires_at: datetime) -> int:
+        """
+        Distribute (user_id, benefit_id) pairs for a period with one multi-row
+        INSERT ... ON CONFLICT (user_id, benefit_id, period) DO NOTHING. Does not commit.
+
+        Returns:
+            Number of distributions inserted
+        """
+        if not pairs:
+            return 0
+        stmt = upsert_insert(self.db, BenefitDistribution.__table__).values([
+            {"user_id": user_id, "benefit_id": benefit_id, "period": period, "expires_at": expires_at, "is_used": False}
+            for user_id, benefit_id in pairs
+        ]).on_conflict_do_nothing(index_elements=["user_id", "benefit_id", "period"])
+        return self.db.execute(stmt).rowcount
+
+    def distribute_segment(
+        self,
+        benefit_id: int,
+        period: str,
+        expires_at: datetime,
+        start_id: int = None,
+        end_id: int = None,
+        user_ids: List[int] = None,
+        member_level: MemberLevel = None,
+        created_from: datetime = None,
+        created_before: datetime = None,
+        min_points: int = None,
+        max_points: int = None,
+    ) -> int:
+        """
+        Distribute one benefit to the users matching every given filter.
+
+        One ``INSERT INTO benefit_distributions SELECT ... FROM users WHERE
+        ... ON CONFLICT (user_id, benefit_id, period) DO NOTHING``; ids that do
+        not exist are simply not selected. Does not commit.
+
+        Returns:
+            Number of distributions inserted
+        """
+        conditions = []
+        if start_id is not None:
+            conditions.append(User.id >= start_id)
+        if end_id is not None:
+            conditions.append(User.id < end_id)
+        if user_ids is not None:
+            conditions.append(User.id.in_(user_ids))
+        if member_level is not None:
+            conditions.append(User.member_level == member_level)
+        if created_from is not None:
+            conditions.append(User.created_at >= created_from)
+        if created_before is not None:
+            conditions.append(User.created_at < created_before)
+        if min_points is not None:
+            conditions.append(User.available_points >= min_points)
+        if max_points is not None:
+            conditions.append(User.available_points <= max_points)
+
+        source = select(
+            User.id,
+            literal(benefit_id, Integer),
+            literal(period, String(7)),
+            literal(expires_at, DateTime(timezone=True)),
+            literal(False, Boolean),
+        ).where(*conditions)
+
+        stmt = upsert_insert(self.db, BenefitDistribution.__table__).from_select(
+            ["user_id", "benefit_id", "period", "expires_at", "is_used"], source
+        ).on_conflict_do_nothing(index_elements=["user_id", "benefit_id", "period"])
+        return self.db.execute(stmt).rowcount
+
     def list_user_distributions(
         self,
         user_id: int,
         skip: int = 0,
-        limit: int = 20
-    ) -> tuple[List[BenefitDistribution], int]:
-        """List user benefit distributions."""
-        query = self.db.query(BenefitDistribution).filter(BenefitDistribution.user_id == user_id)
-        total = query.count()
-        distributions = query.order_by(desc(BenefitDistribution.distributed_at)).offset(skip).limit(limit).all()
-        return distributions, total
+        limit: int = 20,
+        active_only: bool = False,
+        unused_only: bool = False,
+        now: datetime = None,
+    ) -> tuple[List[Row], int]:
+        """
+        List user benefit distributions joined with their benefit, newest first.
+
+        One column-projected query over (user_id, expires_at) via
+        ``idx_user_expires``; the count uses the same filters without the join.
+
+        Args:
+            active_only: Only distributions with ``expires_at > now`` (``now`` is required then)
+            unused_only: Only distributions not used yet
+
+        Rows: (id, benefit_id, benefit_name, benefit_type, period,
+        distributed_at, expires_at, is_used, used_at).
+        """
+        conditions = [BenefitDistribution.user_id == user_id]
+        if active_only:
+            conditions.append(BenefitDistribution.expires_at > now)
+        if unused_only:
+            conditions.append(BenefitDistribution.is_used == False)
+
+        total = self.db.execute(
+            select(func.count(BenefitDistribution.id)).where(*conditions)
+        ).scalar_one()
+
+        stmt = select(
+            BenefitDistribution.id,
+            BenefitDistribution.benefit_id,
+            Benefit.name.label("benefit_name"),
+            Benefit.benefit_type,
+            BenefitDistribution.period,
+            BenefitDistribution.distributed_at,
+            BenefitDistribution.expires_at,
+            BenefitDistribution.is_used,
+            BenefitDistribution.used_at,
+        ).join(
+            Benefit, Benefit.id == BenefitDistribution.benefit_id
+        ).where(
+            *conditions
+        ).order_by(
+            desc(BenefitDistribution.distributed_at), desc(BenefitDistribution.id)
+        ).offset(skip).limit(limit)
+
+        return self.db.execute(stmt).all(), total
@@ -1,9 +1,10 @@
 """Order repository."""
-from typing import Optional, List
+from typing import Optional, List, Iterator
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, select, update, func
 from datetime import datetime
-from app.models.order import Order, OrderStatus
+from app.models.order import Order, OrderStatus, transition_sources
 
 
 class OrderRepository:
@@ -13,12 +14,66 @@ class OrderRepository:
         self.db = db
 
     def get_by_id(self, order_id: int) -> Optional[Order]:
-        """Get order by ID."""
-        return self.db.query(Order).filter(Order.id == order_id).first()
+        """Get order by ID (identity map first, then a cached primary-key load)."""
+        return self.db.get(Order, order_id)
 
     def get_by_order_no(self, order_no: str) -> Optional[Order]:
         """Get order by order number."""
-        return self.db.query(Order).filter(Order.order_no == order_no).first()
+        return self.db.scalars(select(Order).where(Order.order_no == order_no).limit(1)).first()
+
+    def claim_for_completion(self, order_ids: List[int], completed_at: datetime) -> List[tuple[int, int, object]]:
+        """
+        Mark pending/paid orders completed in one conditional UPDATE.
+
+        Orders that are missing, already completed, cancelled or refunded are
+        left untouched, so each order is claimed by exactly one caller. Does not
+        commit.
+
+        Returns:
+            (order_id, user_id, amount) for every order that was claimed
+        """
+        if not order_ids:
+            return []
+
+        stmt = update(Order).where(
+            Order.id.in_(order_ids),
+            Order.status.in_(transition_sources(OrderStatus.COMPLETED)),
+        ).values(
+            status=OrderStatus.COMPLETED,
+            version=Order.version + 1,
+            completed_at=completed_at,
+            paid_at=func.coalesce(Order.paid_at, completed_at),
+        ).returning(Order.id, Order.user_id, Order.amount)
+
+        rows = self.db.execute(stmt, execution_options={"synchronize_session": False}).all()
+        return [(order_id, user_id, amount) for order_id, user_id, amount in rows]
+
+    def transition(self, order_id: int, expected_version: int, target: OrderStatus, **values) -> Optional[Row]:
+        """
+        Move an order to ``target`` with one conditional UPDATE.
+
+        ``WHERE id = :id AND version = :version AND status IN (...)``: the
+        update only applies if nobody changed the order since it was read at
+        ``expected_version`` and the transition table allows it, so concurrent
+        transitions resolve without row locks. Does not commit.
+
+        Args:
+            values: Extra columns to set, e.g. ``completed_at``
+
+        Returns:
+            (id, user_id, amount, status, version) after the update, or None if it did not apply
+        """
+        stmt = update(Order).where(
+            Order.id == order_id,
+            Order.version == expected_version,
+            Order.status.in_(transition_sources(target)),
+        ).values(
+            status=target,
+            version=Order.version + 1,
+            **values,
+        ).returning(Order.id, Order.user_id, Order.amount, Order.status, Order.version)
+
+        return self.db.execute(stmt, execution_options={"synchronize_session": False}).first()
 
     def list_by_user(
         self,
@@ -45,6 +100,41 @@ class OrderRepository:
         orders = query.order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
         return orders, total
 
+    def iter_all(
+        self,
+        status: OrderStatus = None,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        yield_per: int = 1000,
+    ) -> Iterator[Row]:
+        """
+        Stream orders oldest first through a server-side cursor (admin export).
+
+        Rows: (id, order_no, user_id, amount, status, product_name, paid_at,
+        completed_at, cancelled_at, refunded_at, created_at).
+        """
+        stmt = select(
+            Order.id,
+            Order.order_no,
+            Order.user_id,
+            Order.amount,
+            Order.status,
+            Order.product_name,
+            Order.paid_at,
+            Order.completed_at,
+            Order.cancelled_at,
+            Order.refunded_at,
+            Order.created_at,
+        )
+        if status:
+            stmt = stmt.where(Order.status == status)
+        if start_date:
+            stmt = stmt.where(Order.created_at >= start_date)
+        if end_date:
+            stmt = stmt.where(Order.created_at <= end_date)
+        stmt = stmt.order_by(Order.id).execution_options(yield_per=yield_per)
+        return iter(self.db.execute(stmt))
+
     def list_all(
         self,
         status: OrderStatus = None,
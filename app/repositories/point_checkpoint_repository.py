@@ -0,0 +1,81 @@
+"""Point balance checkpoint repository."""
+from typing import Iterator, List
+from sqlalchemy import func, case, select, and_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.db.dialect import upsert_insert
+from app.models.point_checkpoint import PointBalanceCheckpoint
+from app.models.point_transaction import PointTransaction
+from app.models.user import User
+
+
+class PointCheckpointRepository:
+    """Point balance checkpoint repository."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def iter_balances(self, start_id: int, end_id: int, yield_per: int = 1000) -> Iterator[Row]:
+        """
+        Stream user balances joined with their checkpoint for ``start_id <= id < end_id``.
+
+        Rows: (user_id, available_points, total_earned_points,
+        checkpoint_transaction_id, checkpoint_available, checkpoint_earned).
+        """
+        stmt = select(
+            User.id,
+            User.available_points,
+            User.total_earned_points,
+            func.coalesce(PointBalanceCheckpoint.last_transaction_id, 0),
+            func.coalesce(PointBalanceCheckpoint.available_points, 0),
+            func.coalesce(PointBalanceCheckpoint.total_earned_points, 0),
+        ).outerjoin(
+            PointBalanceCheckpoint, PointBalanceCheckpoint.user_id == User.id
+        ).where(
+            User.id >= start_id, User.id < end_id
+        ).order_by(User.id).execution_options(yield_per=yield_per)
+
+        return iter(self.db.execute(stmt))
+
+    def iter_ledger_deltas(self, start_id: int, end_id: int, yield_per: int = 1000) -> Iterator[Row]:
+        """
+        Stream per-user ledger totals after each user's checkpoint for ``start_id <= user_id < end_id``.
+
+        Aggregation runs in the database over the (user_id, id) index and the
+        grouped rows come back through a server-side cursor.
+
+        Rows: (user_id, points, earned_points, last_transaction_id, transaction_count).
+        """
+        stmt = select(
+            PointTransaction.user_id,
+            func.sum(PointTransaction.points),
+            func.sum(case((PointTransaction.points > 0, PointTransaction.points), else_=0)),
+            func.max(PointTransaction.id),
+            func.count(PointTransaction.id),
+        ).outerjoin(
+            PointBalanceCheckpoint, PointBalanceCheckpoint.user_id == PointTransaction.user_id
+        ).where(
+            and_(
+                PointTransaction.user_id >= start_id,
+                PointTransaction.user_id < end_id,
+                PointTransaction.id > func.coalesce(PointBalanceCheckpoint.last_transaction_id, 0),
+            )
+        ).group_by(PointTransaction.user_id).execution_options(yield_per=yield_per)
+
+        return iter(self.db.execute(stmt))
+
+    def upsert(self, rows: List[dict]) -> None:
+        """Insert or move forward checkpoints. Does not commit."""
+        if not rows:
+            return
+        stmt = upsert_insert(self.db, PointBalanceCheckpoint.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "last_transaction_id": stmt.excluded.last_transaction_id,
+                "available_points": stmt.excluded.available_points,
+                "total_earned_points": stmt.excluded.total_earned_points,
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt, rows)
@@ -0,0 +1,89 @@
+"""Point lot repository."""
+from datetime import datetime
+from typing import List
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models.point_lot import PointLot
+
+
+class PointLotRepository:
+    """
+    Point lot repository.
+
+    Lot changes for a user must happen while that user's row is locked (every
+    balance UPDATE takes the lock), which keeps lots and balances in step.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, user_id: int, transaction_id: int, points: int, expires_at: datetime) -> PointLot:
+        """Open a lot. Does not commit."""
+        lot = PointLot(
+            user_id=user_id,
+            transaction_id=transaction_id,
+            points=points,
+            remaining_points=points,
+            expires_at=expires_at,
+        )
+        self.db.add(lot)
+        self.db.flush()
+        return lot
+
+    def bulk_create(self, rows: List[dict]) -> None:
+        """Open many lots with one multi-row INSERT. Does not commit."""
+        if rows:
+            self.db.execute(PointLot.__table__.insert(), [
+                {**row, "remaining_points": row["points"]} for row in rows
+            ])
+
+    def consume(self, user_id: int, points: int) -> int:
+        """
+        Take ``points`` from the user's open lots, soonest expiry first. Does not commit.
+
+        Returns:
+            Points actually taken from lots; the rest came from balance not backed by a lot
+        """
+        updates = []
+        left = points
+        stmt = select(PointLot.id, PointLot.remaining_points).where(
+            PointLot.user_id == user_id,
+            PointLot.remaining_points > 0,
+        ).order_by(PointLot.expires_at, PointLot.id)
+
+        for lot_id, remaining in self.db.execute(stmt).all():
+            if left <= 0:
+                break
+            taken = min(remaining, left)
+            updates.append({"id": lot_id, "remaining_points": remaining - taken})
+            left -= taken
+
+        if updates:
+            self.db.execute(update(PointLot), updates)
+        return points - left
+
+    def list_due(self, now: datetime, limit: int) -> List[tuple[int, int]]:
+        """(lot_id, user_id) of open lots expired at ``now``, in expiry order, via the partial expiry index."""
+        stmt = select(PointLot.id, PointLot.user_id).where(
+            PointLot.remaining_points > 0,
+            PointLot.expires_at <= now,
+        ).order_by(PointLot.expires_at, PointLot.id).limit(limit)
+        return [(lot_id, user_id) for lot_id, user_id in self.db.execute(stmt)]
+
+    def get_open(self, lot_ids: List[int]) -> List[tuple[int, int, int]]:
+        """(lot_id, user_id, remaining_points) for the given lots that are still open."""
+        if not lot_ids:
+            return []
+        stmt = select(PointLot.id, PointLot.user_id, PointLot.remaining_points).where(
+            PointLot.id.in_(lot_ids),
+            PointLot.remaining_points > 0,
+        ).order_by(PointLot.id)
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def close(self, lot_ids: List[int]) -> None:
+        """Zero the remaining points of the given lots. Does not commit."""
+        if lot_ids:
+            self.db.execute(
+                update(PointLot).where(PointLot.id.in_(lot_ids)).values(remaining_points=0),
+                execution_options={"synchronize_session": False},
+            )
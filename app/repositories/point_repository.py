@@ -1,7 +1,9 @@
 """Point transaction repository."""
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterator
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
+from app.db.dialect import upsert_insert
 from datetime import datetime
 from app.models.point_transaction import PointTransaction, PointTransactionType, PointTransactionReason
 
@@ -40,12 +42,65 @@ class PointRepository:
         self.db.flush()
         return transaction
 
+    def bulk_create(self, rows: List[dict]) -> Dict[str, int]:
+        """
+        Insert many ledger rows with multi-row INSERT ... ON CONFLICT (idempotency_key) DO NOTHING.
+
+        Does not commit.
+
+        Returns:
+            idempotency_key -> transaction id for the rows actually inserted
+        """
+        if not rows:
+            return {}
+        stmt = upsert_insert(self.db, PointTransaction.__table__).on_conflict_do_nothing(
+            index_elements=["idempotency_key"]
+        ).returning(PointTransaction.idempotency_key, PointTransaction.id)
+        return {key: transaction_id for key, transaction_id in self.db.execute(stmt, rows)}
+
+    def existing_idempotency_keys(self, keys: List[str]) -> set[str]:
+        """Return the subset of idempotency keys already present in the ledger."""
+        if not keys:
+            return set()
+        return set(self.db.scalars(
+            select(PointTransaction.idempotency_key).where(PointTransaction.idempotency_key.in_(keys))
+        ))
+
     def get_by_idempotency_key(self, idempotency_key: str) -> Optional[PointTransaction]:
         """Get transaction by idempotency key."""
         return self.db.query(PointTransaction).filter(
             PointTransaction.idempotency_key == idempotency_key
         ).first()
 
+    def iter_by_user(
+        self,
+        user_id: int,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        yield_per: int = 1000,
+    ) -> Iterator[Row]:
+        """
+        Stream a user's transactions oldest first through a server-side cursor.
+
+        Rows: (id, transaction_type, reason, points, balance_after, order_id, description, created_at).
+        """
+        stmt = select(
+            PointTransaction.id,
+            PointTransaction.transaction_type,
+            PointTransaction.reason,
+            PointTransaction.points,
+            PointTransaction.balance_after,
+            PointTransaction.order_id,
+            PointTransaction.description,
+            PointTransaction.created_at,
+        ).where(PointTransaction.user_id == user_id)
+        if start_date:
+            stmt = stmt.where(PointTransaction.created_at >= start_date)
+        if end_date:
+            stmt = stmt.where(PointTransaction.created_at <= end_date)
+        stmt = stmt.order_by(PointTransaction.id).execution_options(yield_per=yield_per)
+        return iter(self.db.execute(stmt))
+
     def list_by_user(
         self,
         user_id: int,
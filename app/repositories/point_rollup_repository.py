@@ -0,0 +1,96 @@
+"""Point rollup repository."""
+from collections import defaultdict
+from typing import Iterable, List
+from sqlalchemy import select, delete, insert, func, case
+from sqlalchemy.orm import Session
+from app.db.dialect import upsert_insert, beijing_period
+from app.models.point_rollup import PointRollup
+from app.models.point_transaction import PointTransaction, PointTransactionReason
+
+
+class PointRollupRepository:
+    """
+    Point rollup repository.
+
+    Like point lots, a user's rollup rows are only written while that user's
+    row is locked, so increments never race a rebuild.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, period: str, entries: Iterable[tuple[int, PointTransactionReason, int]]) -> None:
+        """
+        Add ledger entries (user_id, reason, points) to the period's rollups. Does not commit.
+
+        Entries are aggregated first, so the upsert touches each row once.
+        """
+        totals = defaultdict(lambda: [0, 0, 0])
+        for user_id, reason, points in entries:
+            total = totals[(user_id, reason)]
+            if points >= 0:
+                total[0] += points
+            else:
+                total[1] -= points
+            total[2] += 1
+        if not totals:
+            return
+
+        stmt = upsert_insert(self.db, PointRollup.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "period", "reason"],
+            set_={
+                "points_earned": PointRollup.__table__.c.points_earned + stmt.excluded.points_earned,
+                "points_spent": PointRollup.__table__.c.points_spent + stmt.excluded.points_spent,
+                "transaction_count": PointRollup.__table__.c.transaction_count + stmt.excluded.transaction_count,
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt, [
+            {
+                "user_id": user_id,
+                "period": period,
+                "reason": reason,
+                "points_earned": earned,
+                "points_spent": spent,
+                "transaction_count": count,
+            }
+            for (user_id, reason), (earned, spent, count) in totals.items()
+        ])
+
+    def list_by_user(self, user_id: int, start_period: str = None, end_period: str = None) -> List[PointRollup]:
+        """List a user's rollups for ``start_period <= period <= end_period``, oldest first."""
+        stmt = select(PointRollup).where(PointRollup.user_id == user_id)
+        if start_period:
+            stmt = stmt.where(PointRollup.period >= start_period)
+        if end_period:
+            stmt = stmt.where(PointRollup.period <= end_period)
+        return list(self.db.scalars(stmt.order_by(PointRollup.period, PointRollup.reason)))
+
+    def rebuild(self, start_id: int, end_id: int) -> int:
+        """
+        Recompute rollups from the ledger for ``start_id <= user_id < end_id``. Does not commit.
+
+        Returns:
+            Number of rollup rows written
+        """
+        self.db.execute(delete(PointRollup).where(PointRollup.user_id >= start_id, PointRollup.user_id < end_id))
+
+        period = beijing_period(self.db, PointTransaction.created_at)
+        aggregated = select(
+            PointTransaction.user_id,
+            period,
+            PointTransaction.reason,
+            func.sum(case((PointTransaction.points > 0, PointTransaction.points), else_=0)),
+            func.sum(case((PointTransaction.points < 0, -PointTransaction.points), else_=0)),
+            func.count(PointTransaction.id),
+        ).where(
+            PointTransaction.user_id >= start_id,
+            PointTransaction.user_id < end_id,
+        ).group_by(PointTransaction.user_id, period, PointTransaction.reason)
+
+        result = self.db.execute(insert(PointRollup).from_select(
+            ["user_id", "period", "reason", "points_earned", "points_spent", "transaction_count"],
+            aggregated,
+        ))
+        return result.rowcount
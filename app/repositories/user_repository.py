@@ -1,7 +1,10 @@
 """User repository for database operations."""
-from typing import Optional, List
+import csv
+import io
+from typing import Optional, List, Iterable, Dict
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select, text, update
+from app.db.dialect import is_postgresql, upsert_insert
 from app.models.user import User, MemberLevel
 
 
@@ -12,12 +15,12 @@ class UserRepository:
         self.db = db
 
     def get_by_id(self, user_id: int) -> Optional[User]:
-        """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        """Get user by ID (identity map first, then a cached primary-key load)."""
+        return self.db.get(User, user_id)
 
     def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
-        return self.db.query(User).filter(User.email == email).first()
+        return self.db.scalars(select(User).where(User.email == email).limit(1)).first()
 
     def create(self, email: str, nickname: str = None) -> User:
         """Create new user."""
@@ -34,6 +37,247 @@ class UserRepository:
         self.db.refresh(user)
         return user
 
+    def apply_point_delta(
+        self,
+        user_id: int,
+        delta: int,
+        earned_delta: int = 0,
+    ) -> Optional[tuple[int, int, MemberLevel]]:
+        """
+        Atomically add ``delta`` to a user's available points in SQL.
+
+        Runs ``UPDATE users SET available_points = available_points + :delta ...
+        RETURNING``; the row lock it takes is held until the caller commits.
+        Deductions are guarded with ``available_points >= -delta`` so the
+        balance can never go negative. Does not commit.
+
+        Returns:
+            (available_points, total_earned_points, member_level) after the
+            update, or None if the user does not exist or the balance is insufficient
+        """
+        stmt = update(User).where(User.id == user_id)
+        if delta < 0:
+            stmt = stmt.where(User.available_points >= -delta)
+
+        stmt = stmt.values(
+            available_points=User.available_points + delta,
+            total_earned_points=User.total_earned_points + earned_delta,
+        ).returning(User.available_points, User.total_earned_points, User.member_level)
+
+        row = self.db.execute(stmt, execution_options={"synchronize_session": False}).first()
+        return (row[0], row[1], row[2]) if row else None
+
+    def lock_for_update(self, user_ids: Iterable[int]) -> None:
+        """
+        Lock user rows in id order (PostgreSQL only; SQLite serializes writers anyway).
+
+        Locking in a fixed order keeps concurrent batch writers from deadlocking.
+        """
+        user_ids = sorted(set(user_ids))
+        if user_ids and is_postgresql(self.db):
+            self.db.execute(
+                select(User.id).where(User.id.in_(user_ids)).order_by(User.id).with_for_update()
+            ).all()
+
+    def id_bounds(self) -> tuple[Optional[int], Optional[int]]:
+        """Get (min, max) user id."""
+        return tuple(self.db.execute(select(func.min(User.id), func.max(User.id))).one())
+
+    def lock_id_range(self, start_id: int, end_id: int) -> None:
+        """Lock users with ``start_id <= id < end_id`` in id order (PostgreSQL only)."""
+        if is_postgresql(self.db):
+            self.db.execute(
+                select(User.id).where(User.id >= start_id, User.id < end_id).order_by(User.id).with_for_update()
+            ).all()
+
+    def apply_point_deltas(
+        self,
+        deltas: Dict[int, tuple[int, int]],
+        guard_balance: bool = True,
+    ) -> Dict[int, tuple[int, int, MemberLevel]]:
+        """
+        Apply many per-user point deltas with one set-based UPDATE.
+
+        Runs ``WITH v(id, delta, earned) AS (VALUES ...) UPDATE users ... FROM v
+        ... RETURNING``. Callers updating many users should take
+        ``lock_for_update`` first so concurrent batches lock rows in the same
+        order. Does not commit.
+
+        Args:
+            deltas: user_id -> (available_points delta, total_earned_points delta)
+            guard_balance: Skip users whose balance would go negative
+
+        Returns:
+            user_id -> (available_points, total_earned_points, member_level)
+            after the update, for updated users only
+        """
+        if not deltas:
+            return {}
+
+        user_ids = sorted(deltas)
+        params = {}
+        values = []
+        for i, user_id in enumerate(user_ids):
+            delta, earned = deltas[user_id]
+            params.update({f"id_{i}": user_id, f"delta_{i}": delta, f"earned_{i}": earned})
+            values.append(
+                f"(CAST(:id_{i} AS INTEGER), CAST(:delta_{i} AS INTEGER), CAST(:earned_{i} AS INTEGER))"
+            )
+
+        guard = " AND users.available_points + v.delta >= 0" if guard_balance else ""
+        rows = self.db.execute(text(
+            f"WITH v(id, delta, earned) AS (VALUES {', '.join(values)}) "
+            "UPDATE users SET "
+            "available_points = users.available_points + v.delta, "
+            "total_earned_points = users.total_earned_points + v.earned, "
+            "updated_at = CURRENT_TIMESTAMP "
+            f"FROM v WHERE users.id = v.id{guard} "
+            "RETURNING users.id, users.available_points, users.total_earned_points, users.member_level"
+        ), params).all()
+        return {
+            user_id: (available, earned, MemberLevel(level))
+            for user_id, available, earned, level in rows
+        }
+
+    def list_level_states(self, after_id: int, limit: int) -> List[tuple[int, int, MemberLevel]]:
+        """Keyset page of (id, total_earned_points, member_level) for users with id > after_id."""
+        stmt = select(User.id, User.total_earned_points, User.member_level).where(
+            User.id > after_id
+        ).order_by(User.id).limit(limit)
+        return [(user_id, earned, level) for user_id, earned, level in self.db.execute(stmt)]
+
+    def get_balances(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Current available points of each existing user, in one query."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        stmt = select(User.id, User.available_points).where(User.id.in_(user_ids))
+        return {user_id: points for user_id, points in self.db.execute(stmt)}
+
+    def get_levels(self, user_ids: Iterable[int]) -> Dict[int, MemberLevel]:
+        """Current member level of each existing user, in one query."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        stmt = select(User.id, User.member_level).where(User.id.in_(user_ids))
+        return {user_id: level for user_id, level in self.db.execute(stmt)}
+
+    def get_levels_in_range(self, start_id: int, end_id: int) -> Dict[int, MemberLevel]:
+        """Member level of each user with ``start_id <= id < end_id``, in one query."""
+        stmt = select(User.id, User.member_level).where(User.id >= start_id, User.id < end_id)
+        return {user_id: level for user_id, level in self.db.execute(stmt)}
+
+    def set_levels(self, changes: Dict[int, tuple[MemberLevel, MemberLevel]]) -> List[int]:
+        """
+        Move users from an expected level to a new one with one UPDATE ... FROM (VALUES ...).
+
+        A user whose level no longer equals the expected old level (changed
+        concurrently, e.g. by an admin) is left alone. Does not commit.
+
+        Args:
+            changes: user_id -> (old level, new level)
+
+        Returns:
+            Ids of the users actually updated
+        """
+        if not changes:
+            return []
+
+        params = {}
+        values = []
+        for i, (user_id, (old, new)) in enumerate(sorted(changes.items())):
+            params.update({f"id_{i}": user_id, f"old_{i}": old.value, f"new_{i}": new.value})
+            values.append(f"(CAST(:id_{i} AS INTEGER), CAST(:old_{i} AS VARCHAR(20)), CAST(:new_{i} AS VARCHAR(20)))")
+
+        rows = self.db.execute(text(
+            f"WITH v(id, old_level, new_level) AS (VALUES {', '.join(values)}) "
+            "UPDATE users SET member_level = v.new_level, updated_at = CURRENT_TIMESTAMP "
+            "FROM v WHERE users.id = v.id AND users.member_level = v.old_level "
+            "RETURNING users.id"
+        ), params).all()
+        return [user_id for (user_id,) in rows]
+
+    def existing_ids(self, user_ids: Iterable[int]) -> set[int]:
+        """Return the subset of user ids that exist."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        return set(self.db.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+    def existing_emails(self, emails: Iterable[str]) -> set[str]:
+        """Return the subset of emails that already belong to a user."""
+        emails = list(emails)
+        if not emails:
+            return set()
+        rows = self.db.query(User.email).filter(User.email.in_(emails)).all()
+        return {email for (email,) in rows}
+
+    def bulk_insert_members(self, rows: List[dict]) -> int:
+        """
+        Insert members in bulk, skipping emails that already exist.
+
+        PostgreSQL loads rows with COPY into a temporary staging table and then
+        moves them with INSERT ... SELECT ... ON CONFLICT (email) DO NOTHING, so a
+        concurrent registration never aborts the whole chunk. Other dialects fall
+        back to executemany. Does not commit.
+
+        Args:
+            rows: Dicts with email, nickname and member_level
+
+        Returns:
+            Number of users actually inserted
+        """
+        if not rows:
+            return 0
+
+        if not is_postgresql(self.db):
+            stmt = upsert_insert(self.db, User.__table__).on_conflict_do_nothing(index_elements=["email"])
+            result = self.db.execute(
+                stmt,
+                [
+                    {
+                        "email": row["email"],
+                        "nickname": row.get("nickname"),
+                        "member_level": row.get("member_level") or MemberLevel.BRONZE,
+                        "available_points": 0,
+                        "total_earned_points": 0,
+                        "is_locked": False,
+                    }
+                    for row in rows
+                ],
+            )
+            return max(result.rowcount, 0)
+
+        self.db.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS member_import_staging ("
+            "email VARCHAR(255), nickname VARCHAR(100), member_level VARCHAR(20))"
+        ))
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            level = row.get("member_level") or MemberLevel.BRONZE
+            writer.writerow([row["email"], row.get("nickname") or "", MemberLevel(level).value])
+        buffer.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                "COPY member_import_staging (email, nickname, member_level) "
+                "FROM STDIN WITH (FORMAT csv, NULL '')",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+        result = self.db.execute(text(
+            "INSERT INTO users (email, nickname, member_level, available_points, total_earned_points, is_locked) "
+            "SELECT DISTINCT ON (email) email, nickname, member_level, 0, 0, FALSE FROM member_import_staging "
+            "ON CONFLICT (email) DO NOTHING"
+        ))
+        self.db.execute(text("TRUNCATE member_import_staging"))
+        return max(result.rowcount, 0)
+
     def update(self, user: User) -> User:
         """Update user."""
         self.db.commit()
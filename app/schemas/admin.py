@@ -1,7 +1,8 @@
 """Admin schemas."""
-from pydantic import BaseModel, Field, field_serializer
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, field_serializer, field_validator
+from typing import Optional, List, Dict
 
+from app.models.user import MemberLevel
 from app.utils.data_masking import mask_email
 
 
@@ -58,3 +59,55 @@ class AuditLogResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class MemberImportRow(BaseModel):
+    """Single member row in a bulk import file."""
+    email: EmailStr
+    nickname: Optional[str] = Field(None, max_length=100)
+    member_level: MemberLevel = MemberLevel.BRONZE
+
+
+class ImportRowError(BaseModel):
+    """Per-row error in a bulk import or bulk job."""
+    line: int
+    error: str
+
+
+class PointAdjustRow(BaseModel):
+    """Single row in a bulk point adjustment file."""
+    user_id: int = Field(..., gt=0)
+    points: int
+    reason: Optional[str] = Field(None, max_length=500)
+
+    @field_validator("points")
+    @classmethod
+    def points_not_zero(cls, v: int) -> int:
+        if v == 0:
+            raise ValueError("points must not be 0")
+        return v
+
+
+class JobStatusResponse(BaseModel):
+    """Background job status."""
+    id: str
+    kind: str
+    status: str
+    created_by: int
+    created_at: str
+    updated_at: str
+    finished_at: Optional[str]
+    progress: Dict[str, int]
+    errors: List[ImportRowError]
+    errors_truncated: bool
+    error: Optional[str]
+
+
+class MemberImportResponse(BaseModel):
+    """Bulk member import summary."""
+    total_rows: int
+    imported: int
+    duplicates: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool
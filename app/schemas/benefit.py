@@ -1,5 +1,6 @@
 """Benefit schemas."""
-from pydantic import BaseModel, Field
+from datetime import date
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 from app.models.benefit import BenefitType
 from app.models.user import MemberLevel
@@ -13,6 +14,7 @@ class BenefitResponse(BaseModel):
     benefit_type: BenefitType
     member_level: MemberLevel
     value: Optional[str]
+    stock: Optional[int] = None
     is_active: bool
     created_at: str
 
@@ -43,10 +45,31 @@ class CreateBenefitRequest(BaseModel):
     benefit_type: BenefitType
     member_level: MemberLevel
     value: Optional[str] = Field(None, max_length=100)
+    stock: Optional[int] = Field(None, ge=0, description="Total units available; omit for unlimited")
 
 
 class DistributeBenefitRequest(BaseModel):
     """Distribute benefit request."""
     user_id: int
     benefit_id: int
-    period: str = Field(..., pattern=r"^\d{4}-\d{2}$")
+    period: str = Field(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+class BenefitCampaignSegment(BaseModel):
+    """Users targeted by a benefit campaign; every given filter must match."""
+    member_level: Optional[MemberLevel] = None
+    signup_from: Optional[date] = Field(None, description="First signup day (Beijing time), inclusive")
+    signup_to: Optional[date] = Field(None, description="Last signup day (Beijing time), inclusive")
+    min_points: Optional[int] = Field(None, ge=0, description="Minimum available points")
+    max_points: Optional[int] = Field(None, ge=0, description="Maximum available points")
+
+    @model_validator(mode="after")
+    def ranges_ordered(self) -> "BenefitCampaignSegment":
+        if self.signup_from and self.signup_to and self.signup_from > self.signup_to:
+            raise ValueError("signup_from must not be after signup_to")
+        if self.min_points is not None and self.max_points is not None and self.min_points > self.max_points:
+            raise ValueError("min_points must not be above max_points")
+        return self
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.model_dump().values())
@@ -29,3 +29,13 @@ class OrderResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class OrderSettlementResponse(BaseModel):
+    """Bulk order settlement result."""
+    received: int
+    settled: int
+    skipped: int
+    invalid: int
+    points_awarded: int
+    users_credited: int
@@ -1,6 +1,6 @@
 """Pydantic schemas for API requests and responses."""
 from pydantic import BaseModel, EmailStr, Field, field_serializer
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from app.models.user import MemberLevel, Gender
 from app.utils.data_masking import mask_email
@@ -68,6 +68,40 @@ class PointBalanceResponse(BaseModel):
     total_earned_points: int
 
 
+class PointReasonSummary(BaseModel):
+    """Point totals for one reason within a period."""
+    reason: str
+    points_earned: int
+    points_spent: int
+    transaction_count: int
+
+
+class PointPeriodSummary(BaseModel):
+    """Point totals for one month (Beijing time)."""
+    period: str
+    points_earned: int
+    points_spent: int
+    net_points: int
+    transaction_count: int
+    reasons: List[PointReasonSummary]
+
+
+class PointSummaryResponse(BaseModel):
+    """Point summary over a range of months."""
+    start_period: str
+    end_period: str
+    points_earned: int
+    points_spent: int
+    net_points: int
+    periods: List[PointPeriodSummary]
+
+
+class RedeemPointsRequest(BaseModel):
+    """Redeem points request."""
+    points: int = Field(..., gt=0)
+    description: Optional[str] = Field(None, max_length=200)
+
+
 class PointTransactionResponse(BaseModel):
     """Point transaction response."""
     id: int
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Set
 from app.core.security import verify_password, create_access_token
 from app.core.error_codes import ErrorCode, BusinessException
+from app.core.events import MemberLevelChanged, publish_after_commit
 from app.models.admin import AdminUser, AuditLog
 from app.models.user import MemberLevel
 from app.models.order import Order, OrderStatus
@@ -60,17 +61,11 @@ class AdminService:
         Returns:
             Set of permission strings like "users.edit", "points.adjust"
         """
-        # Get admin roles
-        roles = self.admin_repo.get_admin_roles(admin_id)
-
-        permissions = set()
-        for role in roles:
-            # Get role permissions
-            role_perms = self.admin_repo.get_role_permissions(role.id)
-            for perm in role_perms:
-                permissions.add(f"{perm.resource}.{perm.action}")
-
-        return permissions
+        # Resolve permissions across all roles in a single join instead of one query per role.
+        return {
+            f"{resource}.{action}"
+            for resource, action in self.admin_repo.get_admin_permissions(admin_id)
+        }
 
     def check_permission(self, admin_id: int, required_permission: str) -> bool:
         """Check if admin has required permission."""
@@ -118,7 +113,12 @@ class AdminService:
             user.nickname = update_request.nickname
 
         if update_request.member_level is not None:
-            user.member_level = MemberLevel(update_request.member_level)
+            new_level = MemberLevel(update_request.member_level)
+            if new_level != user.member_level:
+                publish_after_commit(self.db, MemberLevelChanged(
+                    user_id=user.id, old_level=user.member_level.value, new_level=new_level.value, source="admin",
+                ))
+            user.member_level = new_level
 
         if update_request.is_locked is not None:
             user.is_locked = update_request.is_locked
@@ -151,7 +151,7 @@ class AuthService:
 
         # Auto-distribute monthly benefits on login (best-effort).
         try:
-            BenefitService(self.db).distribute_current_monthly_benefits(user.id)
+            BenefitService(self.db).distribute_current_monthly_benefits(user.id, user.member_level)
         except Exception:
             pass
 
@@ -0,0 +1,83 @@
+"""Expired benefit distribution archival service."""
+import logging
+import time
+from datetime import timedelta
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.repositories.benefit_archive_repository import BenefitArchiveRepository
+from app.utils.timezone_utils import utc_now
+
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveSummary:
+    """Totals of an archival run."""
+
+    def __init__(self):
+        self.batches = 0
+        self.archived = 0
+
+
+class BenefitArchiveService:
+    """
+    Move expired benefit distributions into ``benefit_distribution_archive``.
+
+    Distributions that expired more than ``BENEFIT_ARCHIVE_RETENTION_DAYS``
+    ago are copied and deleted in batches, each in its own short transaction.
+    Deletes are paced to ``BENEFIT_ARCHIVE_MAX_ROWS_PER_SECOND`` so a large
+    backlog does not flood replication; the archive stays readable through
+    the admin API.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.archive_repo = BenefitArchiveRepository(db)
+
+    def archive_expired(
+        self,
+        retention_days: int = None,
+        batch_size: int = None,
+        max_rows_per_second: float = None,
+        max_batches: int = None,
+    ) -> ArchiveSummary:
+        """
+        Archive distributions expired before now minus ``retention_days``.
+
+        Args:
+            max_rows_per_second: Delete rate ceiling; 0 disables pacing
+            max_batches: Stop after this many batches (None runs until done)
+        """
+        retention_days = settings.BENEFIT_ARCHIVE_RETENTION_DAYS if retention_days is None else retention_days
+        batch_size = batch_size or settings.BENEFIT_ARCHIVE_BATCH_SIZE
+        if max_rows_per_second is None:
+            max_rows_per_second = settings.BENEFIT_ARCHIVE_MAX_ROWS_PER_SECOND
+        cutoff = utc_now() - timedelta(days=retention_days)
+
+        summary = ArchiveSummary()
+        while max_batches is None or summary.batches < max_batches:
+            started = time.monotonic()
+            try:
+                ids = self.archive_repo.list_expired_ids(cutoff, batch_size)
+                if not ids:
+                    self.db.rollback()
+                    break
+                archived = self.archive_repo.archive(ids)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            summary.batches += 1
+            summary.archived += archived
+            logger.info("Archived expired benefit distributions: batch=%d rows=%d", summary.batches, archived)
+
+            if len(ids) < batch_size:
+                break
+            if max_rows_per_second:
+                # Sleep off whatever the batch finished ahead of the rate budget.
+                remaining = archived / max_rows_per_second - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+        return summary
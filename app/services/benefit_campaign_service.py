@@ -0,0 +1,208 @@
+"""Segment-targeted benefit campaigns, run as background jobs."""
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.error_codes import ErrorCode, BusinessException
+from app.core.job_store import job_store, JobStatus
+from app.db.session import SessionLocal
+from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.benefit import BenefitCampaignSegment
+from app.services.admin_service import AdminService
+from app.services.benefit_catalog import CachedBenefit, benefit_catalog
+from app.services.benefit_service import BenefitService
+from app.utils.timezone_utils import BEIJING_TZ
+
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = "benefit_campaign"
+
+
+def _beijing_midnight_utc(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=BEIJING_TZ).astimezone(timezone.utc)
+
+
+def parse_user_ids(lines: Iterable[str], report: "CampaignReport") -> Iterator[int]:
+    """Parse one user id per line; blank lines and '#' comments are ignored."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            yield int(line.split(",", 1)[0])
+        except ValueError:
+            report.invalid_ids += 1
+
+
+class CampaignReport:
+    """Running totals and throughput of a campaign."""
+
+    def __init__(self):
+        self.chunks = 0
+        self.ids_received = 0
+        self.invalid_ids = 0
+        self.distributed = 0
+        self._started = time.monotonic()
+
+    def progress(self) -> dict:
+        elapsed = time.monotonic() - self._started
+        return {
+            "chunks": self.chunks,
+            "ids_received": self.ids_received,
+            "invalid_ids": self.invalid_ids,
+            "distributed": self.distributed,
+            "elapsed_ms": int(elapsed * 1000),
+            "rows_per_second": int(self.distributed / elapsed) if elapsed > 0 else 0,
+        }
+
+
+class BenefitCampaignService:
+    """
+    Distribute one benefit to a segment of users.
+
+    A segment filters on member level, signup day range (Beijing time) and
+    available points range, optionally restricted to an uploaded id list.
+    The users are walked in id-range chunks (or id list chunks); each chunk
+    is one INSERT ... SELECT ... ON CONFLICT DO NOTHING committed on its own,
+    so a campaign can be rerun and never hands a benefit out twice per period.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.benefit_repo = BenefitRepository(db)
+        self.user_repo = UserRepository(db)
+
+    def check_campaign(self, benefit_id: int, segment: BenefitCampaignSegment, has_user_ids: bool) -> CachedBenefit:
+        """Reject a campaign before it is queued."""
+        benefit = benefit_catalog.get(self.db, benefit_id)
+        if not benefit:
+            raise BusinessException(ErrorCode.BENEFIT_NOT_FOUND)
+        if not benefit.is_active:
+            raise BusinessException(ErrorCode.INVALID_INPUT, details="benefit is inactive")
+        if benefit.stock is not None:
+            raise BusinessException(ErrorCode.INVALID_INPUT, details="limited-stock benefits are claimed per request")
+        if segment.is_empty() and not has_user_ids:
+            raise BusinessException(ErrorCode.INVALID_INPUT, details="segment has no filter")
+        return benefit
+
+    @staticmethod
+    def _filters(segment: BenefitCampaignSegment) -> dict:
+        return {
+            "member_level": segment.member_level,
+            "created_from": _beijing_midnight_utc(segment.signup_from) if segment.signup_from else None,
+            "created_before": _beijing_midnight_utc(segment.signup_to + timedelta(days=1)) if segment.signup_to else None,
+            "min_points": segment.min_points,
+            "max_points": segment.max_points,
+        }
+
+    def run(
+        self,
+        benefit_id: int,
+        period: str,
+        segment: BenefitCampaignSegment,
+        user_ids: Optional[Iterable[int]] = None,
+        chunk_size: int = None,
+        pause_seconds: float = None,
+        report: CampaignReport = None,
+        on_progress=None,
+    ) -> CampaignReport:
+        """
+        Distribute ``benefit_id`` for ``period`` to the segment.
+
+        Without ``user_ids`` every user id up to the largest one at start is
+        walked; with them only those ids are considered.
+        """
+        chunk_size = chunk_size or settings.BENEFIT_CAMPAIGN_CHUNK_SIZE
+        pause_seconds = settings.BENEFIT_CAMPAIGN_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        report = report or CampaignReport()
+        expires_at = BenefitService.period_expires_at(period)
+        filters = self._filters(segment)
+
+        def chunks() -> Iterator[dict]:
+            if user_ids is None:
+                min_id, max_id = self.user_repo.id_bounds()
+                if min_id is None:
+                    return
+                for start in range(min_id, max_id + 1, chunk_size):
+                    yield {"start_id": start, "end_id": min(start + chunk_size, max_id + 1)}
+                return
+            batch: List[int] = []
+            for user_id in user_ids:
+                report.ids_received += 1
+                batch.append(user_id)
+                if len(batch) >= chunk_size:
+                    yield {"user_ids": batch}
+                    batch = []
+            if batch:
+                yield {"user_ids": batch}
+
+        for i, chunk in enumerate(chunks()):
+            if i and pause_seconds:
+                time.sleep(pause_seconds)
+            try:
+                inserted = self.benefit_repo.distribute_segment(benefit_id, period, expires_at, **chunk, **filters)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            report.chunks += 1
+            report.distributed += inserted
+            if on_progress:
+                on_progress(report)
+
+        logger.info(
+            "Benefit campaign for benefit %d, period %s: chunks=%d distributed=%d",
+            benefit_id, period, report.chunks, report.distributed,
+        )
+        return report
+
+
+def run_campaign_job(
+    job_id: str,
+    benefit_id: int,
+    period: str,
+    segment: BenefitCampaignSegment,
+    path: Optional[str],
+    admin_user_id: int,
+    trace_id: str = None,
+) -> None:
+    """Background task: run a campaign, record progress and write one audit entry."""
+    db = SessionLocal()
+    report = CampaignReport()
+
+    def on_progress(current: CampaignReport) -> None:
+        job_store.update(job_id, progress=current.progress())
+
+    try:
+        job_store.update(job_id, status=JobStatus.RUNNING)
+        service = BenefitCampaignService(db)
+        if path:
+            with open(path, encoding="utf-8-sig") as stream:
+                service.run(benefit_id, period, segment, parse_user_ids(stream, report), report=report, on_progress=on_progress)
+        else:
+            service.run(benefit_id, period, segment, report=report, on_progress=on_progress)
+        job_store.update(job_id, status=JobStatus.COMPLETED, progress=report.progress())
+    except Exception as e:
+        logger.error("Benefit campaign job %s failed", job_id, exc_info=True)
+        job_store.update(job_id, status=JobStatus.FAILED, error=str(e), progress=report.progress())
+    finally:
+        try:
+            AdminService(db).log_action(
+                admin_user_id=admin_user_id,
+                action="campaign",
+                resource="benefits",
+                resource_id=str(benefit_id),
+                details=f"job={job_id}, period={period}, segment={segment.model_dump(mode='json', exclude_none=True)}, "
+                        + ", ".join(f"{k}={v}" for k, v in report.progress().items()),
+                trace_id=trace_id,
+            )
+        finally:
+            db.close()
+            if path:
+                os.unlink(path)
@@ -0,0 +1,134 @@
+"""Per-process benefit catalog cache."""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.metrics import metrics
+from app.models.benefit import Benefit, BenefitType
+from app.models.user import MemberLevel
+from app.repositories.benefit_repository import BenefitRepository
+from app.utils.redis_client import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "benefits:catalog_version"
+
+metrics.describe("benefit_catalog_reloads_total", "Benefit catalog snapshot reloads")
+
+
+@dataclass(frozen=True)
+class CachedBenefit:
+    """Immutable copy of a ``Benefit`` row, safe to share across sessions and threads."""
+    id: int
+    name: str
+    description: Optional[str]
+    benefit_type: BenefitType
+    member_level: MemberLevel
+    value: Optional[str]
+    stock: Optional[int]
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, benefit: Benefit) -> "CachedBenefit":
+        return cls(
+            id=benefit.id,
+            name=benefit.name,
+            description=benefit.description,
+            benefit_type=benefit.benefit_type,
+            member_level=benefit.member_level,
+            value=benefit.value,
+            stock=benefit.stock,
+            is_active=benefit.is_active,
+            created_at=benefit.created_at,
+        )
+
+
+class CatalogSnapshot:
+    """All benefits of one catalog version, indexed by id and by level (active only)."""
+
+    def __init__(self, version: int, benefits: List[CachedBenefit]):
+        self.version = version
+        self.by_id: Dict[int, CachedBenefit] = {b.id: b for b in benefits}
+        self.by_level: Dict[MemberLevel, List[CachedBenefit]] = {}
+        for benefit in benefits:
+            if benefit.is_active:
+                self.by_level.setdefault(benefit.member_level, []).append(benefit)
+
+
+class BenefitCatalog:
+    """
+    Benefit catalog snapshot shared by the requests of one worker process.
+
+    The catalog is tiny and rarely changes, so it is loaded whole. Every
+    write path bumps a version counter in Redis after committing; a worker
+    reads the counter at most every ``BENEFIT_CATALOG_RECHECK_SECONDS`` and
+    reloads its snapshot when the counter has moved. Bumps made by this
+    process are seen immediately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def version(self) -> int:
+        """Current catalog version, read from Redis at most once per recheck interval."""
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= settings.BENEFIT_CATALOG_RECHECK_SECONDS:
+            self._version = int(redis_client.get(CATALOG_VERSION_KEY) or 0)
+            self._checked_at = now
+        return self._version
+
+    def bump(self) -> int:
+        """Move the catalog version; call after committing any benefit change."""
+        version = redis_client.incr(CATALOG_VERSION_KEY)
+        self._version = version
+        self._checked_at = time.monotonic()
+        return version
+
+    def invalidate(self) -> None:
+        """Drop the snapshot and cached version (tests, manual fixes)."""
+        with self._lock:
+            self._snapshot = None
+            self._version = None
+
+    def snapshot(self, db: Session) -> CatalogSnapshot:
+        """Snapshot for the current version, loading it with ``db`` if needed."""
+        version = self.version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                # The version is read before loading, so a concurrent bump triggers another reload.
+                benefits = [CachedBenefit.from_model(b) for b in BenefitRepository(db).list_catalog()]
+                snapshot = CatalogSnapshot(version, benefits)
+                self._snapshot = snapshot
+                metrics.inc("benefit_catalog_reloads_total")
+                logger.info("Loaded benefit catalog v%d: %d benefits", version, len(benefits))
+        return snapshot
+
+    def get(self, db: Session, benefit_id: int) -> Optional[CachedBenefit]:
+        """
+        Benefit by id.
+
+        An unknown id may have been created by another worker within the
+        recheck interval, so a miss re-reads the version once before giving up.
+        """
+        benefit = self.snapshot(db).by_id.get(benefit_id)
+        if benefit is None:
+            self._version = None
+            benefit = self.snapshot(db).by_id.get(benefit_id)
+        return benefit
+
+
+benefit_catalog = BenefitCatalog()
@@ -0,0 +1,121 @@
+"""Monthly benefit distribution batch service."""
+import logging
+import time
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.user import MemberLevel
+from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.user_repository import UserRepository
+from app.services.benefit_service import BenefitService
+from app.utils.redis_client import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+# Checkpoints outlive the period they describe so a late rerun still resumes.
+CHECKPOINT_TTL_SECONDS = 62 * 24 * 3600
+
+
+class DistributionSummary:
+    """Totals of a distribution run."""
+
+    def __init__(self, period: str, start_id: int):
+        self.period = period
+        self.start_id = start_id
+        self.chunks = 0
+        self.distributed = 0
+
+
+class BenefitDistributionService:
+    """
+    Distribute a period's benefits to every user ahead of their first request.
+
+    Users are walked in id-range chunks; each chunk is one set-based
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING committed on its own, so the
+    job is safe to rerun and never duplicates what the lazy per-request path
+    already created. The end of the last committed chunk is checkpointed in
+    Redis and a rerun for the same period resumes after it. A pause between
+    chunks keeps the job from starving online traffic.
+
+    After each chunk, users whose level has no limited-stock benefits hold
+    every benefit of their level, so their per-(user, period) marker is set
+    in one pipelined batch and the per-request path skips them.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.benefit_repo = BenefitRepository(db)
+        self.user_repo = UserRepository(db)
+
+    @staticmethod
+    def _checkpoint_key(period: str) -> str:
+        return f"benefit_distribution:checkpoint:{period}"
+
+    def get_checkpoint(self, period: str) -> Optional[int]:
+        """First user id not yet distributed for ``period``, or None before any chunk."""
+        value = redis_client.get(self._checkpoint_key(period))
+        return int(value) if value is not None else None
+
+    def clear_checkpoint(self, period: str) -> None:
+        redis_client.delete(self._checkpoint_key(period))
+
+    def distribute_period(
+        self,
+        period: str,
+        chunk_size: int = None,
+        pause_seconds: float = None,
+        start_id: int = None,
+        end_id: int = None,
+    ) -> DistributionSummary:
+        """
+        Distribute ``period`` to users with ``start_id <= id < end_id``.
+
+        Without ``start_id`` the run resumes from the period's checkpoint, or
+        from the smallest user id. ``end_id`` defaults to one past the largest
+        user id when the run starts; users created later get their benefits
+        from the per-request path.
+        """
+        chunk_size = chunk_size or settings.BENEFIT_DISTRIBUTION_CHUNK_SIZE
+        pause_seconds = settings.BENEFIT_DISTRIBUTION_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        expires_at = BenefitService.period_expires_at(period)
+        benefit_service = BenefitService(self.db)
+        version = benefit_service.catalog_version()
+        complete_levels = {
+            level for level in MemberLevel
+            if all(b.stock is None for b in benefit_service.get_benefits_by_level(level))
+        }
+
+        min_id, max_id = self.user_repo.id_bounds()
+        if start_id is None:
+            start_id = self.get_checkpoint(period) or min_id or 0
+        if end_id is None:
+            end_id = (max_id or 0) + 1
+
+        summary = DistributionSummary(period, start_id)
+        for chunk_start in range(start_id, end_id, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end_id)
+            try:
+                levels = self.user_repo.get_levels_in_range(chunk_start, chunk_end)
+                inserted = self.benefit_repo.distribute_range(period, expires_at, chunk_start, chunk_end)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            benefit_service.mark_distributed_many(
+                {user_id: level for user_id, level in levels.items() if level in complete_levels}, period, version
+            )
+
+            redis_client.set(self._checkpoint_key(period), str(chunk_end), ex=CHECKPOINT_TTL_SECONDS)
+            summary.chunks += 1
+            summary.distributed += inserted
+            logger.info(
+                "Distributed benefits for %s to users [%d, %d): rows=%d",
+                period, chunk_start, chunk_end, inserted,
+            )
+
+            if pause_seconds and chunk_end < end_id:
+                time.sleep(pause_seconds)
+
+        return summary
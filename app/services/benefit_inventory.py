@@ -0,0 +1,180 @@
+"""Redis-backed stock counters for limited benefits."""
+import logging
+import time
+import uuid
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core.error_codes import ErrorCode, BusinessException
+from app.core.metrics import metrics
+from app.repositories.benefit_repository import BenefitRepository
+from app.utils.redis_client import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+# A rebuild holds its lock for one count; waiters give up after REBUILD_WAIT_SECONDS.
+REBUILD_LOCK_SECONDS = 30
+REBUILD_WAIT_SECONDS = 5
+CLAIM_ATTEMPTS = 3
+
+metrics.describe("benefit_stock_claims_total", "Limited benefit stock claims by outcome")
+
+
+class BenefitInventory:
+    """
+    Remaining stock of limited benefits, one Redis counter per benefit.
+
+    A claim is a single DECR: a result below zero means the stock ran out
+    and the unit is given back, so concurrent claims can never take more
+    units than exist and never queue on a database row. Claims that fail to
+    become a distribution are released. The database stays the source of
+    truth, and ``reconcile`` copies the counters into
+    ``benefits.stock_remaining`` and reports drift.
+
+    Counters are generational: ``benefits:stock:{id}`` names the current
+    generation and ``benefits:stock:{id}:{generation}`` holds its count. A
+    claim returns the generation its unit came from, and the distribution
+    may only be committed if that generation is still current once its row
+    is inserted (``is_current``). A missing counter (e.g. after losing Redis)
+    is rebuilt under a short Redis lock: a new generation is published, the
+    benefit row is locked, which waits for inserted but uncommitted
+    distributions, and the counter is set to stock minus distributions.
+    Units taken from an older generation can no longer be committed and
+    releasing them only touches the retired counter, so neither claims in
+    flight during a rebuild nor late releases can oversell.
+    """
+
+    @staticmethod
+    def _generation_key(benefit_id: int) -> str:
+        return f"benefits:stock:{benefit_id}"
+
+    @staticmethod
+    def _counter_key(benefit_id: int, generation: str) -> str:
+        return f"benefits:stock:{benefit_id}:{generation}"
+
+    def remaining(self, benefit_id: int) -> Optional[int]:
+        """Remaining units, or None if the counter is not initialized."""
+        generation = redis_client.get(self._generation_key(benefit_id))
+        if generation is None:
+            return None
+        value = redis_client.get(self._counter_key(benefit_id, generation))
+        return int(value) if value is not None else None
+
+    def rebuild(self, db: Session, benefit_id: int, stock: int, force: bool = False) -> int:
+        """
+        Initialize a missing counter from the database; an existing counter wins unless ``force``.
+
+        Ends the session's transaction.
+        """
+        lock_key = f"benefits:stock_rebuild:{benefit_id}"
+        deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+        while not redis_client.set(lock_key, "1", ex=REBUILD_LOCK_SECONDS, nx=True):
+            # Another process is rebuilding; use its counter once published.
+            if not force and self.remaining(benefit_id) is not None:
+                return self.remaining(benefit_id)
+            if time.monotonic() >= deadline:
+                raise BusinessException(ErrorCode.REQUEST_IN_PROGRESS)
+            time.sleep(0.01)
+
+        try:
+            current = self.remaining(benefit_id)
+            if current is not None and not force:
+                return current
+
+            generation_key = self._generation_key(benefit_id)
+            previous = redis_client.get(generation_key)
+            generation = uuid.uuid4().hex
+            # Published before counting: units of older generations can no longer be committed.
+            redis_client.set(generation_key, generation)
+
+            repo = BenefitRepository(db)
+            try:
+                repo.lock_stock(benefit_id)
+                claimed = repo.count_distributions(benefit_id)
+                remaining = max(stock - claimed, 0)
+                redis_client.set(self._counter_key(benefit_id, generation), str(remaining))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            if previous:
+                redis_client.delete(self._counter_key(benefit_id, previous))
+            logger.info("Rebuilt stock counter for benefit %d: stock=%d claimed=%d", benefit_id, stock, claimed)
+            return remaining
+        finally:
+            redis_client.delete(lock_key)
+
+    def claim(self, db: Session, benefit_id: int, stock: int) -> Optional[str]:
+        """Take one unit; returns its generation, or None when the benefit is out of stock."""
+        for _ in range(CLAIM_ATTEMPTS):
+            generation = redis_client.get(self._generation_key(benefit_id))
+            left = redis_client.incrby_existing(self._counter_key(benefit_id, generation), -1) if generation else None
+            if left is None:
+                self.rebuild(db, benefit_id, stock)
+                continue
+
+            if left >= 0:
+                metrics.inc("benefit_stock_claims_total", labels={"outcome": "claimed"})
+                return generation
+
+            redis_client.incrby_existing(self._counter_key(benefit_id, generation), 1)
+            metrics.inc("benefit_stock_claims_total", labels={"outcome": "out_of_stock"})
+            return None
+
+        raise BusinessException(ErrorCode.REQUEST_IN_PROGRESS)
+
+    def is_current(self, benefit_id: int, generation: str) -> bool:
+        """Whether a unit claimed from ``generation`` may still be committed."""
+        return redis_client.get(self._generation_key(benefit_id)) == generation
+
+    def release(self, benefit_id: int, generation: str) -> None:
+        """Give back a unit whose distribution was not created."""
+        redis_client.incrby_existing(self._counter_key(benefit_id, generation), 1)
+        metrics.inc("benefit_stock_claims_total", labels={"outcome": "released"})
+
+    def reconcile(self, db: Session, repair: bool = False) -> List[dict]:
+        """
+        Persist counters to ``benefits.stock_remaining`` and compare them with the database.
+
+        Drift is counter minus (stock - distributions). A negative drift is
+        expected while claims are in flight; a lasting one means units were
+        leaked by a crashed request, and a positive one could oversell. With
+        ``repair`` a drifted counter is rebuilt as a new generation, which
+        corrects both directions: claims in flight take their unit again
+        from the new counter. Commits.
+
+        Returns:
+            One record per limited benefit whose counter drifted
+        """
+        repo = BenefitRepository(db)
+        drifted = []
+        remaining = {}
+        for benefit_id, stock in repo.list_limited_stock():
+            counter = self.remaining(benefit_id)
+            if counter is None:
+                counter = self.rebuild(db, benefit_id, stock)
+            expected = max(stock - repo.count_distributions(benefit_id), 0)
+            drift = counter - expected
+            if drift:
+                drifted.append({
+                    "benefit_id": benefit_id,
+                    "stock": stock,
+                    "counter": counter,
+                    "expected": expected,
+                    "drift": drift,
+                })
+                if repair:
+                    counter = self.rebuild(db, benefit_id, stock, force=True)
+            remaining[benefit_id] = counter
+
+        try:
+            repo.set_stock_remaining(remaining)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return drifted
+
+
+benefit_inventory = BenefitInventory()
@@ -2,60 +2,150 @@
 from datetime import datetime, timezone
 from dateutil.relativedelta import relativedelta
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional
 from app.models.benefit import Benefit, BenefitDistribution, BenefitType
 from app.models.user import User, MemberLevel
 from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.benefit_archive_repository import BenefitArchiveRepository
 from app.repositories.user_repository import UserRepository
+from app.services.benefit_catalog import CachedBenefit, benefit_catalog
+from app.services.benefit_inventory import benefit_inventory
 from app.core.error_codes import ErrorCode, BusinessException
 from app.utils.redis_client import redis_client
-from app.utils.timezone_utils import current_beijing_period, BEIJING_TZ
+from app.utils.timezone_utils import current_beijing_period, utc_now, BEIJING_TZ
+
+
+# Markers outlive their period so late requests in the next month still hit them.
+DISTRIBUTED_MARKER_TTL_SECONDS = 62 * 24 * 3600
+# BENEFIT_ALREADY_DISTRIBUTED details when another request holds the lock.
+DISTRIBUTION_IN_PROGRESS = "distribution in progress"
+# Claims of a limited benefit retried after its stock counter was rebuilt.
+STOCK_CLAIM_ATTEMPTS = 3
 
 
 class BenefitService:
-    """Benefit service."""
+    """
+    Benefit service.
+
+    Catalog reads (benefits by level or id) are served from the per-process
+    ``benefit_catalog`` snapshot; any path that changes benefits must call
+    ``bump_catalog_version`` after committing.
+    """
 
     def __init__(self, db: Session):
         self.db = db
         self.benefit_repo = BenefitRepository(db)
+        self.archive_repo = BenefitArchiveRepository(db)
         self.user_repo = UserRepository(db)
 
-    def get_benefits_by_level(self, member_level: MemberLevel) -> List[Benefit]:
+    @staticmethod
+    def period_expires_at(period: str) -> datetime:
+        """End of a "YYYY-MM" period in Beijing time; distributions expire then."""
+        year, month = map(int, period.split('-'))
+        return datetime(year, month, 1, tzinfo=BEIJING_TZ) + relativedelta(months=1) - relativedelta(seconds=1)
+
+    @staticmethod
+    def catalog_version() -> int:
+        """Current benefit catalog version; moves whenever benefits change."""
+        return benefit_catalog.version()
+
+    @staticmethod
+    def bump_catalog_version() -> int:
+        """Publish a benefit change to every worker's catalog cache. Call after commit."""
+        return benefit_catalog.bump()
+
+    @staticmethod
+    def _distributed_marker_key(period: str, member_level: MemberLevel, version: int) -> str:
+        return f"benefits:distributed:{period}:{MemberLevel(member_level).value}:v{version}"
+
+    def is_distributed(self, user_id: int, period: str, member_level: MemberLevel, version: int = None) -> bool:
+        """Whether the user already got every benefit of their level for the period (one bit test)."""
+        version = self.catalog_version() if version is None else version
+        return bool(redis_client.getbit(self._distributed_marker_key(period, member_level, version), user_id))
+
+    def mark_distributed(self, user_id: int, period: str, member_level: MemberLevel, version: int) -> None:
+        """Record that the user holds every benefit of their level for the period."""
+        key = self._distributed_marker_key(period, member_level, version)
+        redis_client.setbit(key, user_id, 1)
+        redis_client.expire(key, DISTRIBUTED_MARKER_TTL_SECONDS)
+
+    def mark_distributed_many(self, users: Dict[int, MemberLevel], period: str, version: int) -> None:
+        """``mark_distributed`` for many users (user_id -> level) in one pipelined round trip."""
+        bits = {}
+        for user_id, level in users.items():
+            bits.setdefault(self._distributed_marker_key(period, level, version), []).append(user_id)
+        if bits:
+            redis_client.setbits(bits, ex=DISTRIBUTED_MARKER_TTL_SECONDS)
+
+    def get_benefits_by_level(self, member_level: MemberLevel) -> List[CachedBenefit]:
         """Get active benefits for member level."""
-        return self.benefit_repo.list_by_level(member_level)
+        return benefit_catalog.snapshot(self.db).by_level.get(MemberLevel(member_level), [])
 
-    def get_user_benefits(self, user_id: int, skip: int = 0, limit: int = 20) -> tuple[List[BenefitDistribution], int]:
-        """Get user's distributed benefits."""
-        return self.benefit_repo.list_user_distributions(user_id, skip, limit)
+    def get_user_benefits(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        active_only: bool = False,
+        unused_only: bool = False,
+    ) -> tuple[list, int]:
+        """Get user's distributed benefits with benefit name and type, in one query."""
+        return self.benefit_repo.list_user_distributions(
+            user_id, skip, limit, active_only=active_only, unused_only=unused_only, now=utc_now()
+        )
 
-    def get_benefits_by_ids(self, benefit_ids: List[int]) -> List[Benefit]:
+    def get_archived_user_benefits(self, user_id: int, skip: int = 0, limit: int = 20) -> tuple[list, int]:
+        """Get user's archived (long expired) distributions with benefit name and type."""
+        return self.archive_repo.list_user_archive(user_id, skip, limit)
+
+    def get_benefits_by_ids(self, benefit_ids: List[int]) -> List[CachedBenefit]:
         """Get benefits by IDs."""
-        return self.benefit_repo.list_by_ids(benefit_ids)
+        by_id = benefit_catalog.snapshot(self.db).by_id
+        return [by_id[benefit_id] for benefit_id in benefit_ids if benefit_id in by_id]
 
-    def distribute_current_monthly_benefits(self, user_id: int) -> List[BenefitDistribution]:
+    def distribute_current_monthly_benefits(
+        self, user_id: int, member_level: Optional[MemberLevel] = None
+    ) -> List[BenefitDistribution]:
         """Distribute monthly benefits for current Beijing period."""
-        return self.distribute_monthly_benefits(user_id, current_beijing_period())
+        return self.distribute_monthly_benefits(user_id, current_beijing_period(), member_level)
 
-    def distribute_monthly_benefits(self, user_id: int, period: str) -> List[BenefitDistribution]:
+    def distribute_monthly_benefits(
+        self, user_id: int, period: str, member_level: Optional[MemberLevel] = None
+    ) -> List[BenefitDistribution]:
         """
         Distribute monthly benefits to user.
 
+        Once a user has every benefit of their level for a period, a bit is set
+        in a Redis bitmap keyed by period, level and catalog version. Later
+        calls that pass the caller's known ``member_level`` return after that
+        single bit test, without touching the database. A level change or a
+        catalog change selects a different bitmap, so new benefits still go out.
+
         Args:
             user_id: User ID
             period: Period in format "YYYY-MM"
+            member_level: The user's level if the caller already has it loaded
 
         Returns:
             List of distributed benefits
         """
+        version = self.catalog_version()
+        if member_level is not None and self.is_distributed(user_id, period, member_level, version):
+            return []
+
         # Get user
         user = self.user_repo.get_by_id(user_id)
         if not user:
             raise BusinessException(ErrorCode.USER_NOT_FOUND)
 
+        if member_level != user.member_level and self.is_distributed(user_id, period, user.member_level, version):
+            return []
+
         # Get benefits for user's level
         benefits = self.get_benefits_by_level(user.member_level)
 
         distributions = []
+        complete = True
         for benefit in benefits:
             try:
                 distribution = self._distribute_single_benefit(user_id, benefit.id, period)
@@ -64,15 +154,28 @@ class BenefitService:
             except BusinessException as e:
                 # Skip if already distributed
                 if e.code == ErrorCode.BENEFIT_ALREADY_DISTRIBUTED[0]:
+                    # A concurrent request may still fail; let it set the marker.
+                    if e.details == DISTRIBUTION_IN_PROGRESS:
+                        complete = False
+                    continue
+                # Limited benefits go to whoever claims them first.
+                if e.code == ErrorCode.BENEFIT_OUT_OF_STOCK[0]:
                     continue
                 raise
 
+        if complete:
+            self.mark_distributed(user_id, period, user.member_level, version)
+
         return distributions
 
     def _distribute_single_benefit(self, user_id: int, benefit_id: int, period: str) -> BenefitDistribution:
         """
         Distribute single benefit with distributed lock.
 
+        A limited-stock benefit first claims a unit from its Redis counter;
+        the unit is released again if the distribution is not committed, and
+        claimed again if the counter was rebuilt before the row was inserted.
+
         Args:
             user_id: User ID
             benefit_id: Benefit ID
@@ -84,7 +187,7 @@ class BenefitService:
         # Distributed lock
         lock_key = f"benefit_lock:{user_id}:{benefit_id}:{period}"
         if not redis_client.setnx(lock_key, "1"):
-            raise BusinessException(ErrorCode.BENEFIT_ALREADY_DISTRIBUTED)
+            raise BusinessException(ErrorCode.BENEFIT_ALREADY_DISTRIBUTED, details=DISTRIBUTION_IN_PROGRESS)
 
         try:
             redis_client.expire(lock_key, 300)  # 5 minutes
@@ -95,24 +198,40 @@ class BenefitService:
                 raise BusinessException(ErrorCode.BENEFIT_ALREADY_DISTRIBUTED)
 
             # Get benefit
-            benefit = self.benefit_repo.get_by_id(benefit_id)
+            benefit = benefit_catalog.get(self.db, benefit_id)
             if not benefit:
                 raise BusinessException(ErrorCode.BENEFIT_NOT_FOUND)
 
-            # Calculate expiry (end of month in Beijing time)
-            year, month = map(int, period.split('-'))
-            expires_at = datetime(year, month, 1, tzinfo=BEIJING_TZ) + relativedelta(months=1) - relativedelta(seconds=1)
+            for _ in range(STOCK_CLAIM_ATTEMPTS):
+                generation = None
+                if benefit.stock is not None:
+                    generation = benefit_inventory.claim(self.db, benefit_id, benefit.stock)
+                    if generation is None:
+                        raise BusinessException(ErrorCode.BENEFIT_OUT_OF_STOCK)
 
-            # Create distribution record
-            distribution = self.benefit_repo.create_distribution(
-                user_id=user_id,
-                benefit_id=benefit_id,
-                period=period,
-                expires_at=expires_at
-            )
+                try:
+                    # Create distribution record
+                    distribution = self.benefit_repo.create_distribution(
+                        user_id=user_id,
+                        benefit_id=benefit_id,
+                        period=period,
+                        expires_at=self.period_expires_at(period)
+                    )
+                    # Checked after the INSERT, which a counter rebuild waits for.
+                    if generation is not None and not benefit_inventory.is_current(benefit_id, generation):
+                        # The counter was rebuilt meanwhile; claim again from the new one.
+                        self.db.rollback()
+                        continue
 
-            self.db.commit()
-            return distribution
+                    self.db.commit()
+                except Exception:
+                    self.db.rollback()
+                    if generation is not None:
+                        benefit_inventory.release(benefit_id, generation)
+                    raise
+                return distribution
+
+            raise BusinessException(ErrorCode.REQUEST_IN_PROGRESS)
 
         finally:
             redis_client.delete(lock_key)
@@ -121,23 +240,65 @@ class BenefitService:
         """Public wrapper to distribute a single benefit."""
         return self._distribute_single_benefit(user_id, benefit_id, period)
 
+    def redeem_benefit(
+        self, user_id: int, distribution_id: int, request_key: str
+    ) -> tuple[BenefitDistribution, CachedBenefit]:
+        """
+        Use a distributed benefit once.
+
+        The happy path is a single conditional UPDATE on the distribution row,
+        so a checkout burst only contends on rows that are redeemed twice.
+        Retrying with the same ``request_key`` returns the original redemption.
+
+        Args:
+            user_id: User ID
+            distribution_id: Distribution to use
+            request_key: Client supplied key identifying this redemption
+
+        Returns:
+            Tuple of (distribution, benefit); the distribution is the UPDATE's
+            RETURNING row on first use
+        """
+        try:
+            distribution = self.benefit_repo.mark_used(distribution_id, user_id, request_key, utc_now())
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        if distribution is None:
+            distribution = self.benefit_repo.get_user_distribution(distribution_id, user_id)
+            if not distribution:
+                raise BusinessException(ErrorCode.BENEFIT_NOT_FOUND)
+            if not distribution.is_used:
+                raise BusinessException(ErrorCode.BENEFIT_EXPIRED)
+            if distribution.used_request_key != request_key:
+                raise BusinessException(ErrorCode.BENEFIT_ALREADY_USED)
+
+        return distribution, benefit_catalog.get(self.db, distribution.benefit_id)
+
     def create_benefit(
         self,
         name: str,
         benefit_type: BenefitType,
         member_level: MemberLevel,
         description: str = None,
-        value: str = None
+        value: str = None,
+        stock: int = None
     ) -> Benefit:
-        """Create new benefit."""
+        """Create new benefit; ``stock`` limits how many units are ever distributed."""
         benefit = self.benefit_repo.create(
             name=name,
             description=description,
             benefit_type=benefit_type,
             member_level=member_level,
-            value=value
+            value=value,
+            stock=stock
         )
         self.db.commit()
+        if stock is not None:
+            benefit_inventory.rebuild(self.db, benefit.id, stock)
+        self.bump_catalog_version()
         return benefit
 
     def list_benefits(self, skip: int = 0, limit: int = 50) -> tuple[List[Benefit], int]:
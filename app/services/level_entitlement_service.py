@@ -0,0 +1,154 @@
+"""Benefits newly entitled by member level changes."""
+import json
+import logging
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.events import MemberLevelChanged, event_bus
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.user import MemberLevel
+from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.user_repository import UserRepository
+from app.services.benefit_service import BenefitService
+from app.utils.redis_client import redis_client
+from app.utils.timezone_utils import current_beijing_period
+
+
+logger = logging.getLogger(__name__)
+
+LEVEL_CHANGES_KEY = "benefits:level_changes"
+
+metrics.describe("level_entitlement_distributions_total", "Benefit distributions created for member level changes")
+
+
+def enqueue_level_change(event: MemberLevelChanged) -> None:
+    """Event handler: queue a committed level change for the next drain (one RPUSH)."""
+    redis_client.rpush(LEVEL_CHANGES_KEY, json.dumps({
+        "user_id": event.user_id, "old_level": event.old_level, "new_level": event.new_level,
+    }))
+
+
+def register_level_change_handlers() -> None:
+    """Subscribe the entitlement queue to level changes. Safe to call more than once."""
+    event_bus.subscribe(MemberLevelChanged, enqueue_level_change)
+
+
+class EntitlementSummary:
+    """Totals of a drain."""
+
+    def __init__(self):
+        self.batches = 0
+        self.events = 0
+        self.users = 0
+        self.distributed = 0
+
+
+class LevelEntitlementService:
+    """
+    Distribute the benefits a user gains by changing member level.
+
+    ``MemberLevelChanged`` events are queued in a Redis list when their
+    transaction commits. A drain pops them in batches, collapses repeated
+    changes of a user into (first old level, current level) and distributes
+    the current period's benefits of the new level that the old level did
+    not include, with one multi-row INSERT ... ON CONFLICT DO NOTHING per
+    batch. Limited-stock benefits are left to the per-request path, which
+    claims their stock one unit at a time.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.benefit_repo = BenefitRepository(db)
+        self.user_repo = UserRepository(db)
+        self.benefit_service = BenefitService(db)
+
+    def entitled_delta(self, old_level: MemberLevel, new_level: MemberLevel) -> list:
+        """Active benefits of ``new_level`` that ``old_level`` does not have."""
+        old_ids = {b.id for b in self.benefit_service.get_benefits_by_level(old_level)}
+        return [b for b in self.benefit_service.get_benefits_by_level(new_level) if b.id not in old_ids]
+
+    def distribute_changes(self, changes: Dict[int, MemberLevel], period: str = None) -> int:
+        """
+        Distribute newly entitled benefits for one batch of level changes. Commits.
+
+        Args:
+            changes: user_id -> level before the queued changes
+            period: Period in format "YYYY-MM", defaults to the current Beijing month
+
+        Returns:
+            Number of distributions inserted
+        """
+        period = period or current_beijing_period()
+        version = self.benefit_service.catalog_version()
+        current = self.user_repo.get_levels(changes)
+
+        pairs = []
+        complete = {}
+        for user_id, level in current.items():
+            old_level = MemberLevel(changes[user_id])
+            if level == old_level:
+                continue
+            delta = self.entitled_delta(old_level, level)
+            pairs.extend((user_id, b.id) for b in delta if b.stock is None)
+            if len(delta) == len(self.benefit_service.get_benefits_by_level(level)) and all(b.stock is None for b in delta):
+                complete[user_id] = level
+
+        try:
+            inserted = self.benefit_repo.distribute_pairs(pairs, period, BenefitService.period_expires_at(period))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.benefit_service.mark_distributed_many(complete, period, version)
+
+        metrics.inc("level_entitlement_distributions_total", inserted)
+        return inserted
+
+    def drain(self, batch_size: int = None, max_batches: int = None) -> EntitlementSummary:
+        """
+        Process queued level changes until the queue is empty or ``max_batches`` ran.
+
+        A batch that fails is pushed back onto the queue before the error is raised.
+        """
+        batch_size = batch_size or settings.LEVEL_ENTITLEMENT_BATCH_SIZE
+        summary = EntitlementSummary()
+
+        while max_batches is None or summary.batches < max_batches:
+            raw = redis_client.lpop(LEVEL_CHANGES_KEY, batch_size)
+            if not raw:
+                break
+
+            changes = {}
+            for item in raw:
+                event = json.loads(item)
+                changes.setdefault(event["user_id"], event["old_level"])
+
+            try:
+                inserted = self.distribute_changes(changes)
+            except Exception:
+                redis_client.rpush(LEVEL_CHANGES_KEY, *raw)
+                raise
+
+            summary.batches += 1
+            summary.events += len(raw)
+            summary.users += len(changes)
+            summary.distributed += inserted
+            logger.info(
+                "Level entitlement batch: events=%d users=%d distributed=%d",
+                len(raw), len(changes), inserted,
+            )
+
+        return summary
+
+
+def drain_level_changes() -> None:
+    """Background task: drain the level change queue with its own session."""
+    db = SessionLocal()
+    try:
+        LevelEntitlementService(db).drain()
+    except Exception:
+        logger.error("Level entitlement drain failed", exc_info=True)
+    finally:
+        db.close()
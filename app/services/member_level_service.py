@@ -0,0 +1,154 @@
+"""Member level (tier) engine."""
+import logging
+import time
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.events import MemberLevelChanged, publish_after_commit
+from app.core.metrics import metrics
+from app.models.user import MemberLevel
+from app.repositories.user_repository import UserRepository
+
+
+logger = logging.getLogger(__name__)
+
+LEVEL_ORDER = [MemberLevel.BRONZE, MemberLevel.SILVER, MemberLevel.GOLD, MemberLevel.PLATINUM]
+
+metrics.describe("member_level_changes_total", "Member level changes by source and direction")
+
+
+def parse_thresholds(spec: str) -> List[tuple[int, MemberLevel]]:
+    """
+    Parse ``"silver:1000,gold:5000"`` into (min_total_earned, level) pairs, lowest first.
+
+    Bronze is the floor and needs no threshold. Thresholds must rise with the level.
+    """
+    thresholds = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, points = part.partition(":")
+        thresholds.append((int(points), MemberLevel(name.strip().lower())))
+
+    thresholds.sort(key=lambda t: LEVEL_ORDER.index(t[1]))
+    for (low, _), (high, level) in zip(thresholds, thresholds[1:]):
+        if high <= low:
+            raise ValueError(f"Threshold for {level.value} must be above {low}")
+    return thresholds
+
+
+def level_rank(level: MemberLevel) -> int:
+    return LEVEL_ORDER.index(MemberLevel(level))
+
+
+class MemberLevelService:
+    """
+    Derive member levels from lifetime earned points.
+
+    Levels follow ``MEMBER_LEVEL_THRESHOLDS`` on ``total_earned_points``. The
+    earn path promotes incrementally from the values its balance UPDATE
+    returned, so no extra read is needed. Level writes are conditional on the
+    level read, so a concurrent admin change is never overwritten, and every
+    change is published as ``MemberLevelChanged`` once the transaction commits.
+    Levels are never lowered automatically except by an explicit
+    ``recalculate_all(allow_demotion=True)``, so manual upgrades survive.
+    """
+
+    def __init__(self, db: Session, thresholds: List[tuple[int, MemberLevel]] = None):
+        self.db = db
+        self.user_repo = UserRepository(db)
+        self.thresholds = thresholds if thresholds is not None else parse_thresholds(settings.MEMBER_LEVEL_THRESHOLDS)
+
+    def level_for(self, total_earned: int) -> MemberLevel:
+        """Level earned by ``total_earned`` lifetime points."""
+        level = MemberLevel.BRONZE
+        for min_points, threshold_level in self.thresholds:
+            if total_earned >= min_points:
+                level = threshold_level
+        return level
+
+    def _target(self, total_earned: int, current: MemberLevel, allow_demotion: bool) -> Optional[MemberLevel]:
+        """New level for a user, or None when it should stay as it is."""
+        target = self.level_for(total_earned)
+        if target == current:
+            return None
+        if level_rank(target) < level_rank(current) and not allow_demotion:
+            return None
+        return target
+
+    def apply_earned(self, states: Dict[int, tuple[int, MemberLevel]], source: str) -> List[MemberLevelChanged]:
+        """
+        Promote users whose lifetime points crossed a threshold. Does not commit.
+
+        Args:
+            states: user_id -> (total_earned_points, member_level) as just written
+            source: What triggered the evaluation, carried on the events
+        """
+        changes = {}
+        for user_id, (total_earned, current) in states.items():
+            target = self._target(total_earned, current, allow_demotion=False)
+            if target:
+                changes[user_id] = (current, target)
+        return self._apply(changes, source)
+
+    def _apply(self, changes: Dict[int, tuple[MemberLevel, MemberLevel]], source: str) -> List[MemberLevelChanged]:
+        events = []
+        for user_id in self.user_repo.set_levels(changes):
+            old, new = changes[user_id]
+            event = MemberLevelChanged(user_id=user_id, old_level=old.value, new_level=new.value, source=source)
+            publish_after_commit(self.db, event)
+            events.append(event)
+            direction = "up" if level_rank(new) > level_rank(old) else "down"
+            metrics.inc("member_level_changes_total", labels={"source": source, "direction": direction})
+        return events
+
+    def recalculate_all(
+        self,
+        chunk_size: int = None,
+        allow_demotion: bool = False,
+        after_id: int = 0,
+        pause_seconds: float = 0,
+    ) -> int:
+        """
+        Recompute every user's level in keyset-ordered chunks.
+
+        Each chunk reads (id, total_earned_points, member_level) for the next
+        ``chunk_size`` ids and writes all of its changes with one
+        UPDATE ... FROM (VALUES ...), committed per chunk so locks stay short
+        and an interrupted run can resume from the last logged id.
+
+        Returns:
+            Number of users whose level changed
+        """
+        chunk_size = chunk_size or settings.MEMBER_LEVEL_RECALC_CHUNK_SIZE
+        changed = 0
+
+        while True:
+            states = self.user_repo.list_level_states(after_id, chunk_size)
+            if not states:
+                break
+
+            changes = {}
+            for user_id, total_earned, current in states:
+                target = self._target(total_earned, current, allow_demotion)
+                if target:
+                    changes[user_id] = (current, target)
+
+            try:
+                events = self._apply(changes, source="recalculation")
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            changed += len(events)
+            after_id = states[-1][0]
+            logger.info("Member level recalculation progress: last_id=%d changed=%d", after_id, changed)
+
+            if len(states) < chunk_size:
+                break
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+        return changed
@@ -1,17 +1,28 @@
 """Order service for order lifecycle and points integration."""
-import random
 from decimal import Decimal
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.error_codes import ErrorCode, BusinessException
-from app.models.order import Order, OrderStatus
+from app.core.order_numbers import order_numbers
+from app.models.order import Order, OrderStatus, can_transition
 from app.repositories.order_repository import OrderRepository
 from app.services.point_service import PointService
-from app.utils.timezone_utils import get_current_beijing_time, utc_now
+from app.utils.timezone_utils import utc_now
 from datetime import datetime
 from typing import Optional, Tuple, List
 
 
+# Re-reads allowed when concurrent requests keep changing the same order.
+ORDER_TRANSITION_ATTEMPTS = 3
+
+_REJECTED_DETAILS = {
+    (OrderStatus.CANCELLED, OrderStatus.COMPLETED): "订单状态不允许完成",
+    (OrderStatus.REFUNDED, OrderStatus.COMPLETED): "订单状态不允许完成",
+    (OrderStatus.CANCELLED, OrderStatus.REFUNDED): "已取消订单无法退款",
+}
+
+
 class OrderService:
     """Order service."""
 
@@ -20,11 +31,6 @@ class OrderService:
         self.order_repo = OrderRepository(db)
         self.point_service = PointService(db)
 
-    def _generate_order_no(self) -> str:
-        ts = get_current_beijing_time().strftime("%Y%m%d%H%M%S")
-        suffix = random.randint(1000, 9999)
-        return f"ORD{ts}{suffix}"
-
     def create_order(
         self,
         user_id: int,
@@ -32,16 +38,9 @@ class OrderService:
         product_name: str = None,
         product_description: str = None,
     ) -> Order:
-        """Create a new order (pending)."""
-        for _ in range(5):
-            order_no = self._generate_order_no()
-            if not self.order_repo.get_by_order_no(order_no):
-                break
-        else:
-            raise BusinessException(ErrorCode.INTERNAL_ERROR, details="生成订单号失败")
-
+        """Create a new order (pending); the order number needs no uniqueness lookup."""
         order = Order(
-            order_no=order_no,
+            order_no=order_numbers.next_order_no(),
             user_id=user_id,
             amount=amount,
             status=OrderStatus.PENDING,
@@ -53,54 +52,75 @@ class OrderService:
         self.db.refresh(order)
         return order
 
-    def complete_order(self, order_id: int, user_id: int) -> Order:
-        """Mark an order completed and earn points (1 yuan = 1 point)."""
+    def _load_own(self, order_id: int, user_id: int) -> Order:
         order = self.order_repo.get_by_id(order_id)
         if not order:
             raise BusinessException(ErrorCode.ORDER_NOT_FOUND)
         if order.user_id != user_id:
             raise BusinessException(ErrorCode.PERMISSION_DENIED)
+        return order
 
-        if order.status in (OrderStatus.CANCELLED, OrderStatus.REFUNDED):
-            raise BusinessException(ErrorCode.INVALID_INPUT, details="订单状态不允许完成")
+    def _transition(self, order_id: int, user_id: int, target: OrderStatus, on_claimed, **values) -> Order:
+        """
+        Move an order to ``target`` through the transition table.
+
+        The status change is a conditional UPDATE on the version that was
+        read; ``on_claimed(previous_status, row)`` writes the points in the
+        same transaction without committing, and this method alone commits
+        or rolls back both. If a concurrent request changed the order first, it
+        is re-read and the transition re-evaluated against the new status.
+        """
+        for _ in range(ORDER_TRANSITION_ATTEMPTS):
+            order = self._load_own(order_id, user_id)
+            if order.status == target:
+                return order
+            if not can_transition(order.status, target):
+                raise BusinessException(ErrorCode.INVALID_INPUT, details=_REJECTED_DETAILS.get(
+                    (order.status, target), f"订单状态{order.status.value}不允许变更为{target.value}"
+                ))
+
+            previous = order.status
+            try:
+                row = self.order_repo.transition(order.id, order.version, target, **values)
+                if row is not None:
+                    on_claimed(previous, row)
+                    self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+            if row is not None:
+                self.db.refresh(order)
+                return order
+            # Lost the race: end the transaction and read the order again.
+            self.db.rollback()
+
+        raise BusinessException(ErrorCode.ORDER_STATUS_CONFLICT)
 
-        if order.status != OrderStatus.COMPLETED:
-            order.status = OrderStatus.COMPLETED
-            order.completed_at = utc_now()
-            if not order.paid_at:
-                order.paid_at = utc_now()
+    def complete_order(self, order_id: int, user_id: int) -> Order:
+        """Mark an order completed and earn points (1 yuan = 1 point)."""
+        now = utc_now()
 
-        # Points are idempotent by order_id.
-        self.point_service.earn_points_from_order(order.user_id, order.id, order.amount)
-        self.db.commit()
-        self.db.refresh(order)
-        return order
+        def earn(previous: OrderStatus, row) -> None:
+            # Only the request that completed the order posts its points.
+            self.point_service.earn_points_from_order(row.user_id, row.id, row.amount, commit=False)
+
+        return self._transition(
+            order_id, user_id, OrderStatus.COMPLETED, earn,
+            completed_at=now, paid_at=func.coalesce(Order.paid_at, now),
+        )
 
     def refund_order(self, order_id: int, user_id: int) -> Order:
         """Refund an order and deduct previously earned points."""
-        order = self.order_repo.get_by_id(order_id)
-        if not order:
-            raise BusinessException(ErrorCode.ORDER_NOT_FOUND)
-        if order.user_id != user_id:
-            raise BusinessException(ErrorCode.PERMISSION_DENIED)
-
-        if order.status == OrderStatus.REFUNDED:
-            return order
-
-        if order.status == OrderStatus.CANCELLED:
-            raise BusinessException(ErrorCode.INVALID_INPUT, details="已取消订单无法退款")
 
-        # Only deduct points if order had been completed.
-        if order.status == OrderStatus.COMPLETED:
-            points = self.point_service.calculate_points(order.amount)
-            if points > 0:
-                self.point_service.deduct_points_for_refund(order.user_id, order.id, points)
+        def deduct(previous: OrderStatus, row) -> None:
+            # Only deduct points if order had been completed.
+            if previous == OrderStatus.COMPLETED:
+                points = self.point_service.calculate_points(row.amount)
+                if points > 0:
+                    self.point_service.deduct_points_for_refund(row.user_id, row.id, points, commit=False)
 
-        order.status = OrderStatus.REFUNDED
-        order.refunded_at = utc_now()
-        self.db.commit()
-        self.db.refresh(order)
-        return order
+        return self._transition(order_id, user_id, OrderStatus.REFUNDED, deduct, refunded_at=utc_now())
 
     def list_orders_by_user(
         self,
@@ -0,0 +1,175 @@
+"""Bulk order settlement service."""
+import logging
+import os
+from typing import Iterable, Iterator, List
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.job_store import job_store, JobStatus
+from app.db.session import SessionLocal
+from app.models.point_transaction import PointTransactionType, PointTransactionReason
+from app.repositories.order_repository import OrderRepository
+from app.schemas.order import OrderSettlementResponse
+from app.services.admin_service import AdminService
+from app.services.point_service import PointService
+from app.utils.timezone_utils import utc_now
+
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = "orders_settle"
+
+
+def parse_order_ids(lines: Iterable[str], report: "SettlementReport") -> Iterator[int]:
+    """Parse one order id per line; blank lines and '#' comments are ignored."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            yield int(line.split(",", 1)[0])
+        except ValueError:
+            report.invalid += 1
+
+
+class SettlementReport:
+    """Running totals of a settlement run."""
+
+    def __init__(self):
+        self.received = 0
+        self.settled = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.points_awarded = 0
+        self.users_credited = 0
+
+    def to_response(self) -> OrderSettlementResponse:
+        return OrderSettlementResponse(
+            received=self.received,
+            settled=self.settled,
+            skipped=self.skipped,
+            invalid=self.invalid,
+            points_awarded=self.points_awarded,
+            users_credited=self.users_credited,
+        )
+
+    def progress(self) -> dict:
+        return self.to_response().model_dump()
+
+
+class OrderSettlementService:
+    """
+    Settle orders in bulk.
+
+    Each batch is one transaction: a conditional UPDATE claims the orders that
+    can still be completed and ``PointService.post_batch`` credits them with
+    one per-user aggregated UPDATE and multi-row
+    INSERT ... ON CONFLICT (idempotency_key) DO NOTHING. Idempotency keys match
+    the single-order path (``order_points:{order_id}``), so orders that already
+    earned points there are completed without being credited again.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.order_repo = OrderRepository(db)
+        self.point_service = PointService(db)
+
+    def settle_stream(
+        self,
+        order_ids: Iterable[int],
+        chunk_size: int = None,
+        report: SettlementReport = None,
+        on_progress=None,
+    ) -> SettlementReport:
+        """Settle a stream of order ids in chunked transactions; ``on_progress(report)`` runs after each."""
+        chunk_size = chunk_size or settings.ORDER_SETTLEMENT_CHUNK_SIZE
+        report = report or SettlementReport()
+
+        batch: List[int] = []
+        for order_id in order_ids:
+            batch.append(order_id)
+            if len(batch) >= chunk_size:
+                self.settle_batch(batch, report)
+                batch = []
+                if on_progress:
+                    on_progress(report)
+        if batch:
+            self.settle_batch(batch, report)
+        if on_progress:
+            on_progress(report)
+
+        return report
+
+    def settle_batch(self, order_ids: List[int], report: SettlementReport) -> None:
+        """Settle one batch of orders in a single transaction."""
+        order_ids = list(dict.fromkeys(order_ids))
+        report.received += len(order_ids)
+
+        try:
+            claimed = self.order_repo.claim_for_completion(order_ids, utc_now())
+            if not claimed:
+                self.db.commit()
+                report.skipped += len(order_ids)
+                return
+
+            result = self.point_service.post_batch([
+                {
+                    "user_id": user_id,
+                    "points": PointService.calculate_points(amount),
+                    "transaction_type": PointTransactionType.EARN,
+                    "reason": PointTransactionReason.ORDER_COMPLETE,
+                    "order_id": order_id,
+                    "idempotency_key": f"order_points:{order_id}",
+                    "description": "订单完成奖励积分",
+                }
+                for order_id, user_id, amount in sorted(claimed)
+            ], guard_balance=False)
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        points = sum(row["points"] for row in result.rows)
+        report.settled += len(claimed)
+        report.skipped += len(order_ids) - len(claimed)
+        report.points_awarded += points
+        report.users_credited += len({row["user_id"] for row in result.rows})
+
+        logger.info(
+            "Settled batch: received=%d settled=%d skipped=%d points=%d",
+            len(order_ids), len(claimed), len(order_ids) - len(claimed), points,
+        )
+
+
+def run_settlement_job(job_id: str, path: str, filename: str, admin_user_id: int, trace_id: str = None) -> None:
+    """Background task: settle an uploaded order id file, record progress and write one audit entry."""
+    db = SessionLocal()
+    report = SettlementReport()
+
+    def on_progress(current: SettlementReport) -> None:
+        job_store.update(job_id, progress=current.progress())
+
+    try:
+        job_store.update(job_id, status=JobStatus.RUNNING)
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            OrderSettlementService(db).settle_stream(parse_order_ids(stream, report), report=report, on_progress=on_progress)
+        job_store.update(job_id, status=JobStatus.COMPLETED, progress=report.progress())
+    except Exception as e:
+        logger.error("Order settlement job %s failed", job_id, exc_info=True)
+        job_store.update(job_id, status=JobStatus.FAILED, error=str(e), progress=report.progress())
+    finally:
+        try:
+            AdminService(db).log_action(
+                admin_user_id=admin_user_id,
+                action="settle",
+                resource="orders",
+                resource_id=job_id,
+                details=(
+                    f"Settled orders from {filename}: received={report.received}, settled={report.settled}, "
+                    f"skipped={report.skipped}, invalid={report.invalid}, points={report.points_awarded}"
+                ),
+                trace_id=trace_id,
+            )
+        finally:
+            db.close()
+            os.unlink(path)
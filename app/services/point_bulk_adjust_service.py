@@ -0,0 +1,196 @@
+"""Bulk point adjustment from CSV, run as a background job."""
+import csv
+import hashlib
+import logging
+import os
+from typing import List, TextIO
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.job_store import job_store, JobStatus
+from app.db.session import SessionLocal
+from app.models.point_transaction import PointTransactionType, PointTransactionReason
+from app.repositories.user_repository import UserRepository
+from app.schemas.admin import PointAdjustRow, ImportRowError
+from app.services.admin_service import AdminService
+from app.services.point_service import PointService
+
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = "points_bulk_adjust"
+
+
+def file_batch_key(path: str) -> str:
+    """Batch key derived from a file's content, so re-uploading the same file is a no-op."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(block)
+    return f"sha256-{digest.hexdigest()[:32]}"
+
+
+class BulkAdjustReport:
+    """Running totals of a bulk adjustment; per-row errors are capped to keep memory bounded."""
+
+    def __init__(self, max_errors: int = None):
+        self.max_errors = settings.POINTS_BULK_ADJUST_MAX_ERRORS if max_errors is None else max_errors
+        self.total_rows = 0
+        self.applied = 0
+        self.already_applied = 0
+        self.failed = 0
+        self.points_credited = 0
+        self.points_debited = 0
+        self.errors: List[ImportRowError] = []
+        self.errors_truncated = False
+
+    def add_error(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(ImportRowError(line=line, error=error))
+        else:
+            self.errors_truncated = True
+
+    def progress(self) -> dict:
+        return {
+            "total_rows": self.total_rows,
+            "applied": self.applied,
+            "already_applied": self.already_applied,
+            "failed": self.failed,
+            "points_credited": self.points_credited,
+            "points_debited": self.points_debited,
+        }
+
+
+class PointBulkAdjustService:
+    """
+    Apply point adjustments from a CSV stream in chunked transactions.
+
+    Columns: ``user_id``, ``points`` (signed) and an optional per-row
+    ``reason``. Rows are validated as they are read; each chunk goes through
+    ``PointService.post_batch``. Ledger keys are
+    ``bulk_adjust:{batch_key}:{line}``, so re-running a file with the same
+    batch key never applies a row twice. Each user's rows are applied in
+    file order and only the debits that would overdraw are rejected.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.point_service = PointService(db)
+        self.user_repo = UserRepository(db)
+
+    def adjust_stream(
+        self,
+        stream: TextIO,
+        admin_user_id: int,
+        default_reason: str,
+        batch_key: str,
+        chunk_size: int = None,
+        on_progress=None,
+    ) -> BulkAdjustReport:
+        chunk_size = chunk_size or settings.POINTS_BULK_ADJUST_CHUNK_SIZE
+        report = BulkAdjustReport()
+        chunk: List[tuple[int, PointAdjustRow]] = []
+
+        reader = csv.DictReader(stream)
+        for raw in reader:
+            report.total_rows += 1
+            try:
+                row = PointAdjustRow(**{k: v for k, v in raw.items() if k and v not in ("", None)})
+            except ValidationError as e:
+                report.add_error(reader.line_num, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= chunk_size:
+                self._apply_chunk(chunk, admin_user_id, default_reason, batch_key, report)
+                chunk = []
+                if on_progress:
+                    on_progress(report)
+
+        if chunk:
+            self._apply_chunk(chunk, admin_user_id, default_reason, batch_key, report)
+        if on_progress:
+            on_progress(report)
+        return report
+
+    def _apply_chunk(
+        self,
+        chunk: List[tuple[int, PointAdjustRow]],
+        admin_user_id: int,
+        default_reason: str,
+        batch_key: str,
+        report: BulkAdjustReport,
+    ) -> None:
+        try:
+            result = self.point_service.post_batch([
+                {
+                    "user_id": row.user_id,
+                    "points": row.points,
+                    "transaction_type": PointTransactionType.ADJUST,
+                    "reason": PointTransactionReason.ADMIN_ADJUST,
+                    "idempotency_key": f"bulk_adjust:{batch_key}:{line}",
+                    "description": row.reason or default_reason,
+                    "admin_user_id": admin_user_id,
+                }
+                for line, row in chunk
+            ])
+            missing = result.rejected_users - self.user_repo.existing_ids(result.rejected_users)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        for line, row in chunk:
+            key = f"bulk_adjust:{batch_key}:{line}"
+            if row.user_id in missing:
+                report.add_error(line, "user not found")
+            elif row.user_id in result.rejected_users or key in result.rejected_keys:
+                report.add_error(line, "insufficient points")
+            elif key in result.skipped_keys:
+                report.already_applied += 1
+        # Validation errors of later lines were recorded while the chunk was read.
+        report.errors.sort(key=lambda e: e.line)
+
+        report.applied += len(result.rows)
+        report.points_credited += sum(r["points"] for r in result.rows if r["points"] > 0)
+        report.points_debited -= sum(r["points"] for r in result.rows if r["points"] < 0)
+
+
+def run_bulk_adjust_job(job_id: str, path: str, admin_user_id: int, reason: str, batch_key: str, trace_id: str = None) -> None:
+    """Background task: apply an uploaded CSV, record progress and write one audit entry."""
+    db = SessionLocal()
+    report = None
+
+    def on_progress(current: BulkAdjustReport) -> None:
+        job_store.update(
+            job_id,
+            progress=current.progress(),
+            errors=[e.model_dump() for e in current.errors],
+            errors_truncated=current.errors_truncated,
+        )
+
+    try:
+        job_store.update(job_id, status=JobStatus.RUNNING)
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            report = PointBulkAdjustService(db).adjust_stream(stream, admin_user_id, reason, batch_key, on_progress=on_progress)
+        job_store.update(job_id, status=JobStatus.COMPLETED)
+    except Exception as e:
+        logger.error("Bulk point adjustment job %s failed", job_id, exc_info=True)
+        job_store.update(job_id, status=JobStatus.FAILED, error=str(e))
+    finally:
+        try:
+            progress = report.progress() if report else (job_store.get(job_id) or {}).get("progress") or {}
+            AdminService(db).log_action(
+                admin_user_id=admin_user_id,
+                action="bulk_adjust",
+                resource="points",
+                resource_id=job_id,
+                details=f"batch_key={batch_key}, reason={reason}, " + ", ".join(f"{k}={v}" for k, v in progress.items()),
+                trace_id=trace_id,
+            )
+        finally:
+            db.close()
+            os.unlink(path)
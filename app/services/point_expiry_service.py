@@ -0,0 +1,121 @@
+"""Point expiry sweep service."""
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import List
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.point_transaction import PointTransactionType, PointTransactionReason
+from app.repositories.point_lot_repository import PointLotRepository
+from app.repositories.point_repository import PointRepository
+from app.repositories.point_rollup_repository import PointRollupRepository
+from app.repositories.user_repository import UserRepository
+from app.utils.timezone_utils import utc_now, current_beijing_period
+
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySummary:
+    """Running totals of an expiry sweep."""
+
+    def __init__(self):
+        self.batches = 0
+        self.lots_expired = 0
+        self.points_expired = 0
+        self.users_affected = 0
+
+
+class PointExpiryService:
+    """
+    Expire due point lots in index-driven batches.
+
+    Each batch reads the next due lots from the partial (expires_at, id) index
+    over open lots, so the sweep never scans closed lots or lots that are not
+    yet due. Per batch, in one transaction: lock the affected users, re-read the
+    lots (a concurrent debit may have consumed them), take the remaining points
+    off the balances with one set-based UPDATE, write one ``expire`` ledger row
+    per lot and close the lots. Expired lots drop out of the index, so the next
+    batch simply asks for the first due lots again.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.lot_repo = PointLotRepository(db)
+        self.point_repo = PointRepository(db)
+        self.user_repo = UserRepository(db)
+        self.rollup_repo = PointRollupRepository(db)
+
+    def expire_due(
+        self,
+        now: datetime = None,
+        batch_size: int = None,
+        max_batches: int = None,
+        pause_seconds: float = 0,
+    ) -> ExpirySummary:
+        """Expire every lot due at ``now`` (default: current time)."""
+        now = now or utc_now()
+        batch_size = batch_size or settings.POINTS_EXPIRY_BATCH_SIZE
+        summary = ExpirySummary()
+
+        while max_batches is None or summary.batches < max_batches:
+            due = self.lot_repo.list_due(now, batch_size)
+            if not due:
+                break
+            self._expire_batch([lot_id for lot_id, _ in due], {user_id for _, user_id in due}, summary)
+            summary.batches += 1
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+        logger.info(
+            "Point expiry finished: batches=%d lots=%d points=%d users=%d",
+            summary.batches, summary.lots_expired, summary.points_expired, summary.users_affected,
+        )
+        return summary
+
+    def _expire_batch(self, lot_ids: List[int], user_ids: set, summary: ExpirySummary) -> None:
+        try:
+            self.user_repo.lock_for_update(user_ids)
+            lots = self.lot_repo.get_open(lot_ids)
+
+            per_user = defaultdict(list)
+            for lot_id, user_id, remaining in lots:
+                per_user[user_id].append((lot_id, remaining))
+
+            # Debits always consume lots first, so open lots never exceed the balance.
+            balances = self.user_repo.apply_point_deltas(
+                {user_id: (-sum(r for _, r in items), 0) for user_id, items in per_user.items()},
+                guard_balance=False,
+            )
+
+            rows = []
+            for user_id, items in per_user.items():
+                balance = balances[user_id][0]
+                user_rows = []
+                for lot_id, remaining in reversed(items):
+                    user_rows.append({
+                        "user_id": user_id,
+                        "transaction_type": PointTransactionType.EXPIRE,
+                        "reason": PointTransactionReason.POINTS_EXPIRE,
+                        "points": -remaining,
+                        "balance_after": balance,
+                        "idempotency_key": f"points_expire:{lot_id}",
+                        "description": "积分过期",
+                    })
+                    balance += remaining
+                rows.extend(reversed(user_rows))
+
+            self.point_repo.bulk_create(rows)
+            self.rollup_repo.add(current_beijing_period(), [
+                (row["user_id"], row["reason"], row["points"]) for row in rows
+            ])
+            self.lot_repo.close([lot_id for lot_id, _, _ in lots])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        summary.lots_expired += len(lots)
+        summary.points_expired += sum(remaining for _, _, remaining in lots)
+        summary.users_affected += len(per_user)
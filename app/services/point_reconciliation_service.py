@@ -0,0 +1,128 @@
+"""Points ledger reconciliation service."""
+import logging
+from typing import Callable, List
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.db.dialect import is_postgresql
+from app.repositories.point_checkpoint_repository import PointCheckpointRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReconciliationSummary:
+    """Counters for one reconciliation run (drift records are streamed, not kept)."""
+
+    def __init__(self):
+        self.users_checked = 0
+        self.users_with_drift = 0
+        self.checkpoints_written = 0
+
+    def merge(self, other: "ReconciliationSummary") -> None:
+        self.users_checked += other.users_checked
+        self.users_with_drift += other.users_with_drift
+        self.checkpoints_written += other.checkpoints_written
+
+
+class PointReconciliationService:
+    """
+    Compare denormalized user balances with the points ledger.
+
+    Each user is checked as ``checkpoint + sum(ledger rows after checkpoint)``
+    against ``users.available_points`` / ``total_earned_points``. Every ledger
+    write locks the user row before inserting, so per-user transaction ids grow
+    in commit order and a checkpoint's ``last_transaction_id`` is a safe
+    high-water mark.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.checkpoint_repo = PointCheckpointRepository(db)
+
+    def reconcile_range(
+        self,
+        start_id: int,
+        end_id: int,
+        chunk_size: int = None,
+        write_checkpoints: bool = False,
+        on_drift: Callable[[dict], None] = None,
+    ) -> ReconciliationSummary:
+        """
+        Reconcile users with ``start_id <= id < end_id`` chunk by chunk.
+
+        Args:
+            start_id: First user id (inclusive)
+            end_id: Last user id (exclusive)
+            chunk_size: Users per chunk/transaction
+            write_checkpoints: Advance checkpoints for users without drift
+            on_drift: Called with a drift record for every mismatching user
+
+        Returns:
+            Summary counters
+        """
+        chunk_size = chunk_size or settings.POINTS_RECONCILE_CHUNK_SIZE
+        summary = ReconciliationSummary()
+
+        for chunk_start in range(start_id, end_id, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end_id)
+            try:
+                self._reconcile_chunk(chunk_start, chunk_end, write_checkpoints, summary, on_drift)
+            except Exception:
+                self.db.rollback()
+                raise
+
+        return summary
+
+    def _reconcile_chunk(
+        self,
+        start_id: int,
+        end_id: int,
+        write_checkpoints: bool,
+        summary: ReconciliationSummary,
+        on_drift: Callable[[dict], None] = None,
+    ) -> None:
+        if is_postgresql(self.db):
+            # Read balances and ledger from one snapshot so in-flight writes cannot show up as drift.
+            self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        yield_per = settings.POINTS_RECONCILE_YIELD_PER
+        deltas = {row[0]: row for row in self.checkpoint_repo.iter_ledger_deltas(start_id, end_id, yield_per)}
+
+        checkpoints: List[dict] = []
+        for user_id, available, earned, cp_transaction_id, cp_available, cp_earned in \
+                self.checkpoint_repo.iter_balances(start_id, end_id, yield_per):
+            summary.users_checked += 1
+            delta = deltas.get(user_id)
+            expected_available = cp_available + (delta[1] if delta else 0)
+            expected_earned = cp_earned + (delta[2] if delta else 0)
+
+            if available != expected_available or earned != expected_earned:
+                summary.users_with_drift += 1
+                if on_drift:
+                    on_drift({
+                        "user_id": user_id,
+                        "available_points": available,
+                        "expected_available_points": expected_available,
+                        "total_earned_points": earned,
+                        "expected_total_earned_points": expected_earned,
+                        "checkpoint_transaction_id": cp_transaction_id,
+                        "transactions_since_checkpoint": delta[4] if delta else 0,
+                    })
+                continue
+
+            if write_checkpoints and delta:
+                checkpoints.append({
+                    "user_id": user_id,
+                    "last_transaction_id": delta[3],
+                    "available_points": available,
+                    "total_earned_points": earned,
+                })
+
+        self.checkpoint_repo.upsert(checkpoints)
+        self.db.commit()
+        summary.checkpoints_written += len(checkpoints)
+
+        logger.info(
+            "Reconciled users [%d, %d): checked=%d drift=%d checkpoints=%d",
+            start_id, end_id, summary.users_checked, summary.users_with_drift, summary.checkpoints_written,
+        )
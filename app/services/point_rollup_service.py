@@ -0,0 +1,50 @@
+"""Point rollup rebuild service."""
+import logging
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.repositories.point_rollup_repository import PointRollupRepository
+from app.repositories.user_repository import UserRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class PointRollupService:
+    """
+    Rebuild monthly point rollups from the ledger.
+
+    Rollups are kept current by the point write paths; a rebuild is only
+    needed after backfills, manual ledger fixes or when changing how periods
+    are bucketed. Each chunk of users is rebuilt in its own transaction with
+    those users locked, so concurrent point writes wait instead of racing the
+    rebuild.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.user_repo = UserRepository(db)
+        self.rollup_repo = PointRollupRepository(db)
+
+    def rebuild_range(self, start_id: int, end_id: int, chunk_size: int = None) -> int:
+        """
+        Rebuild rollups for users with ``start_id <= id < end_id``.
+
+        Returns:
+            Number of rollup rows written
+        """
+        chunk_size = chunk_size or settings.POINTS_ROLLUP_REBUILD_CHUNK_SIZE
+        written = 0
+
+        for chunk_start in range(start_id, end_id, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end_id)
+            try:
+                self.user_repo.lock_id_range(chunk_start, chunk_end)
+                rows = self.rollup_repo.rebuild(chunk_start, chunk_end)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            written += rows
+            logger.info("Rebuilt point rollups for users [%d, %d): rows=%d", chunk_start, chunk_end, rows)
+
+        return written
@@ -1,12 +1,34 @@
 """Point service for points management."""
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_FLOOR
+from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.config import settings
+from app.db.session import SessionLocal
 from app.models.point_transaction import PointTransaction, PointTransactionType, PointTransactionReason
 from app.models.user import User
+from app.schemas.user import PointSummaryResponse, PointPeriodSummary, PointReasonSummary
 from app.repositories.user_repository import UserRepository
 from app.repositories.point_repository import PointRepository
+from app.repositories.point_lot_repository import PointLotRepository
+from app.repositories.point_rollup_repository import PointRollupRepository
+from app.services.member_level_service import MemberLevelService
 from app.core.error_codes import ErrorCode, BusinessException
 from app.utils.redis_client import redis_client
+from app.utils.timezone_utils import utc_now, current_beijing_period
+
+
+class PointBatchResult:
+    """Outcome of ``PointService.post_batch``."""
+
+    def __init__(self):
+        self.rows: List[dict] = []
+        self.skipped_keys: set = set()
+        self.rejected_keys: set = set()
+        self.rejected_users: set = set()
 
 
 class PointService:
@@ -16,6 +38,16 @@ class PointService:
         self.db = db
         self.user_repo = UserRepository(db)
         self.point_repo = PointRepository(db)
+        self.lot_repo = PointLotRepository(db)
+        self.rollup_repo = PointRollupRepository(db)
+        self.level_service = MemberLevelService(db)
+
+    @staticmethod
+    def lot_expiry(earned_at: datetime = None) -> Optional[datetime]:
+        """Expiry date for points earned at ``earned_at``, or None when expiry is disabled."""
+        if settings.POINTS_EXPIRY_DAYS <= 0:
+            return None
+        return (earned_at or utc_now()) + timedelta(days=settings.POINTS_EXPIRY_DAYS)
 
     @staticmethod
     def calculate_points(amount: Decimal) -> int:
@@ -34,7 +66,7 @@ class PointService:
         points = int(floored)
         return max(points, 0)
 
-    def earn_points_from_order(self, user_id: int, order_id: int, amount: Decimal) -> PointTransaction:
+    def earn_points_from_order(self, user_id: int, order_id: int, amount: Decimal, commit: bool = True) -> PointTransaction:
         """
         Earn points from order completion.
 
@@ -42,6 +74,7 @@ class PointService:
             user_id: User ID
             order_id: Order ID
             amount: Order amount (1 yuan = 1 point)
+            commit: False to leave the caller's transaction open (see ``_post_transaction``)
 
         Returns:
             Point transaction record
@@ -49,51 +82,18 @@ class PointService:
         # Calculate points (1 yuan = 1 point, floor strategy)
         points = self.calculate_points(amount)
 
-        # Idempotency key
-        idempotency_key = f"order_points:{order_id}"
-
-        # Check if already processed
-        existing = self.point_repo.get_by_idempotency_key(idempotency_key)
-        if existing:
-            return existing
-
-        # Use distributed lock
-        lock_key = f"idempotency:{idempotency_key}"
-        if not redis_client.setnx(lock_key, "1"):
-            # Already being processed
-            raise BusinessException(ErrorCode.IDEMPOTENCY_CONFLICT)
-
-        try:
-            redis_client.expire(lock_key, 300)  # 5 minutes
-
-            # Get user
-            user = self.user_repo.get_by_id(user_id)
-            if not user:
-                raise BusinessException(ErrorCode.USER_NOT_FOUND)
-
-            # Update user points
-            user.available_points += points
-            user.total_earned_points += points
-
-            # Create transaction record
-            transaction = self.point_repo.create(
-                user_id=user_id,
-                transaction_type=PointTransactionType.EARN,
-                reason=PointTransactionReason.ORDER_COMPLETE,
-                points=points,
-                balance_after=user.available_points,
-                order_id=order_id,
-                idempotency_key=idempotency_key,
-                description=f"订单完成奖励积分"
-            )
-
-            self.db.commit()
-            return transaction
-
-        finally:
-            redis_client.delete(lock_key)
+        return self._post_transaction(
+            user_id=user_id,
+            points=points,
+            transaction_type=PointTransactionType.EARN,
+            reason=PointTransactionReason.ORDER_COMPLETE,
+            order_id=order_id,
+            idempotency_key=f"order_points:{order_id}",
+            description=f"订单完成奖励积分",
+            commit=commit,
+        )
 
-    def deduct_points_for_refund(self, user_id: int, order_id: int, points: int) -> PointTransaction:
+    def deduct_points_for_refund(self, user_id: int, order_id: int, points: int, commit: bool = True) -> PointTransaction:
         """
         Deduct points for order refund.
 
@@ -101,55 +101,54 @@ class PointService:
             user_id: User ID
             order_id: Order ID
             points: Points to deduct
+            commit: False to leave the caller's transaction open (see ``_post_transaction``)
 
         Returns:
             Point transaction record
         """
-        # Idempotency key
-        idempotency_key = f"refund_points:{order_id}"
+        return self._post_transaction(
+            user_id=user_id,
+            points=-points,
+            transaction_type=PointTransactionType.DEDUCT,
+            reason=PointTransactionReason.ORDER_REFUND,
+            order_id=order_id,
+            idempotency_key=f"refund_points:{order_id}",
+            description=f"订单退款扣除积分",
+            commit=commit,
+        )
 
-        # Check if already processed
-        existing = self.point_repo.get_by_idempotency_key(idempotency_key)
-        if existing:
-            return existing
+    def redeem_points(self, user_id: int, points: int, idempotency_key: str, description: str = None) -> PointTransaction:
+        """
+        Redeem (spend) points.
 
-        # Use distributed lock
-        lock_key = f"idempotency:{idempotency_key}"
-        if not redis_client.setnx(lock_key, "1"):
-            raise BusinessException(ErrorCode.IDEMPOTENCY_CONFLICT)
+        The balance check and decrement are one conditional UPDATE
+        (``available_points >= :points``), so redemptions on a hot account are
+        serialized by the row lock alone and can never overdraw.
 
-        try:
-            redis_client.expire(lock_key, 300)
-
-            # Get user
-            user = self.user_repo.get_by_id(user_id)
-            if not user:
-                raise BusinessException(ErrorCode.USER_NOT_FOUND)
-
-            # Check sufficient points
-            if user.available_points < points:
-                raise BusinessException(ErrorCode.INSUFFICIENT_POINTS)
-
-            # Update user points
-            user.available_points -= points
-
-            # Create transaction record
-            transaction = self.point_repo.create(
-                user_id=user_id,
-                transaction_type=PointTransactionType.DEDUCT,
-                reason=PointTransactionReason.ORDER_REFUND,
-                points=-points,
-                balance_after=user.available_points,
-                order_id=order_id,
-                idempotency_key=idempotency_key,
-                description=f"订单退款扣除积分"
-            )
-
-            self.db.commit()
-            return transaction
+        Args:
+            user_id: User ID
+            points: Points to spend (positive)
+            idempotency_key: Client supplied key; retries with the same key return the original transaction
+            description: Optional description
 
-        finally:
-            redis_client.delete(lock_key)
+        Returns:
+            Point transaction record
+        """
+        if points <= 0:
+            raise BusinessException(ErrorCode.INVALID_INPUT, details="兑换积分必须大于0")
+
+        transaction = self._post_transaction(
+            user_id=user_id,
+            points=-points,
+            transaction_type=PointTransactionType.DEDUCT,
+            reason=PointTransactionReason.POINTS_REDEEM,
+            idempotency_key=f"redeem:{user_id}:{idempotency_key}",
+            description=description or "积分兑换",
+        )
+        # The same key replayed with a different amount is a client bug, not a retry.
+        if transaction.points != -points:
+            raise BusinessException(ErrorCode.IDEMPOTENCY_CONFLICT)
+        return transaction
 
     def adjust_points(self, user_id: int, points: int, reason: str, admin_user_id: int) -> PointTransaction:
         """
@@ -164,36 +163,290 @@ class PointService:
         Returns:
             Point transaction record
         """
-        # Get user
-        user = self.user_repo.get_by_id(user_id)
-        if not user:
-            raise BusinessException(ErrorCode.USER_NOT_FOUND)
+        return self._post_transaction(
+            user_id=user_id,
+            points=points,
+            transaction_type=PointTransactionType.ADJUST,
+            reason=PointTransactionReason.ADMIN_ADJUST,
+            description=reason,
+            admin_user_id=admin_user_id,
+        )
+
+    def _post_transaction(
+        self,
+        user_id: int,
+        points: int,
+        transaction_type: PointTransactionType,
+        reason: PointTransactionReason,
+        order_id: int = None,
+        idempotency_key: str = None,
+        description: str = None,
+        admin_user_id: int = None,
+        commit: bool = True,
+    ) -> PointTransaction:
+        """
+        Apply a balance change and write its ledger row in one transaction.
+
+        The balance is changed with a single conditional UPDATE ... RETURNING, so
+        concurrent requests never lose updates and deductions cannot overdraw.
+        The unique idempotency_key on the ledger row makes retries safe: a
+        duplicate insert rolls the whole transaction back and the original
+        transaction is returned instead.
+
+        Lots, monthly rollups and the member level are touched only after the
+        UPDATE has locked the user row.
+
+        With ``commit=False`` the changes are only flushed, so they commit or
+        roll back with the caller's other writes. The caller expects to post
+        the entry exactly once, so an already recorded idempotency key raises
+        IDEMPOTENCY_CONFLICT instead of returning the original transaction,
+        and the caller must roll back.
+        """
+        if idempotency_key:
+            existing = self.point_repo.get_by_idempotency_key(idempotency_key)
+            if existing:
+                if not commit:
+                    raise BusinessException(ErrorCode.IDEMPOTENCY_CONFLICT)
+                return existing
+
+        with self._idempotency_lock(idempotency_key):
+            try:
+                # Positive amounts count towards lifetime earned points.
+                balance = self.user_repo.apply_point_delta(user_id, points, earned_delta=max(points, 0))
+                if balance is None:
+                    if not self.user_repo.get_by_id(user_id):
+                        raise BusinessException(ErrorCode.USER_NOT_FOUND)
+                    raise BusinessException(ErrorCode.INSUFFICIENT_POINTS)
+
+                # Create transaction record
+                transaction = self.point_repo.create(
+                    user_id=user_id,
+                    transaction_type=transaction_type,
+                    reason=reason,
+                    points=points,
+                    balance_after=balance[0],
+                    order_id=order_id,
+                    idempotency_key=idempotency_key,
+                    description=description,
+                    admin_user_id=admin_user_id,
+                )
+
+                self.rollup_repo.add(current_beijing_period(), [(user_id, reason, points)])
+
+                # Credits open a lot; debits consume open lots FIFO.
+                if points > 0:
+                    expires_at = self.lot_expiry()
+                    if expires_at:
+                        self.lot_repo.create(user_id, transaction.id, points, expires_at)
+                elif points < 0:
+                    self.lot_repo.consume(user_id, -points)
+
+                if points > 0:
+                    self.level_service.apply_earned({user_id: (balance[1], balance[2])}, source="points")
+
+                if commit:
+                    self.db.commit()
+                return transaction
+
+            except IntegrityError:
+                # A concurrent request may have recorded this idempotency key.
+                if not commit:
+                    if idempotency_key and self._is_recorded(idempotency_key):
+                        raise BusinessException(ErrorCode.IDEMPOTENCY_CONFLICT)
+                    raise
+                self.db.rollback()
+                existing = self.point_repo.get_by_idempotency_key(idempotency_key) if idempotency_key else None
+                if existing:
+                    return existing
+                raise
+
+    @staticmethod
+    def _is_recorded(idempotency_key: str) -> bool:
+        """Whether ``idempotency_key`` is committed, read in a separate session (the caller's is aborted)."""
+        db = SessionLocal()
+        try:
+            return PointRepository(db).get_by_idempotency_key(idempotency_key) is not None
+        finally:
+            db.close()
 
-        # Check if deduction would result in negative balance
-        if points < 0 and user.available_points < abs(points):
-            raise BusinessException(ErrorCode.INSUFFICIENT_POINTS)
+    def post_batch(self, entries: List[dict], guard_balance: bool = True) -> PointBatchResult:
+        """
+        Apply many ledger entries with set-based statements. Does not commit.
 
-        # Update user points
-        user.available_points += points
-        if points > 0:
-            user.total_earned_points += points
+        Each entry holds the ledger columns (user_id, points, transaction_type,
+        reason, idempotency_key and optionally order_id, description,
+        admin_user_id). Users are locked in id order, entries whose key is
+        already in the ledger are skipped, per-user totals go through one
+        UPDATE ... FROM (VALUES ...), and ledger rows, lots and rollups are
+        written with multi-row inserts. Users whose lifetime points crossed a
+        level threshold are promoted.
 
-        # Determine transaction type
-        transaction_type = PointTransactionType.ADJUST
+        With ``guard_balance`` each user's entries are walked in order from
+        the current balance and only the debits that would overdraw are
+        rejected; the user's other entries still apply.
 
-        # Create transaction record
-        transaction = self.point_repo.create(
-            user_id=user_id,
-            transaction_type=transaction_type,
-            reason=PointTransactionReason.ADMIN_ADJUST,
-            points=points,
-            balance_after=user.available_points,
-            description=reason,
-            admin_user_id=admin_user_id
+        Args:
+            entries: Ledger entries; each needs an idempotency_key
+            guard_balance: Reject debit entries that would take the balance below zero
+
+        Returns:
+            Inserted ledger rows (with transaction ids), skipped keys, rejected
+            (overdrawing) keys and rejected users (missing, or every entry
+            rejected because the balance changed concurrently)
+        """
+        result = PointBatchResult()
+        if not entries:
+            return result
+
+        self.user_repo.lock_for_update(entry["user_id"] for entry in entries)
+        existing = self.point_repo.existing_idempotency_keys([entry["idempotency_key"] for entry in entries])
+
+        per_user = defaultdict(list)
+        for entry in entries:
+            if entry["idempotency_key"] in existing:
+                result.skipped_keys.add(entry["idempotency_key"])
+            else:
+                per_user[entry["user_id"]].append(entry)
+
+        if guard_balance:
+            current = self.user_repo.get_balances(per_user)
+            for user_id, items in list(per_user.items()):
+                if user_id not in current:
+                    continue
+                running = current[user_id]
+                accepted = []
+                for entry in items:
+                    if entry["points"] < 0 and running + entry["points"] < 0:
+                        result.rejected_keys.add(entry["idempotency_key"])
+                        continue
+                    running += entry["points"]
+                    accepted.append(entry)
+                if accepted:
+                    per_user[user_id] = accepted
+                else:
+                    del per_user[user_id]
+
+        # The guard stays on the UPDATE as a backstop against concurrent writers.
+        balances = self.user_repo.apply_point_deltas(
+            {
+                user_id: (sum(e["points"] for e in items), sum(max(e["points"], 0) for e in items))
+                for user_id, items in per_user.items()
+            },
+            guard_balance=guard_balance,
+        )
+        result.rejected_users = set(per_user) - set(balances)
+
+        rows = []
+        for user_id, items in per_user.items():
+            if user_id not in balances:
+                continue
+            # Walk back from the final balance so each row carries its own balance_after.
+            balance = balances[user_id][0]
+            user_rows = []
+            for entry in reversed(items):
+                user_rows.append({
+                    "order_id": None,
+                    "description": None,
+                    "admin_user_id": None,
+                    **entry,
+                    "balance_after": balance,
+                })
+                balance -= entry["points"]
+            rows.extend(reversed(user_rows))
+
+        inserted = self.point_repo.bulk_create(rows)
+
+        # Backstop for a ledger row that appeared after the check above: never apply twice.
+        corrections = defaultdict(lambda: [0, 0])
+        for row in rows:
+            if row["idempotency_key"] in inserted:
+                result.rows.append({**row, "id": inserted[row["idempotency_key"]]})
+            else:
+                result.skipped_keys.add(row["idempotency_key"])
+                corrections[row["user_id"]][0] -= row["points"]
+                corrections[row["user_id"]][1] -= max(row["points"], 0)
+        if corrections:
+            balances.update(self.user_repo.apply_point_deltas(
+                {user_id: tuple(delta) for user_id, delta in corrections.items()}, guard_balance=False
+            ))
+
+        self.rollup_repo.add(current_beijing_period(), [
+            (row["user_id"], row["reason"], row["points"]) for row in result.rows
+        ])
+
+        # Credits open lots; debits consume open lots FIFO.
+        expires_at = self.lot_expiry()
+        if expires_at:
+            self.lot_repo.bulk_create([
+                {"user_id": row["user_id"], "transaction_id": row["id"], "points": row["points"], "expires_at": expires_at}
+                for row in result.rows
+                if row["points"] > 0
+            ])
+        debits = defaultdict(int)
+        for row in result.rows:
+            if row["points"] < 0:
+                debits[row["user_id"]] -= row["points"]
+        for user_id, points in debits.items():
+            self.lot_repo.consume(user_id, points)
+
+        earners = {row["user_id"] for row in result.rows if row["points"] > 0}
+        self.level_service.apply_earned(
+            {user_id: (balances[user_id][1], balances[user_id][2]) for user_id in earners}, source="points"
         )
 
-        self.db.commit()
-        return transaction
+        return result
+
+    @contextmanager
+    def _idempotency_lock(self, idempotency_key: str = None):
+        """
+        Optional Redis lock around an idempotent write.
+
+        Correctness comes from the ledger's unique idempotency_key; the lock only
+        saves duplicate work under retries and is disabled by default.
+        """
+        if not idempotency_key or not settings.POINTS_IDEMPOTENCY_LOCK_ENABLED:
+            yield
+            return
+
+        lock_key = f"idempotency:{idempotency_key}"
+        if not redis_client.setnx(lock_key, "1"):
+            # Already being processed
+            raise BusinessException(ErrorCode.IDEMPOTENCY_CONFLICT)
+
+        try:
+            redis_client.expire(lock_key, 300)  # 5 minutes
+            yield
+        finally:
+            redis_client.delete(lock_key)
+
+    def get_summary(self, user_id: int, start_period: str, end_period: str) -> PointSummaryResponse:
+        """Monthly point totals from the rollup table; reads O(periods x reasons) rows."""
+        periods = {}
+        for rollup in self.rollup_repo.list_by_user(user_id, start_period, end_period):
+            period = periods.setdefault(rollup.period, PointPeriodSummary(
+                period=rollup.period, points_earned=0, points_spent=0, net_points=0, transaction_count=0, reasons=[],
+            ))
+            period.points_earned += rollup.points_earned
+            period.points_spent += rollup.points_spent
+            period.net_points += rollup.points_earned - rollup.points_spent
+            period.transaction_count += rollup.transaction_count
+            period.reasons.append(PointReasonSummary(
+                reason=rollup.reason.value,
+                points_earned=rollup.points_earned,
+                points_spent=rollup.points_spent,
+                transaction_count=rollup.transaction_count,
+            ))
+
+        earned = sum(p.points_earned for p in periods.values())
+        spent = sum(p.points_spent for p in periods.values())
+        return PointSummaryResponse(
+            start_period=start_period,
+            end_period=end_period,
+            points_earned=earned,
+            points_spent=spent,
+            net_points=earned - spent,
+            periods=list(periods.values()),
+        )
 
     def get_transactions(self, user_id: int, skip: int = 0, limit: int = 20) -> tuple[list, int]:
         """Get user point transactions."""
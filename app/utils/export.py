@@ -0,0 +1,83 @@
+"""Streaming CSV / NDJSON export utilities."""
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, List, Sequence
+from fastapi.responses import StreamingResponse
+from app.db.session import SessionLocal
+from app.utils.timezone_utils import to_beijing_time
+
+
+EXPORT_FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Rows rendered per chunk written to the socket.
+EXPORT_CHUNK_ROWS = 500
+
+
+def export_value(value):
+    """Render one column value the way the JSON API does."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return to_beijing_time(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def iter_export_chunks(rows: Iterable[Sequence], columns: List[str], fmt: str) -> Iterator[str]:
+    """Render rows as CSV (with header) or NDJSON in chunks of ``EXPORT_CHUNK_ROWS``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        row = [export_value(value) for value in row]
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def streaming_export(
+    fetch: Callable,
+    columns: List[str],
+    fmt: str,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Stream an export as a chunked response.
+
+    ``fetch(db)`` must return an iterator of row tuples (typically a
+    ``yield_per`` result, i.e. a server-side cursor on PostgreSQL). The export
+    opens its own session: request-scoped sessions are closed before a
+    streaming body is sent.
+    """
+    def body() -> Iterator[str]:
+        db = SessionLocal()
+        try:
+            yield from iter_export_chunks(fetch(db), columns, fmt)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
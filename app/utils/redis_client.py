@@ -1,9 +1,15 @@
 """Redis client utility."""
 import redis
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 from app.config import settings
 
 
+# INCRBY that leaves a missing key missing instead of creating it from 0.
+INCRBY_EXISTING_SCRIPT = (
+    "if redis.call('EXISTS', KEYS[1]) == 1 then return redis.call('INCRBY', KEYS[1], ARGV[1]) end"
+)
+
+
 class RedisClient:
     """Redis client wrapper."""
 
@@ -35,9 +41,9 @@ class RedisClient:
         """Get value by key."""
         return self.client.get(key)
 
-    def set(self, key: str, value: str, ex: int = None) -> bool:
-        """Set key-value with optional expiry in seconds."""
-        return self.client.set(key, value, ex=ex)
+    def set(self, key: str, value: str, ex: int = None, nx: bool = False) -> bool:
+        """Set key-value with optional expiry in seconds; with nx, only if the key does not exist."""
+        return bool(self.client.set(key, value, ex=ex, nx=nx))
 
     def delete(self, key: str) -> int:
         """Delete key."""
@@ -47,6 +53,18 @@ class RedisClient:
         """Increment key value."""
         return self.client.incr(key)
 
+    def decr(self, key: str) -> int:
+        """Decrement key value."""
+        return self.client.decr(key)
+
+    def incrby(self, key: str, amount: int) -> int:
+        """Add amount (may be negative) to key value."""
+        return self.client.incrby(key, amount)
+
+    def incrby_existing(self, key: str, amount: int) -> Optional[int]:
+        """Add amount to key value if the key exists; None (and no key created) otherwise."""
+        return self.client.eval(INCRBY_EXISTING_SCRIPT, 1, key, amount)
+
     def expire(self, key: str, seconds: int) -> bool:
         """Set key expiry."""
         return self.client.expire(key, seconds)
@@ -63,6 +81,32 @@ class RedisClient:
         """Set key if not exists (for distributed lock)."""
         return self.client.setnx(key, value)
 
+    def getbit(self, key: str, offset: int) -> int:
+        """Get the bit at offset of a bitmap (0 when the key does not exist)."""
+        return self.client.getbit(key, offset)
+
+    def setbit(self, key: str, offset: int, value: int) -> int:
+        """Set the bit at offset of a bitmap; returns the previous bit."""
+        return self.client.setbit(key, offset, value)
+
+    def setbits(self, bits: Dict[str, Iterable[int]], ex: int = None) -> None:
+        """Set many bitmap bits in one round trip; ``bits`` maps a key to the offsets to set."""
+        pipe = self.client.pipeline(transaction=False)
+        for key, offsets in bits.items():
+            for offset in offsets:
+                pipe.setbit(key, offset, 1)
+            if ex:
+                pipe.expire(key, ex)
+        pipe.execute()
+
+    def rpush(self, key: str, *values: str) -> int:
+        """Append values to a list; returns the new length."""
+        return self.client.rpush(key, *values)
+
+    def lpop(self, key: str, count: int) -> List[str]:
+        """Pop up to ``count`` values from the head of a list (empty when there are none)."""
+        return self.client.lpop(key, count) or []
+
 
 # Global Redis client instance
 redis_client = RedisClient()
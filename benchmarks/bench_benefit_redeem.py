@@ -0,0 +1,137 @@
+"""
+Checkout-burst benchmark: many members redeem their coupons at once.
+
+Each member holds one distributed coupon and submits three redemptions for
+it: the original, a retry with the same request key and a double click with a
+new key. The run reports throughput and latency percentiles per concurrency
+level and checks the invariants afterwards: every coupon is used exactly
+once, by one of its own request keys, retries replay the redemption and
+double clicks are rejected.
+
+Usage:
+    python -m benchmarks.bench_benefit_redeem [--threads 1,8,32] [--members 1000]
+
+Runs against DATABASE_URL (defaults to a throwaway SQLite file) and needs
+Redis at REDIS_URL for the benefit catalog version. Point it at PostgreSQL
+for meaningful numbers; SQLite serializes all writers anyway.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+os.environ.setdefault("APP_ENV", "test")
+os.environ.setdefault("DATABASE_URL", f"sqlite+pysqlite:///{tempfile.gettempdir()}/bench_benefit_redeem.db")
+
+from sqlalchemy import func, select  # noqa: E402
+from app.core.error_codes import BusinessException, ErrorCode  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.benefit import BenefitDistribution, BenefitType  # noqa: E402
+from app.models.user import MemberLevel  # noqa: E402
+from app.repositories.benefit_repository import BenefitRepository  # noqa: E402
+from app.repositories.user_repository import UserRepository  # noqa: E402
+from app.services.benefit_service import BenefitService  # noqa: E402
+from app.utils.timezone_utils import utc_now  # noqa: E402
+
+
+def _create_coupons(members: int) -> list[tuple[int, int]]:
+    """Create ``members`` users holding one coupon each; returns (user_id, distribution_id)."""
+    db = SessionLocal()
+    try:
+        benefit_id = BenefitService(db).create_benefit("Bench coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE).id
+        benefits = BenefitRepository(db)
+        users = UserRepository(db)
+        expires_at = utc_now() + timedelta(days=1)
+        coupons = []
+        for _ in range(members):
+            user_id = users.create(email=f"bench-{uuid.uuid4().hex[:12]}@example.com").id
+            coupons.append((user_id, benefits.create_distribution(user_id, benefit_id, "bench", expires_at).id))
+        db.commit()
+        return coupons
+    finally:
+        db.close()
+
+
+def _redeem(user_id: int, distribution_id: int, key: str) -> tuple[float, str]:
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        BenefitService(db).redeem_benefit(user_id, distribution_id, key)
+        outcome = "ok"
+    except BusinessException as e:
+        if e.code != ErrorCode.BENEFIT_ALREADY_USED[0]:
+            raise
+        outcome = "used"
+    finally:
+        db.close()
+    return time.perf_counter() - start, outcome
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def _run(threads: int, members: int) -> None:
+    coupons = _create_coupons(members)
+    requests = []
+    for user_id, distribution_id in coupons:
+        key = f"checkout-{distribution_id}"
+        requests += [(user_id, distribution_id, key), (user_id, distribution_id, key), (user_id, distribution_id, key + "-again")]
+    random.shuffle(requests)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = [f.result() for f in [pool.submit(_redeem, *request) for request in requests]]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    ok = sum(1 for _, outcome in results if outcome == "ok")
+    rejected = len(results) - ok
+
+    winning_keys = {}
+    for (_, distribution_id, key), (_, outcome) in zip(requests, results):
+        if outcome == "ok":
+            winning_keys.setdefault(distribution_id, set()).add(key)
+
+    ids = [distribution_id for _, distribution_id in coupons]
+    db = SessionLocal()
+    try:
+        used, keyed = db.execute(
+            select(
+                func.count(BenefitDistribution.id),
+                func.count(BenefitDistribution.used_request_key),
+            ).where(BenefitDistribution.id.in_(ids), BenefitDistribution.is_used == True)
+        ).one()
+    finally:
+        db.close()
+
+    assert used == members, "a coupon was not redeemed"
+    assert keyed == members, "a redemption did not record its request key"
+    assert all(len(keys) == 1 for keys in winning_keys.values()), "a coupon was redeemed by two different keys"
+
+    print(
+        f"{threads:>8}{len(requests) / elapsed:>12.0f}{_percentile(latencies, 0.5) * 1000:>10.2f}"
+        f"{_percentile(latencies, 0.95) * 1000:>10.2f}{_percentile(latencies, 0.99) * 1000:>10.2f}"
+        f"{ok:>8}{rejected:>10}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", default="1,8,32", help="Comma separated concurrency levels")
+    parser.add_argument("--members", type=int, default=1000, help="Members (coupons) per level")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+
+    print(f"{'threads':>8}{'req/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ok':>8}{'rejected':>10}")
+    for threads in (int(t) for t in args.threads.split(",")):
+        _run(threads, args.members)
+
+
+if __name__ == "__main__":
+    main()
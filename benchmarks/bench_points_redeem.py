@@ -0,0 +1,118 @@
+"""
+Contention benchmark: many concurrent redemptions against one hot account.
+
+Every worker redeems from the same user, so all writes queue on a single row
+lock. The run reports throughput and latency percentiles per concurrency
+level and checks the invariants afterwards: the balance never goes negative
+and matches the ledger, and each idempotency key is applied at most once
+(every key is submitted twice).
+
+Usage:
+    python -m benchmarks.bench_points_redeem [--threads 1,8,32] [--ops 2000]
+
+Runs against DATABASE_URL (defaults to a throwaway SQLite file). Point it at
+PostgreSQL for meaningful numbers; SQLite serializes all writers anyway.
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("APP_ENV", "test")
+os.environ.setdefault("DATABASE_URL", f"sqlite+pysqlite:///{tempfile.gettempdir()}/bench_points_redeem.db")
+
+from sqlalchemy import func, select  # noqa: E402
+from app.core.error_codes import BusinessException, ErrorCode  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.point_transaction import PointTransaction  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.repositories.user_repository import UserRepository  # noqa: E402
+from app.services.point_service import PointService  # noqa: E402
+
+
+def _create_user(balance: int) -> int:
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).create(email=f"bench-{uuid.uuid4().hex[:12]}@example.com")
+        user.available_points = balance
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def _redeem(user_id: int, key: str) -> tuple[float, str]:
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        PointService(db).redeem_points(user_id, 1, key)
+        outcome = "ok"
+    except BusinessException as e:
+        if e.code != ErrorCode.INSUFFICIENT_POINTS[0]:
+            raise
+        outcome = "insufficient"
+    finally:
+        db.close()
+    return time.perf_counter() - start, outcome
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def _run(threads: int, ops: int, balance: int) -> None:
+    user_id = _create_user(balance)
+    counter = itertools.count()
+
+    def task():
+        return _redeem(user_id, f"bench:{next(counter) // 2}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = [f.result() for f in [pool.submit(task) for _ in range(ops)]]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    ok = sum(1 for _, outcome in results if outcome == "ok")
+
+    db = SessionLocal()
+    try:
+        available = db.get(User, user_id).available_points
+        ledger_total, ledger_rows = db.execute(
+            select(func.coalesce(func.sum(PointTransaction.points), 0), func.count(PointTransaction.id))
+            .where(PointTransaction.user_id == user_id)
+        ).one()
+    finally:
+        db.close()
+
+    assert available >= 0, "balance went negative"
+    assert available == balance + ledger_total, "balance does not match ledger"
+    assert ledger_rows <= (ops + 1) // 2, "an idempotency key was applied twice"
+
+    print(
+        f"{threads:>8}{ops / elapsed:>12.0f}{_percentile(latencies, 0.5) * 1000:>10.2f}"
+        f"{_percentile(latencies, 0.95) * 1000:>10.2f}{_percentile(latencies, 0.99) * 1000:>10.2f}"
+        f"{ok:>8}{ledger_rows:>9}{available:>9}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", default="1,8,32", help="Comma separated concurrency levels")
+    parser.add_argument("--ops", type=int, default=2000, help="Redemption requests per level")
+    parser.add_argument("--balance", type=int, default=None, help="Starting balance (default: ops // 3)")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    balance = args.balance if args.balance is not None else args.ops // 3
+
+    print(f"{'threads':>8}{'req/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ok':>8}{'ledger':>9}{'balance':>9}")
+    for threads in (int(t) for t in args.threads.split(",")):
+        _run(threads, args.ops, balance)
+
+
+if __name__ == "__main__":
+    main()
@@ -39,9 +39,47 @@ CREATE TABLE IF NOT EXISTS point_transactions (
 );
 
 CREATE INDEX idx_point_transactions_user_created ON point_transactions(user_id, created_at DESC);
+CREATE INDEX idx_point_transactions_user_id_id ON point_transactions(user_id, id);
 CREATE INDEX idx_point_transactions_order_id ON point_transactions(order_id);
 CREATE INDEX idx_point_transactions_idempotency_key ON point_transactions(idempotency_key);
 
+-- Create point_balance_checkpoints table (verified balance per user as of a ledger position)
+CREATE TABLE IF NOT EXISTS point_balance_checkpoints (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    last_transaction_id INTEGER DEFAULT 0 NOT NULL,
+    available_points INTEGER DEFAULT 0 NOT NULL,
+    total_earned_points INTEGER DEFAULT 0 NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+
+-- Create point_lots table (earned points with an expiry date, consumed FIFO)
+CREATE TABLE IF NOT EXISTS point_lots (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    transaction_id INTEGER NOT NULL REFERENCES point_transactions(id),
+    points INTEGER NOT NULL,
+    remaining_points INTEGER NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+
+CREATE INDEX idx_point_lots_user_open ON point_lots(user_id, expires_at, id) WHERE remaining_points > 0;
+CREATE INDEX idx_point_lots_expiry_open ON point_lots(expires_at, id) WHERE remaining_points > 0;
+
+-- Create point_rollups table (monthly totals per member and reason)
+CREATE TABLE IF NOT EXISTS point_rollups (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    period VARCHAR(7) NOT NULL,
+    reason VARCHAR(50) NOT NULL,
+    points_earned INTEGER DEFAULT 0 NOT NULL,
+    points_spent INTEGER DEFAULT 0 NOT NULL,
+    transaction_count INTEGER DEFAULT 0 NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+    PRIMARY KEY (user_id, period, reason)
+);
+
 -- Create orders table
 CREATE TABLE IF NOT EXISTS orders (
     id SERIAL PRIMARY KEY,
@@ -49,6 +87,7 @@ CREATE TABLE IF NOT EXISTS orders (
     user_id INTEGER NOT NULL REFERENCES users(id),
     amount NUMERIC(10, 2) NOT NULL,
     status VARCHAR(20) DEFAULT 'pending' NOT NULL,
+    version INTEGER DEFAULT 1 NOT NULL,
     product_name VARCHAR(200),
     product_description VARCHAR(1000),
     paid_at TIMESTAMPTZ,
@@ -71,6 +110,8 @@ CREATE TABLE IF NOT EXISTS benefits (
     benefit_type VARCHAR(50) NOT NULL,
     member_level VARCHAR(20) NOT NULL,
     value VARCHAR(100),
+    stock INTEGER,
+    stock_remaining INTEGER,
     is_active BOOLEAN DEFAULT TRUE NOT NULL,
     created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
     updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
@@ -88,10 +129,28 @@ CREATE TABLE IF NOT EXISTS benefit_distributions (
     expires_at TIMESTAMPTZ NOT NULL,
     is_used BOOLEAN DEFAULT FALSE NOT NULL,
     used_at TIMESTAMPTZ,
+    used_request_key VARCHAR(128),
     CONSTRAINT uq_user_benefit_period UNIQUE (user_id, benefit_id, period)
 );
 
 CREATE INDEX idx_benefit_distributions_user_expires ON benefit_distributions(user_id, expires_at);
+CREATE INDEX idx_benefit_distributions_expires ON benefit_distributions(expires_at, id);
+
+-- Create benefit_distribution_archive table (expired distributions, same ids)
+CREATE TABLE IF NOT EXISTS benefit_distribution_archive (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    benefit_id INTEGER NOT NULL,
+    period VARCHAR(7) NOT NULL,
+    distributed_at TIMESTAMPTZ NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    is_used BOOLEAN NOT NULL,
+    used_at TIMESTAMPTZ,
+    used_request_key VARCHAR(128),
+    archived_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+
+CREATE INDEX idx_benefit_archive_user_expires ON benefit_distribution_archive(user_id, expires_at);
 
 -- Create admin_users table
 CREATE TABLE IF NOT EXISTS admin_users (
@@ -168,12 +227,15 @@ INSERT INTO permissions (resource, action, description) VALUES
     ('users', 'view', 'View user list'),
     ('users', 'edit', 'Edit user information'),
     ('users', 'lock', 'Lock/unlock user accounts'),
+    ('users', 'import', 'Bulk import members'),
     ('points', 'view', 'View point transactions'),
     ('points', 'adjust', 'Adjust user points'),
+    ('points', 'bulk_adjust', 'Bulk adjust user points from a file'),
     ('benefits', 'view', 'View benefits'),
     ('benefits', 'create', 'Create benefits'),
     ('benefits', 'distribute', 'Distribute benefits'),
     ('orders', 'view', 'View orders'),
+    ('orders', 'settle', 'Bulk settle orders'),
     ('audit_logs', 'view', 'View audit logs')
 ON CONFLICT DO NOTHING;
 
@@ -245,6 +307,15 @@ $$ language 'plpgsql';
 CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_point_balance_checkpoints_updated_at BEFORE UPDATE ON point_balance_checkpoints
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_point_lots_updated_at BEFORE UPDATE ON point_lots
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_point_rollups_updated_at BEFORE UPDATE ON point_rollups
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_orders_updated_at BEFORE UPDATE ON orders
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
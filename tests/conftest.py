@@ -1,4 +1,5 @@
 import os
+import threading
 import time
 from dataclasses import dataclass
 from typing import Any, Optional
@@ -10,17 +11,38 @@ import pytest
 os.environ.setdefault("APP_ENV", "test")
 os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:////tmp/membership_test.db")
 os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DB_QUERY_BUDGET_STRICT", "true")
 
 
 @dataclass
 class _Value:
-    value: str
+    value: Any  # str, or a set of offsets for bitmaps
     expires_at: Optional[float] = None
 
 
+class _FakePipeline:
+    """Queues commands and runs them on ``execute``."""
+
+    def __init__(self, redis: "FakeRedis"):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        return [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
 class FakeRedis:
     def __init__(self):
         self._store: dict[str, _Value] = {}
+        # Commands are atomic in Redis; concurrency tests rely on that here too.
+        self._lock = threading.RLock()
 
     def close(self) -> None:
         return None
@@ -45,10 +67,14 @@ class FakeRedis:
         item = self._store.get(key)
         return item.value if item else None
 
-    def set(self, key: str, value: str, ex: int = None) -> bool:
-        expires_at = self._now() + ex if ex else None
-        self._store[key] = _Value(str(value), expires_at)
-        return True
+    def set(self, key: str, value: str, ex: int = None, nx: bool = False) -> bool:
+        with self._lock:
+            self._purge_if_expired(key)
+            if nx and key in self._store:
+                return False
+            expires_at = self._now() + ex if ex else None
+            self._store[key] = _Value(str(value), expires_at)
+            return True
 
     def delete(self, key: str) -> int:
         existed = 1 if key in self._store else 0
@@ -56,12 +82,32 @@ class FakeRedis:
         return existed
 
     def incr(self, key: str) -> int:
-        self._purge_if_expired(key)
-        current = int(self.get(key) or "0")
-        new_val = current + 1
-        expires_at = self._store.get(key).expires_at if key in self._store else None
-        self._store[key] = _Value(str(new_val), expires_at)
-        return new_val
+        return self.incrby(key, 1)
+
+    def decr(self, key: str) -> int:
+        return self.incrby(key, -1)
+
+    def incrby(self, key: str, amount: int) -> int:
+        with self._lock:
+            self._purge_if_expired(key)
+            current = int(self.get(key) or "0")
+            new_val = current + amount
+            expires_at = self._store.get(key).expires_at if key in self._store else None
+            self._store[key] = _Value(str(new_val), expires_at)
+            return new_val
+
+    def eval(self, script: str, numkeys: int, *keys_and_args):
+        # Only the scripts RedisClient sends are emulated.
+        from app.utils.redis_client import INCRBY_EXISTING_SCRIPT
+
+        if script != INCRBY_EXISTING_SCRIPT:
+            raise NotImplementedError(script)
+        key, amount = keys_and_args
+        with self._lock:
+            self._purge_if_expired(key)
+            if key not in self._store:
+                return None
+            return self.incrby(key, int(amount))
 
     def expire(self, key: str, seconds: int) -> bool:
         self._purge_if_expired(key)
@@ -84,11 +130,49 @@ class FakeRedis:
         return 1 if key in self._store else 0
 
     def setnx(self, key: str, value: str) -> bool:
+        with self._lock:
+            self._purge_if_expired(key)
+            if key in self._store:
+                return False
+            self._store[key] = _Value(str(value), None)
+            return True
+
+    def getbit(self, key: str, offset: int) -> int:
         self._purge_if_expired(key)
-        if key in self._store:
-            return False
-        self._store[key] = _Value(str(value), None)
-        return True
+        item = self._store.get(key)
+        return 1 if item and offset in item.value else 0
+
+    def setbit(self, key: str, offset: int, value: int) -> int:
+        self._purge_if_expired(key)
+        item = self._store.setdefault(key, _Value(set()))
+        previous = 1 if offset in item.value else 0
+        if value:
+            item.value.add(offset)
+        else:
+            item.value.discard(offset)
+        return previous
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+    def rpush(self, key: str, *values: str) -> int:
+        with self._lock:
+            self._purge_if_expired(key)
+            item = self._store.setdefault(key, _Value([]))
+            item.value.extend(str(v) for v in values)
+            return len(item.value)
+
+    def lpop(self, key: str, count: int = None):
+        with self._lock:
+            self._purge_if_expired(key)
+            item = self._store.get(key)
+            if not item or not item.value:
+                return None
+            popped = item.value[:count or 1]
+            del item.value[:count or 1]
+            if not item.value:
+                del self._store[key]
+            return popped if count else popped[0]
 
 
 @pytest.fixture(scope="session")
@@ -104,6 +188,11 @@ def _patch_redis(fake_redis, monkeypatch):
     monkeypatch.setattr(redis_client, "connect", lambda: None)
     monkeypatch.setattr(redis_client, "disconnect", lambda: None)
     redis_client._client = fake_redis
+    # The database is recreated per test; Redis state keyed by ids must not leak across tests.
+    fake_redis._store.clear()
+    from app.services.benefit_catalog import benefit_catalog
+
+    benefit_catalog.invalidate()
     yield
     # Keep fake redis for inspection across a test if needed.
 
@@ -118,6 +207,9 @@ def _reset_db():
     from app.models import benefit  # noqa: F401
     from app.models import order  # noqa: F401
     from app.models import point_transaction  # noqa: F401
+    from app.models import point_checkpoint  # noqa: F401
+    from app.models import point_lot  # noqa: F401
+    from app.models import point_rollup  # noqa: F401
     from app.models import user  # noqa: F401
 
     Base.metadata.drop_all(bind=engine)
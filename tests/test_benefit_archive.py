@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from app.db.session import SessionLocal
+from app.models.benefit import BenefitDistribution, BenefitType
+from app.models.user import MemberLevel
+from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.user_repository import UserRepository
+from app.services.benefit_archive_service import BenefitArchiveService
+from app.services.benefit_service import BenefitService
+from app.utils.timezone_utils import utc_now
+
+
+def test_archive_moves_only_rows_past_retention_and_keeps_them_readable():
+    db = SessionLocal()
+    try:
+        repo = BenefitRepository(db)
+        benefit_id = repo.create("Coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE).id
+        user_id = UserRepository(db).create(email="archive@example.com").id
+        now = utc_now()
+        old = [
+            repo.create_distribution(user_id, benefit_id, f"2023-{month:02d}", now - timedelta(days=400 - month)).id
+            for month in range(1, 6)
+        ]
+        recent = repo.create_distribution(user_id, benefit_id, "2024-12", now - timedelta(days=10)).id
+        current = repo.create_distribution(user_id, benefit_id, "2025-01", now + timedelta(days=10)).id
+        db.commit()
+
+        summary = BenefitArchiveService(db).archive_expired(retention_days=180, batch_size=2, max_rows_per_second=0)
+        assert (summary.batches, summary.archived) == (3, 5)
+
+        assert sorted(d.id for d in db.query(BenefitDistribution).all()) == [recent, current]
+
+        service = BenefitService(db)
+        rows, total = service.get_archived_user_benefits(user_id, limit=2)
+        assert total == 5
+        assert [(r.id, r.benefit_name) for r in rows] == [(old[4], "Coupon"), (old[3], "Coupon")]
+
+        assert BenefitArchiveService(db).archive_expired(retention_days=180, max_rows_per_second=0).archived == 0
+    finally:
+        db.close()
@@ -0,0 +1,90 @@
+from datetime import date, datetime, timezone
+
+import httpx
+import pytest
+
+from app.core.error_codes import BusinessException, ErrorCode
+from app.core.job_store import job_store
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.models.admin import AdminUser
+from app.models.benefit import BenefitDistribution, BenefitType
+from app.models.user import MemberLevel
+from app.repositories.user_repository import UserRepository
+from app.schemas.benefit import BenefitCampaignSegment
+from app.services.benefit_campaign_service import BenefitCampaignService, JOB_KIND, run_campaign_job
+from app.services.benefit_service import BenefitService
+
+
+def _recipients(db, benefit_id):
+    return sorted(user_id for (user_id,) in db.query(BenefitDistribution.user_id).filter_by(benefit_id=benefit_id))
+
+
+def test_campaign_targets_segment_in_chunks_and_reports_progress(tmp_path):
+    db = SessionLocal()
+    try:
+        benefits = BenefitService(db)
+        coupon = benefits.create_benefit("Campaign coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE).id
+        limited = benefits.create_benefit("Gift", BenefitType.FREE_SHIPPING, MemberLevel.BRONZE, stock=1).id
+
+        repo = UserRepository(db)
+        users = [repo.create(email=f"campaign{i}@example.com") for i in range(8)]
+        for i, user in enumerate(users):
+            user.member_level = MemberLevel.GOLD if i % 2 else MemberLevel.SILVER
+            user.available_points = i * 100
+            # 2024-03-01 00:00 Beijing time is 2024-02-29 16:00 UTC.
+            user.created_at = datetime(2024, 2, 29, 15, 0, tzinfo=timezone.utc) if i < 4 else datetime(2024, 3, 5, tzinfo=timezone.utc)
+        db.commit()
+        ids = [u.id for u in users]
+
+        service = BenefitCampaignService(db)
+        with pytest.raises(BusinessException):
+            service.check_campaign(limited, BenefitCampaignSegment(member_level=MemberLevel.GOLD), has_user_ids=False)
+        with pytest.raises(BusinessException):
+            service.check_campaign(coupon, BenefitCampaignSegment(), has_user_ids=False)
+
+        segment = BenefitCampaignSegment(member_level=MemberLevel.GOLD, signup_from=date(2024, 3, 1), min_points=200)
+        report = service.run(coupon, "2024-03", segment, chunk_size=3, pause_seconds=0)
+        assert (report.chunks, report.distributed) == (3, 2)
+        assert _recipients(db, coupon) == [ids[5], ids[7]]
+
+        # Reruns skip users who already have the benefit for the period.
+        assert service.run(coupon, "2024-03", segment, chunk_size=3, pause_seconds=0).distributed == 0
+
+        id_file = tmp_path / "ids.txt"
+        id_file.write_text(f"# targeted\n{ids[0]}\n{ids[1]}\n{ids[3]}\nnot-an-id\n999999\n")
+        job = job_store.create(JOB_KIND, created_by=1, permission="benefits.distribute")
+        run_campaign_job(job["id"], coupon, "2024-03", BenefitCampaignSegment(max_points=300), str(id_file), admin_user_id=1)
+
+        done = job_store.get(job["id"])
+        assert done["status"] == "completed"
+        assert done["progress"]["ids_received"] == 4
+        assert done["progress"]["invalid_ids"] == 1
+        assert done["progress"]["distributed"] == 3
+        assert "rows_per_second" in done["progress"]
+        assert _recipients(db, coupon) == sorted([ids[0], ids[1], ids[3], ids[5], ids[7]])
+        assert not id_file.exists()
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_campaign_rejects_invalid_month(app):
+    db = SessionLocal()
+    try:
+        admin = AdminUser(username="campaigner", email="campaigner@example.com", password_hash="x")
+        db.add(admin)
+        db.commit()
+        token, _ = create_access_token(subject_id=admin.id, role="admin")
+    finally:
+        db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Authorization": f"Bearer {token}"}
+        resp = await client.post("/api/v1/admin/benefits/campaigns", data={"benefit_id": 1, "period": "2024-13"}, headers=headers)
+        assert resp.status_code == 400
+        assert resp.json()["code"] == ErrorCode.INVALID_INPUT[0]
+        # A valid month gets past validation to the permission check.
+        resp = await client.post("/api/v1/admin/benefits/campaigns", data={"benefit_id": 1, "period": "2024-12"}, headers=headers)
+        assert resp.json()["code"] == ErrorCode.PERMISSION_DENIED[0]
@@ -0,0 +1,132 @@
+from app.config import settings
+from app.db.query_stats import assert_max_queries
+from app.db.session import SessionLocal
+from app.models.benefit import BenefitDistribution, BenefitType
+from app.models.user import MemberLevel
+from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.user_repository import UserRepository
+from app.services.benefit_catalog import CATALOG_VERSION_KEY
+from app.services.benefit_distribution_service import BenefitDistributionService
+from app.services.benefit_service import BenefitService
+from app.utils.redis_client import redis_client
+
+
+def test_distribute_period_is_set_based_resumable_and_idempotent():
+    db = SessionLocal()
+    try:
+        benefits = BenefitRepository(db)
+        bronze = benefits.create("Coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE).id
+        gold = benefits.create("Shipping", BenefitType.FREE_SHIPPING, MemberLevel.GOLD).id
+        retired = benefits.create("Old", BenefitType.POINTS_REWARD, MemberLevel.BRONZE)
+        retired.is_active = False
+
+        users = UserRepository(db)
+        user_ids = [users.create(email=f"dist{i}@example.com").id for i in range(5)]
+        users.get_by_id(user_ids[4]).member_level = MemberLevel.GOLD
+        db.commit()
+
+        # Already distributed by the per-request path.
+        BenefitService(db).distribute_monthly_benefits(user_ids[0], "2024-03")
+
+        service = BenefitDistributionService(db)
+        summary = service.distribute_period("2024-03", chunk_size=2, pause_seconds=0)
+        assert (summary.chunks, summary.distributed) == (3, 4)
+        assert service.get_checkpoint("2024-03") == user_ids[-1] + 1
+
+        rows = db.query(BenefitDistribution).filter(BenefitDistribution.period == "2024-03").all()
+        assert sorted((r.user_id, r.benefit_id) for r in rows) == sorted(
+            [(uid, bronze) for uid in user_ids[:4]] + [(user_ids[4], gold)]
+        )
+        assert all(not r.is_used and r.expires_at is not None for r in rows)
+
+        assert service.distribute_period("2024-03", chunk_size=2, pause_seconds=0).chunks == 0
+        service.clear_checkpoint("2024-03")
+        assert service.distribute_period("2024-03", chunk_size=2, pause_seconds=0).distributed == 0
+    finally:
+        db.close()
+
+
+def test_distribute_period_marks_users_whose_level_has_no_limited_stock(monkeypatch):
+    db = SessionLocal()
+    try:
+        service = BenefitService(db)
+        service.create_benefit("Coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE)
+        service.create_benefit("Shipping", BenefitType.FREE_SHIPPING, MemberLevel.GOLD)
+        service.create_benefit("Lounge", BenefitType.EXCLUSIVE_ACCESS, MemberLevel.GOLD, stock=5)
+
+        users = UserRepository(db)
+        user_ids = [users.create(email=f"mark{i}@example.com").id for i in range(5)]
+        users.get_by_id(user_ids[4]).member_level = MemberLevel.GOLD
+        db.commit()
+
+        batches = []
+        setbits = redis_client.setbits
+        monkeypatch.setattr(redis_client, "setbits", lambda bits, ex=None: batches.append(bits) or setbits(bits, ex))
+        BenefitDistributionService(db).distribute_period("2024-03", chunk_size=2, pause_seconds=0)
+
+        # One pipelined batch per chunk that has bronze users; the gold user still needs a stock claim.
+        assert len(batches) == 2
+        assert all(service.is_distributed(uid, "2024-03", MemberLevel.BRONZE) for uid in user_ids[:4])
+        assert not service.is_distributed(user_ids[4], "2024-03", MemberLevel.GOLD)
+
+        with assert_max_queries(0):
+            assert service.distribute_monthly_benefits(user_ids[0], "2024-03", MemberLevel.BRONZE) == []
+        assert len(service.distribute_monthly_benefits(user_ids[4], "2024-03", MemberLevel.GOLD)) == 1
+    finally:
+        db.close()
+
+
+def test_distributed_marker_short_circuits_until_level_or_catalog_changes(monkeypatch):
+    db = SessionLocal()
+    try:
+        service = BenefitService(db)
+        service.create_benefit("Coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE)
+        user_id = UserRepository(db).create(email="marker@example.com").id
+        db.commit()
+
+        assert len(service.distribute_monthly_benefits(user_id, "2024-03", MemberLevel.BRONZE)) == 1
+        assert service.is_distributed(user_id, "2024-03", MemberLevel.BRONZE)
+
+        def no_db(*args, **kwargs):
+            raise AssertionError("marker should skip the database")
+
+        monkeypatch.setattr(service.user_repo, "get_by_id", no_db)
+        assert service.distribute_monthly_benefits(user_id, "2024-03", MemberLevel.BRONZE) == []
+        monkeypatch.undo()
+
+        # A new benefit moves the catalog version and reaches the user.
+        service.create_benefit("Shipping", BenefitType.FREE_SHIPPING, MemberLevel.BRONZE)
+        assert not service.is_distributed(user_id, "2024-03", MemberLevel.BRONZE)
+        assert len(service.distribute_monthly_benefits(user_id, "2024-03", MemberLevel.BRONZE)) == 1
+
+        # So does a level change.
+        service.create_benefit("Lounge", BenefitType.EXCLUSIVE_ACCESS, MemberLevel.GOLD)
+        UserRepository(db).get_by_id(user_id).member_level = MemberLevel.GOLD
+        db.commit()
+        assert len(service.distribute_monthly_benefits(user_id, "2024-03", MemberLevel.GOLD)) == 1
+        assert service.distribute_monthly_benefits(user_id, "2024-03", MemberLevel.GOLD) == []
+    finally:
+        db.close()
+
+
+def test_catalog_snapshot_serves_reads_and_reloads_when_version_moves(monkeypatch):
+    db = SessionLocal()
+    try:
+        service = BenefitService(db)
+        coupon = service.create_benefit("Coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE).id
+        assert [b.id for b in service.get_benefits_by_level(MemberLevel.BRONZE)] == [coupon]
+
+        with assert_max_queries(0):
+            assert [b.id for b in service.get_benefits_by_level(MemberLevel.BRONZE)] == [coupon]
+            assert [b.name for b in service.get_benefits_by_ids([coupon, 999])] == ["Coupon"]
+
+        # Another worker adds a benefit: seen once the version is re-read.
+        other = BenefitRepository(db).create("Shipping", BenefitType.FREE_SHIPPING, MemberLevel.BRONZE).id
+        db.commit()
+        monkeypatch.setattr(settings, "BENEFIT_CATALOG_RECHECK_SECONDS", 60)
+        redis_client.incr(CATALOG_VERSION_KEY)
+        assert len(service.get_benefits_by_level(MemberLevel.BRONZE)) == 1
+        monkeypatch.setattr(settings, "BENEFIT_CATALOG_RECHECK_SECONDS", 0)
+        assert [b.id for b in service.get_benefits_by_level(MemberLevel.BRONZE)] == [coupon, other]
+    finally:
+        db.close()
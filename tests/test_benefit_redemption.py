@@ -0,0 +1,110 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+
+from app.core.error_codes import BusinessException, ErrorCode
+from app.db.query_stats import assert_max_queries
+from app.db.session import SessionLocal
+from app.models.benefit import BenefitDistribution, BenefitType
+from app.models.user import MemberLevel
+from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.user_repository import UserRepository
+from app.services.benefit_service import BenefitService
+from app.utils.timezone_utils import utc_now
+
+
+def _setup(expires_in: timedelta = timedelta(days=1)) -> tuple[int, int]:
+    db = SessionLocal()
+    try:
+        repo = BenefitRepository(db)
+        benefit_id = repo.create("Coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.BRONZE).id
+        user_id = UserRepository(db).create(email="redeem-benefit@example.com").id
+        distribution_id = repo.create_distribution(user_id, benefit_id, "2024-03", utc_now() + expires_in).id
+        db.commit()
+        return user_id, distribution_id
+    finally:
+        db.close()
+
+
+def _redeem(user_id: int, distribution_id: int, key: str):
+    db = SessionLocal()
+    try:
+        distribution, benefit = BenefitService(db).redeem_benefit(user_id, distribution_id, key)
+        return key, distribution.is_used, benefit.name
+    except BusinessException as e:
+        return key, e.code, None
+    finally:
+        db.close()
+
+
+def test_concurrent_redemptions_use_a_distribution_once():
+    user_id, distribution_id = _setup()
+    counter = itertools.count()
+
+    # Each key is submitted twice: the winning key's retry replays the redemption.
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = [f.result() for f in [
+            pool.submit(lambda: _redeem(user_id, distribution_id, f"k{next(counter) // 2}")) for _ in range(40)
+        ]]
+
+    winners = {key for key, outcome, _ in results if outcome is True}
+    assert len(winners) == 1
+    assert all(
+        outcome is True if key in winners else outcome == ErrorCode.BENEFIT_ALREADY_USED[0]
+        for key, outcome, _ in results
+    )
+
+    db = SessionLocal()
+    try:
+        row = db.get(BenefitDistribution, distribution_id)
+        assert row.is_used and row.used_at is not None and row.used_request_key in winners
+    finally:
+        db.close()
+
+
+def test_redeem_rejects_expired_and_foreign_distributions():
+    user_id, distribution_id = _setup(expires_in=timedelta(days=-1))
+    db = SessionLocal()
+    try:
+        service = BenefitService(db)
+        with pytest.raises(BusinessException) as exc:
+            service.redeem_benefit(user_id, distribution_id, "k")
+        assert exc.value.code == ErrorCode.BENEFIT_EXPIRED[0]
+
+        with pytest.raises(BusinessException) as exc:
+            service.redeem_benefit(user_id + 1, distribution_id, "k")
+        assert exc.value.code == ErrorCode.BENEFIT_NOT_FOUND[0]
+    finally:
+        db.close()
+
+
+def test_user_benefits_are_joined_and_filtered_in_one_query():
+    user_id, expired_id = _setup(expires_in=timedelta(days=-1))
+    db = SessionLocal()
+    try:
+        repo = BenefitRepository(db)
+        shipping = repo.create("Shipping", BenefitType.FREE_SHIPPING, MemberLevel.BRONZE).id
+        active_id = repo.create_distribution(user_id, shipping, "2024-04", utc_now() + timedelta(days=1)).id
+        used_id = repo.create_distribution(user_id, shipping, "2024-05", utc_now() + timedelta(days=1)).id
+        db.commit()
+
+        service = BenefitService(db)
+        service.redeem_benefit(user_id, used_id, "k")
+
+        with assert_max_queries(2):
+            rows, total = service.get_user_benefits(user_id)
+        assert total == 3
+        assert [(r.id, r.benefit_name, r.benefit_type) for r in rows] == [
+            (used_id, "Shipping", BenefitType.FREE_SHIPPING),
+            (active_id, "Shipping", BenefitType.FREE_SHIPPING),
+            (expired_id, "Coupon", BenefitType.DISCOUNT_COUPON),
+        ]
+
+        assert [r.id for r in service.get_user_benefits(user_id, active_only=True)[0]] == [used_id, active_id]
+        assert [r.id for r in service.get_user_benefits(user_id, unused_only=True)[0]] == [active_id, expired_id]
+        rows, total = service.get_user_benefits(user_id, limit=1, active_only=True, unused_only=True)
+        assert ([r.id for r in rows], total) == ([active_id], 1)
+    finally:
+        db.close()
@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.error_codes import BusinessException, ErrorCode
+from app.db.session import SessionLocal
+from app.models.benefit import Benefit, BenefitDistribution, BenefitType
+from app.models.user import MemberLevel
+from app.repositories.benefit_repository import BenefitRepository
+from app.repositories.user_repository import UserRepository
+from app.services.benefit_distribution_service import BenefitDistributionService
+from app.services.benefit_inventory import benefit_inventory
+from app.services.benefit_service import BenefitService
+from app.utils.redis_client import redis_client
+
+STOCK = 25
+CLAIMANTS = 120
+
+
+def _counter_key(benefit_id: int) -> str:
+    return f"benefits:stock:{benefit_id}:{redis_client.get(f'benefits:stock:{benefit_id}')}"
+
+
+def _claim(user_id: int, benefit_id: int) -> str:
+    db = SessionLocal()
+    try:
+        BenefitService(db).distribute_single_benefit(user_id, benefit_id, "2024-03")
+        return "ok"
+    except BusinessException as e:
+        if e.code == ErrorCode.REQUEST_IN_PROGRESS[0]:
+            # The counter was rebuilt under every attempt of this claim.
+            return "busy"
+        assert e.code == ErrorCode.BENEFIT_OUT_OF_STOCK[0]
+        return "out_of_stock"
+    finally:
+        db.close()
+
+
+def test_concurrent_claims_never_oversell_and_counter_rebuilds_from_db():
+    db = SessionLocal()
+    try:
+        benefit_id = BenefitService(db).create_benefit(
+            "Flash coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.GOLD, stock=STOCK
+        ).id
+        users = UserRepository(db)
+        user_ids = [users.create(email=f"flash{i}@example.com").id for i in range(CLAIMANTS)]
+        db.commit()
+    finally:
+        db.close()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda uid: _claim(uid, benefit_id), user_ids))
+
+    db = SessionLocal()
+    try:
+        assert results.count("ok") == STOCK
+        assert db.query(BenefitDistribution).filter(BenefitDistribution.benefit_id == benefit_id).count() == STOCK
+        assert benefit_inventory.remaining(benefit_id) == 0
+
+        # The set-based monthly job leaves limited benefits to the claim path.
+        assert BenefitDistributionService(db).distribute_period("2024-04", pause_seconds=0).distributed == 0
+
+        # Losing Redis: the counter is rebuilt from the distributions recorded.
+        redis_client.delete(f"benefits:stock:{benefit_id}")
+        latecomer = user_ids[results.index("out_of_stock")]
+        assert _claim(latecomer, benefit_id) == "out_of_stock"
+        assert benefit_inventory.remaining(benefit_id) == 0
+
+        # Counters above or below the database value are reported and rebuilt.
+        for drift in (3, -2):
+            redis_client.incrby(_counter_key(benefit_id), drift)
+            assert [(r["benefit_id"], r["drift"]) for r in benefit_inventory.reconcile(db, repair=True)] == [(benefit_id, drift)]
+            assert benefit_inventory.remaining(benefit_id) == 0
+        assert db.get(Benefit, benefit_id).stock_remaining == 0
+    finally:
+        db.close()
+
+
+def test_counter_lost_while_claims_are_in_flight_never_oversells(monkeypatch):
+    db = SessionLocal()
+    try:
+        benefit_id = BenefitService(db).create_benefit(
+            "Lossy coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.GOLD, stock=STOCK
+        ).id
+        users = UserRepository(db)
+        user_ids = [users.create(email=f"lossy{i}@example.com").id for i in range(CLAIMANTS)]
+        db.commit()
+    finally:
+        db.close()
+
+    # Keep claims between their DECR and their commit long enough for the counter to vanish under them.
+    create_distribution = BenefitRepository.create_distribution
+
+    def slow_create_distribution(self, *args, **kwargs):
+        time.sleep(0.002)
+        return create_distribution(self, *args, **kwargs)
+
+    monkeypatch.setattr(BenefitRepository, "create_distribution", slow_create_distribution)
+
+    stop = threading.Event()
+
+    def lose_counter():
+        for _ in range(3):
+            if stop.wait(0.03):
+                return
+            redis_client.delete(f"benefits:stock:{benefit_id}")
+
+    loser = threading.Thread(target=lose_counter)
+    loser.start()
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda uid: _claim(uid, benefit_id), user_ids))
+    finally:
+        stop.set()
+        loser.join()
+
+    db = SessionLocal()
+    try:
+        distributed = db.query(BenefitDistribution).filter(BenefitDistribution.benefit_id == benefit_id).count()
+        assert distributed == results.count("ok") <= STOCK
+        assert benefit_inventory.reconcile(db) == []
+        assert benefit_inventory.remaining(benefit_id) == STOCK - distributed
+    finally:
+        db.close()
@@ -0,0 +1,214 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.models.admin import AdminUser, Permission, Role, admin_user_roles, role_permissions
+from app.models.order import Order, OrderStatus
+from app.models.point_transaction import PointTransaction, PointTransactionReason, PointTransactionType
+from app.repositories.user_repository import UserRepository
+
+
+def _token(subject_id: int, role: str) -> dict:
+    token, _ = create_access_token(subject_id=subject_id, role=role)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _admin(db, username: str, permissions: list) -> int:
+    admin = AdminUser(username=username, email=f"{username}@example.com", password_hash="x")
+    role = Role(name=f"{username}-role")
+    db.add_all([admin, role])
+    db.flush()
+    for name in permissions:
+        resource, action = name.split(".")
+        permission = Permission(resource=resource, action=action)
+        db.add(permission)
+        db.flush()
+        db.execute(role_permissions.insert().values(role_id=role.id, permission_id=permission.id))
+    db.execute(admin_user_roles.insert().values(admin_user_id=admin.id, role_id=role.id))
+    db.commit()
+    return admin.id
+
+
+def _seed_transactions(db, user_id: int, days: list) -> None:
+    db.add_all([
+        PointTransaction(
+            user_id=user_id,
+            transaction_type=PointTransactionType.ADJUST,
+            reason=PointTransactionReason.ADMIN_ADJUST,
+            points=10,
+            balance_after=10 * (i + 1),
+            description=f'goodwill, "batch {i}"\nsecond line',
+            created_at=datetime(2024, 3, day, tzinfo=timezone.utc),
+        )
+        for i, day in enumerate(days)
+    ])
+    db.commit()
+
+
+def _seed_orders(db, user_id: int, count: int) -> None:
+    db.add_all([
+        Order(
+            order_no=f"ORD{i:019d}",
+            user_id=user_id,
+            amount="19.90",
+            status=OrderStatus.COMPLETED if i % 2 else OrderStatus.PENDING,
+            product_name=f'Mug, "large" #{i}',
+            created_at=datetime(2024, 3, i + 1, tzinfo=timezone.utc),
+        )
+        for i in range(count)
+    ])
+    db.commit()
+
+
+@pytest.mark.asyncio
+async def test_point_transaction_export_csv_ndjson_and_date_filters(app):
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="exporter@example.com").id
+        other_id = UserRepository(db).create(email="other@example.com").id
+        db.commit()
+        _seed_transactions(db, user_id, [1, 10, 20])
+        _seed_transactions(db, other_id, [10])
+    finally:
+        db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/points/transactions/export")
+        assert resp.status_code == 401
+        resp = await client.get("/api/v1/points/transactions/export", headers=_token(user_id, "admin"))
+        assert resp.status_code == 401
+
+        headers = _token(user_id, "user")
+        resp = await client.get("/api/v1/points/transactions/export", headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert resp.headers["content-disposition"] == 'attachment; filename="point_transactions.csv"'
+        rows = list(csv.reader(io.StringIO(resp.text)))
+        assert rows[0] == ["id", "transaction_type", "reason", "points", "balance_after", "order_id", "description", "created_at"]
+        assert len(rows) == 4
+        # Commas, quotes and newlines survive a CSV round trip.
+        assert rows[1][6] == 'goodwill, "batch 0"\nsecond line'
+        assert rows[1][1:4] == ["adjust", "admin_adjust", "10"]
+
+        resp = await client.get(
+            "/api/v1/points/transactions/export",
+            params={"format": "ndjson", "start_date": "2024-03-05T00:00:00", "end_date": "2024-03-15T00:00:00"},
+            headers=headers,
+        )
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [line["balance_after"] for line in lines] == [20]
+        assert lines[0]["description"] == 'goodwill, "batch 1"\nsecond line'
+        assert lines[0]["created_at"].startswith("2024-03-10")
+
+        resp = await client.get(
+            "/api/v1/points/transactions/export", params={"start_date": "2025-01-01T00:00:00"}, headers=headers
+        )
+        assert resp.text.splitlines() == ["id,transaction_type,reason,points,balance_after,order_id,description,created_at"]
+        resp = await client.get(
+            "/api/v1/points/transactions/export", params={"format": "ndjson", "start_date": "2025-01-01T00:00:00"}, headers=headers
+        )
+        assert resp.status_code == 200 and resp.text == ""
+
+        resp = await client.get("/api/v1/points/transactions/export", params={"format": "xml"}, headers=headers)
+        assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_order_export_requires_permission_and_filters(app):
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="buyer@example.com").id
+        db.commit()
+        _seed_orders(db, user_id, 6)
+        viewer = _admin(db, "viewer", ["orders.view"])
+        outsider = _admin(db, "outsider", ["users.view"])
+    finally:
+        db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/api/v1/admin/orders/export", headers=_token(user_id, "user"))
+        assert resp.status_code == 401
+        resp = await client.get("/api/v1/admin/orders/export", headers=_token(outsider, "admin"))
+        assert resp.json()["code"] == "PERMISSION_DENIED"
+
+        headers = _token(viewer, "admin")
+        resp = await client.get("/api/v1/admin/orders/export", headers=headers)
+        assert resp.status_code == 200
+        rows = list(csv.reader(io.StringIO(resp.text)))
+        assert rows[0][:5] == ["id", "order_no", "user_id", "amount", "status"]
+        assert [row[5] for row in rows[1:]] == [f'Mug, "large" #{i}' for i in range(6)]
+        assert rows[1][3] == "19.90"
+
+        resp = await client.get(
+            "/api/v1/admin/orders/export",
+            params={"format": "ndjson", "status": "completed", "start_date": "2024-03-02T00:00:00", "end_date": "2024-03-04T00:00:00"},
+            headers=headers,
+        )
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [(line["order_no"], line["status"]) for line in lines] == [(f"ORD{1:019d}", "completed"), (f"ORD{3:019d}", "completed")]
+
+        resp = await client.get("/api/v1/admin/orders/export", params={"status": "refunded"}, headers=headers)
+        assert len(resp.text.splitlines()) == 1
+
+
+@pytest.mark.asyncio
+async def test_export_streams_more_rows_than_yield_per_in_chunks(app, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_YIELD_PER", 2)
+    monkeypatch.setattr("app.utils.export.EXPORT_CHUNK_ROWS", 3)
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="bulk@example.com").id
+        db.commit()
+        _seed_transactions(db, user_id, list(range(1, 11)))
+    finally:
+        db.close()
+
+    # Call the ASGI app directly: httpx's transport joins the body parts before returning them.
+    token = _token(user_id, "user")["Authorization"]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("test", 80),
+        "client": ("127.0.0.1", 1234),
+        "root_path": "",
+        "path": "/api/v1/points/transactions/export",
+        "raw_path": b"/api/v1/points/transactions/export",
+        "query_string": b"format=ndjson",
+        "headers": [(b"host", b"test"), (b"authorization", token.encode())],
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client stays connected until the body is complete.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    start = messages[0]
+    assert start["status"] == 200
+    assert b"content-length" not in dict(start["headers"])
+    chunks = [m["body"] for m in messages[1:] if m["body"]]
+    # 10 rows in chunks of 3 rows: the body is written piecewise, not rendered at once.
+    assert [chunk.count(b"\n") for chunk in chunks] == [3, 3, 3, 1]
+    balances = [json.loads(line)["balance_after"] for line in b"".join(chunks).decode().splitlines()]
+    assert balances == [10 * i for i in range(1, 11)]
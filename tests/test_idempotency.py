@@ -0,0 +1,128 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Response
+
+from app.config import settings
+from app.core.error_codes import BusinessException, ErrorCode
+from app.core.security import create_access_token
+from app.middleware.error_handler import error_handler_middleware
+from app.middleware.idempotency import idempotency_middleware, idempotent
+
+
+def _app(calls: list) -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(idempotency_middleware)
+    app.middleware("http")(error_handler_middleware)
+
+    @app.post("/charge", dependencies=[Depends(idempotent())])
+    async def charge(payload: dict):
+        calls.append(payload)
+        await asyncio.sleep(0.05)
+        return {"charge": len(calls)}
+
+    @app.post("/redeem", dependencies=[Depends(idempotent())])
+    async def redeem(response: Response):
+        calls.append("redeem")
+        response.set_cookie("a", "1")
+        response.set_cookie("b", "2")
+        if len(calls) == 1:
+            raise BusinessException(ErrorCode.INSUFFICIENT_POINTS)
+        return {"redeemed": True}
+
+    @app.post("/slow", dependencies=[Depends(idempotent())])
+    async def slow():
+        calls.append("slow")
+        await asyncio.sleep(0.5)
+        return {"calls": len(calls)}
+
+    @app.post("/plain")
+    async def plain():
+        calls.append(None)
+        return {"calls": len(calls)}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_duplicates_wait_for_and_replay_the_first_response():
+    calls = []
+    transport = httpx.ASGITransport(app=_app(calls))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Idempotency-Key": "abc", "Authorization": "Bearer t1"}
+        responses = await asyncio.gather(*[
+            client.post("/charge", json={"amount": 1}, headers=headers) for _ in range(5)
+        ])
+        assert [r.json() for r in responses] == [{"charge": 1}] * 5
+        assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 4
+
+        # Same key from another caller is independent; a different body is rejected.
+        other = await client.post("/charge", json={"amount": 1}, headers={**headers, "Authorization": "Bearer t2"})
+        assert other.json() == {"charge": 2}
+        reused = await client.post("/charge", json={"amount": 2}, headers=headers)
+        assert reused.json()["code"] == "IDEMPOTENCY_KEY_REUSED"
+
+        # Routes without the marker ignore the header.
+        await client.post("/plain", headers=headers)
+        await client.post("/plain", headers=headers)
+        assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_business_errors_are_stored_and_repeated_headers_kept():
+    calls = []
+    transport = httpx.ASGITransport(app=_app(calls))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Idempotency-Key": "r1", "Authorization": "Bearer t1"}
+        first = await client.post("/redeem", json={}, headers=headers)
+        assert first.status_code == 400
+        assert first.json()["code"] == ErrorCode.INSUFFICIENT_POINTS[0]
+
+        # The 400 is the stored answer: a retry replays it instead of running the route again.
+        retry = await client.post("/redeem", json={}, headers=headers)
+        assert (retry.status_code, retry.json()) == (400, first.json())
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert calls == ["redeem"]
+
+        fresh = await client.post("/redeem", json={}, headers={**headers, "Idempotency-Key": "r2"})
+        assert fresh.json() == {"redeemed": True}
+        assert fresh.headers.get_list("set-cookie") == ["a=1; Path=/; SameSite=lax", "b=2; Path=/; SameSite=lax"]
+
+
+@pytest.mark.asyncio
+async def test_keys_follow_the_token_subject_across_refreshes():
+    calls = []
+    transport = httpx.ASGITransport(app=_app(calls))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        before, _ = create_access_token(subject_id=7, role="user")
+        refreshed, _ = create_access_token(subject_id=7, role="user")
+        other, _ = create_access_token(subject_id=8, role="user")
+        assert before != refreshed
+
+        first = await client.post("/charge", json={"amount": 1}, headers={"Idempotency-Key": "k", "Authorization": f"Bearer {before}"})
+        retry = await client.post("/charge", json={"amount": 1}, headers={"Idempotency-Key": "k", "Authorization": f"Bearer {refreshed}"})
+        assert retry.json() == first.json() == {"charge": 1}
+        assert retry.headers["Idempotent-Replayed"] == "true"
+
+        elsewhere = await client.post("/charge", json={"amount": 1}, headers={"Idempotency-Key": "k", "Authorization": f"Bearer {other}"})
+        assert elsewhere.json() == {"charge": 2}
+
+
+@pytest.mark.asyncio
+async def test_pending_claim_is_refreshed_while_the_route_runs(monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LOCK_SECONDS", 0.15)
+    calls = []
+    transport = httpx.ASGITransport(app=_app(calls))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Idempotency-Key": "slow", "Authorization": "Bearer t1"}
+
+        async def late_duplicate():
+            # Sent well after the claim's original expiry.
+            await asyncio.sleep(0.3)
+            return await client.post("/slow", headers=headers)
+
+        first, duplicate = await asyncio.gather(client.post("/slow", headers=headers), late_duplicate())
+        assert calls == ["slow"]
+        assert duplicate.json() == first.json()
+        assert duplicate.headers["Idempotent-Replayed"] == "true"
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from app.db.session import SessionLocal
+from app.models.benefit import BenefitDistribution, BenefitType
+from app.models.user import MemberLevel, User
+from app.repositories.user_repository import UserRepository
+from app.services.admin_service import AdminService
+from app.services.benefit_service import BenefitService
+from app.services.level_entitlement_service import (
+    LevelEntitlementService, register_level_change_handlers,
+)
+from app.services.member_level_service import MemberLevelService, parse_thresholds
+from app.utils.timezone_utils import current_beijing_period
+
+
+def _admin_update(level):
+    return SimpleNamespace(nickname=None, member_level=level, is_locked=None, locked_reason=None)
+
+
+def test_level_changes_distribute_new_level_benefits_in_batches():
+    register_level_change_handlers()
+    db = SessionLocal()
+    try:
+        benefits = BenefitService(db)
+        silver = benefits.create_benefit("Silver coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.SILVER).id
+        gold = benefits.create_benefit("Gold coupon", BenefitType.DISCOUNT_COUPON, MemberLevel.GOLD).id
+        gold_limited = benefits.create_benefit("Gold gift", BenefitType.FREE_SHIPPING, MemberLevel.GOLD, stock=5).id
+
+        repo = UserRepository(db)
+        promoted = repo.create(email="promoted@example.com").id
+        bounced = repo.create(email="bounced@example.com").id
+        backfilled = repo.create(email="backfill@example.com").id
+        db.commit()
+
+        admin = AdminService(db)
+        admin.update_user(promoted, _admin_update("silver"))
+        admin.update_user(promoted, _admin_update("gold"))
+        # Up and back down again before the drain: nothing to distribute.
+        admin.update_user(bounced, _admin_update("gold"))
+        admin.update_user(bounced, _admin_update("bronze"))
+
+        service = LevelEntitlementService(db)
+        summary = service.drain(batch_size=3)
+        assert (summary.batches, summary.events, summary.distributed) == (2, 4, 1)
+
+        period = current_beijing_period()
+        rows = db.query(BenefitDistribution.user_id, BenefitDistribution.benefit_id).all()
+        # Collapsed to bronze -> gold; limited stock is left to the per-request path.
+        assert rows == [(promoted, gold)]
+        assert not benefits.is_distributed(promoted, period, MemberLevel.GOLD)
+        assert benefits.distribute_monthly_benefits(promoted, period)[0].benefit_id == gold_limited
+        assert service.drain().events == 0
+
+        db.get(User, backfilled).total_earned_points = 1500
+        db.commit()
+        levels = MemberLevelService(db, parse_thresholds("silver:1000,gold:5000,platinum:20000"))
+        assert levels.recalculate_all(chunk_size=2) == 1
+        assert service.drain().distributed == 1
+        assert benefits.is_distributed(backfilled, period, MemberLevel.SILVER)
+        assert db.query(BenefitDistribution).filter_by(user_id=backfilled).one().benefit_id == silver
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+import io
+
+from app.core.job_store import job_store
+from app.db.session import SessionLocal
+from app.models.admin import AuditLog
+from app.models.user import User, MemberLevel
+from app.repositories.user_repository import UserRepository
+from app.services.member_import_service import MemberImportService, JOB_KIND, run_import_job
+
+
+def test_import_csv_dedupes_and_reports_row_errors():
+    db = SessionLocal()
+    try:
+        UserRepository(db).create(email="existing@example.com")
+
+        csv_data = (
+            "email,nickname,member_level\n"
+            "a@example.com,A,gold\n"
+            "not-an-email,B,\n"
+            "b@example.com,,\n"
+            "a@example.com,A again,\n"
+            "existing@example.com,E,\n"
+            "c@example.com,C,diamond\n"
+        )
+        progress = []
+        report = MemberImportService(db).import_stream(
+            io.StringIO(csv_data), "csv", chunk_size=2, on_progress=lambda r: progress.append(r.total_rows)
+        )
+
+        assert report.total_rows == 6
+        assert report.imported == 2
+        assert report.duplicates == 2
+        assert report.failed == 2
+        assert [e.line for e in report.errors] == [3, 7]
+        assert progress[-1] == 6
+
+        gold = db.query(User).filter(User.email == "a@example.com").one()
+        assert gold.member_level == MemberLevel.GOLD
+        assert db.query(User).count() == 3
+    finally:
+        db.close()
+
+
+def test_import_ndjson_skips_malformed_lines():
+    db = SessionLocal()
+    try:
+        ndjson = '{"email": "x@example.com"}\n{broken\n\n{"email": "y@example.com", "nickname": "Y"}\n'
+        report = MemberImportService(db).import_stream(io.StringIO(ndjson), "ndjson")
+
+        assert report.imported == 2
+        assert report.failed == 1
+        assert report.errors[0].line == 2
+    finally:
+        db.close()
+
+
+def test_import_job_reports_progress_and_row_errors(tmp_path):
+    upload = tmp_path / "members.ndjson"
+    upload.write_text(
+        '{"email": "job1@example.com", "nickname": "J1"}\n'
+        '{"email": "broken"}\n'
+        '{"email": "job2@example.com", "member_level": "silver"}\n'
+    )
+    job = job_store.create(JOB_KIND, created_by=1, permission="users.import")
+    run_import_job(job["id"], str(upload), "ndjson", "members.ndjson", admin_user_id=1)
+
+    done = job_store.get(job["id"])
+    assert done["status"] == "completed"
+    assert done["progress"] == {"total_rows": 3, "imported": 2, "duplicates": 0, "failed": 1}
+    assert [e["line"] for e in done["errors"]] == [2]
+    assert not upload.exists()
+
+    db = SessionLocal()
+    try:
+        audit = db.query(AuditLog).filter_by(action="import", resource="users").one()
+        assert audit.resource_id == job["id"]
+    finally:
+        db.close()
+
+
+def test_import_job_failure_is_audited_when_the_job_record_is_gone(tmp_path, monkeypatch):
+    def broken(self, *args, **kwargs):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(MemberImportService, "import_stream", broken)
+    upload = tmp_path / "members.csv"
+    upload.write_text("email\n")
+
+    # No job record: it expired or was never stored.
+    run_import_job("missing-job", str(upload), "csv", "members.csv", admin_user_id=1)
+
+    db = SessionLocal()
+    try:
+        audit = db.query(AuditLog).filter_by(action="import", resource="users").one()
+        assert audit.resource_id == "missing-job"
+    finally:
+        db.close()
+    assert not upload.exists()
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from app.core.events import MemberLevelChanged, event_bus, publish_after_commit
+from app.db.session import SessionLocal
+from app.models.user import MemberLevel, User
+from app.repositories.user_repository import UserRepository
+from app.services.member_level_service import MemberLevelService, parse_thresholds
+from app.services.point_service import PointService
+
+
+def test_earn_path_promotes_and_batch_recalculates():
+    received = []
+    event_bus.subscribe(MemberLevelChanged, received.append)
+    db = SessionLocal()
+    try:
+        repo = UserRepository(db)
+        earner = repo.create(email="earner@example.com").id
+        admin_upgraded = repo.create(email="vip@example.com").id
+        backfilled = repo.create(email="backfill@example.com").id
+        db.commit()
+
+        service = PointService(db)
+        service.earn_points_from_order(earner, order_id=1, amount=Decimal("999"))
+        assert db.get(User, earner).member_level == MemberLevel.BRONZE
+        service.earn_points_from_order(earner, order_id=2, amount=Decimal("1"))
+        db.expire_all()
+        assert db.get(User, earner).member_level == MemberLevel.SILVER
+        assert received == [MemberLevelChanged(earner, "bronze", "silver", "points")]
+
+        # Events queued in a transaction that rolls back are never published.
+        publish_after_commit(db, MemberLevelChanged(backfilled, "bronze", "gold", "points"))
+        db.rollback()
+        db.commit()
+        assert len(received) == 1
+
+        db.get(User, admin_upgraded).member_level = MemberLevel.PLATINUM
+        db.get(User, backfilled).total_earned_points = 6000
+        db.commit()
+
+        levels = MemberLevelService(db, parse_thresholds("silver:1000,gold:5000,platinum:20000"))
+        assert levels.recalculate_all(chunk_size=1) == 1
+        db.expire_all()
+        assert db.get(User, backfilled).member_level == MemberLevel.GOLD
+        assert db.get(User, admin_upgraded).member_level == MemberLevel.PLATINUM
+
+        assert levels.recalculate_all(chunk_size=2, allow_demotion=True) == 1
+        db.expire_all()
+        assert db.get(User, admin_upgraded).member_level == MemberLevel.BRONZE
+        assert received[-1] == MemberLevelChanged(admin_upgraded, "platinum", "bronze", "recalculation")
+    finally:
+        event_bus.unsubscribe(MemberLevelChanged, received.append)
+        db.close()
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from app.core.order_numbers import OrderNumberGenerator
+from app.db.query_stats import assert_max_queries
+from app.db.session import SessionLocal
+from app.repositories.user_repository import UserRepository
+from app.services.order_service import OrderService
+from app.utils.redis_client import redis_client
+
+
+def test_order_numbers_are_unique_monotonic_and_survive_clock_steps_and_lease_loss():
+    now = [1_750_000_000.0]
+    first = OrderNumberGenerator(lease_seconds=60, clock=lambda: now[0])
+    second = OrderNumberGenerator(lease_seconds=60, clock=lambda: now[0])
+
+    # 5000 ids within one millisecond overflow the 12-bit sequence.
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lambda _: first.next_id(), range(5000)))
+    assert len(set(ids)) == 5000
+    following = [first.next_id() for _ in range(100)]
+    assert all(a < b for a, b in zip([max(ids)] + following, following))
+
+    assert second.next_id() not in ids
+    assert first.node_id != second.node_id
+
+    last = following[-1]
+    now[0] -= 5
+    assert first.next_id() > last
+
+    redis_client.delete(f"order_no:node:{first.node_id}")
+    first._renew_at = 0
+    before = first.next_id()
+    assert redis_client.exists(f"order_no:node:{first.node_id}")
+    assert first.next_id() > before
+
+    first.release()
+    second.release()
+    assert first.next_order_no().startswith("ORD")
+
+
+def test_create_order_does_not_look_up_order_numbers():
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="orders@example.com").id
+        db.commit()
+        service = OrderService(db)
+
+        with assert_max_queries(2) as stats:
+            order = service.create_order(user_id, Decimal("10.00"))
+        assert not any("order_no =" in sql for sql in stats.statements)
+        assert service.create_order(user_id, Decimal("5.00")).order_no > order.order_no
+    finally:
+        db.close()
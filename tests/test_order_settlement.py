@@ -0,0 +1,98 @@
+import tempfile
+from decimal import Decimal
+
+from app.core.job_store import job_store, JobStatus
+
+from app.db.session import SessionLocal
+from app.models.order import Order, OrderStatus
+from app.models.point_transaction import PointTransaction
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.models.admin import AuditLog
+from app.services.order_settlement_service import (
+    JOB_KIND, OrderSettlementService, SettlementReport, parse_order_ids, run_settlement_job,
+)
+from app.services.point_service import PointService
+
+
+def _seed():
+    db = SessionLocal()
+    try:
+        users = [UserRepository(db).create(email=f"settle{i}@example.com") for i in range(2)]
+        orders = [
+            Order(user_id=users[0].id, order_no="S-1", amount=Decimal("10.50")),
+            Order(user_id=users[0].id, order_no="S-2", amount=Decimal("20.00")),
+            Order(user_id=users[1].id, order_no="S-3", amount=Decimal("7.99")),
+            Order(user_id=users[1].id, order_no="S-4", amount=Decimal("5.00")),
+        ]
+        db.add_all(orders)
+        orders[3].status = OrderStatus.CANCELLED
+        db.commit()
+        return [u.id for u in users], [o.id for o in orders]
+    finally:
+        db.close()
+
+
+def test_settle_stream_accrues_points_once_per_order():
+    user_ids, order_ids = _seed()
+
+    # One order already went through the single-order path.
+    db = SessionLocal()
+    try:
+        PointService(db).earn_points_from_order(user_ids[0], order_ids[0], Decimal("10.50"))
+        db.commit()
+    finally:
+        db.close()
+
+    lines = [f"{order_id}\n" for order_id in order_ids] + ["oops\n", "\n", f"{order_ids[1]}\n"]
+    db = SessionLocal()
+    try:
+        report = SettlementReport()
+        OrderSettlementService(db).settle_stream(parse_order_ids(lines, report), chunk_size=2, report=report)
+        # Replaying the same input is a no-op.
+        replay = SettlementReport()
+        OrderSettlementService(db).settle_stream(parse_order_ids(lines, replay), chunk_size=2, report=replay)
+    finally:
+        db.close()
+
+    assert report.invalid == 1
+    assert report.settled == 3
+    assert report.points_awarded == 20 + 7
+    assert replay.settled == 0 and replay.points_awarded == 0
+
+    db = SessionLocal()
+    try:
+        first, second = db.get(User, user_ids[0]), db.get(User, user_ids[1])
+        assert (first.available_points, first.total_earned_points) == (30, 30)
+        assert (second.available_points, second.total_earned_points) == (7, 7)
+
+        ledger = db.query(PointTransaction).order_by(PointTransaction.id).all()
+        assert sorted(t.order_id for t in ledger) == sorted(order_ids[:3])
+        assert [t.balance_after for t in ledger if t.user_id == user_ids[0]] == [10, 30]
+
+        statuses = {o.id: o.status for o in db.query(Order).all()}
+        assert statuses[order_ids[3]] == OrderStatus.CANCELLED
+        assert all(statuses[i] == OrderStatus.COMPLETED for i in order_ids[:3])
+    finally:
+        db.close()
+
+
+def test_settlement_job_reports_progress_through_job_store():
+    user_ids, order_ids = _seed()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+        f.write("".join(f"{order_id}\n" for order_id in order_ids) + "bad\n")
+
+    job = job_store.create(JOB_KIND, created_by=1, permission="orders.settle")
+    run_settlement_job(job["id"], f.name, "eod.txt", admin_user_id=1)
+
+    job = job_store.get(job["id"])
+    assert job["status"] == JobStatus.COMPLETED
+    assert job["progress"] == {
+        "received": 4, "settled": 3, "skipped": 1, "invalid": 1, "points_awarded": 10 + 20 + 7, "users_credited": 2,
+    }
+
+    db = SessionLocal()
+    try:
+        assert db.query(AuditLog).filter(AuditLog.action == "settle", AuditLog.resource_id == job["id"]).count() == 1
+    finally:
+        db.close()
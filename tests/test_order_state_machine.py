@@ -0,0 +1,107 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+from app.core.error_codes import BusinessException, ErrorCode
+from app.db.session import SessionLocal
+from app.models.order import Order, OrderStatus, can_transition
+from app.models.point_transaction import PointTransaction, PointTransactionReason
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.services.order_service import OrderService
+
+ORDERS = 15
+REQUESTS_PER_ORDER = 4
+
+
+def _call(action: str, order_id: int, user_id: int):
+    db = SessionLocal()
+    try:
+        service = OrderService(db)
+        getattr(service, f"{action}_order")(order_id, user_id)
+        return action
+    except BusinessException as e:
+        assert e.code in (ErrorCode.INVALID_INPUT[0], ErrorCode.ORDER_STATUS_CONFLICT[0])
+        return None
+    finally:
+        db.close()
+
+
+def test_transition_table():
+    assert can_transition(OrderStatus.PENDING, OrderStatus.COMPLETED)
+    assert can_transition(OrderStatus.COMPLETED, OrderStatus.REFUNDED)
+    assert not can_transition(OrderStatus.REFUNDED, OrderStatus.COMPLETED)
+    assert not can_transition(OrderStatus.CANCELLED, OrderStatus.REFUNDED)
+
+
+def test_racing_complete_and_refund_never_double_count_points():
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="racer@example.com").id
+        db.commit()
+        service = OrderService(db)
+        order_ids = [service.create_order(user_id, Decimal("100.00")).id for _ in range(ORDERS)]
+
+        cancelled = db.get(Order, order_ids[0])
+        cancelled.status = OrderStatus.CANCELLED
+        db.commit()
+        with pytest.raises(BusinessException):
+            service.complete_order(cancelled.id, user_id)
+    finally:
+        db.close()
+
+    calls = [
+        (action, order_id)
+        for order_id in order_ids[1:]
+        for action in ["complete", "refund"] * (REQUESTS_PER_ORDER // 2)
+    ]
+    random.Random(7).shuffle(calls)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda c: _call(c[0], c[1], user_id), calls))
+
+    db = SessionLocal()
+    try:
+        earned = 0
+        for order in db.query(Order).filter(Order.id.in_(order_ids[1:])):
+            ledger = {
+                t.reason: t.points
+                for t in db.query(PointTransaction).filter(PointTransaction.order_id == order.id)
+            }
+            assert len(ledger) == db.query(PointTransaction).filter(PointTransaction.order_id == order.id).count()
+            if order.status == OrderStatus.COMPLETED:
+                assert ledger == {PointTransactionReason.ORDER_COMPLETE: 100}
+                assert order.version == 2
+                earned += 100
+            else:
+                assert order.status == OrderStatus.REFUNDED
+                # Refunded before completion (no points at all) or after it (earned, then deducted once).
+                assert ledger in ({}, {PointTransactionReason.ORDER_COMPLETE: 100, PointTransactionReason.ORDER_REFUND: -100})
+                assert order.version == (3 if ledger else 2)
+
+        assert db.get(User, user_id).available_points == earned
+    finally:
+        db.close()
+
+
+def test_transition_rolls_back_when_points_were_already_posted():
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="replay@example.com").id
+        db.commit()
+        service = OrderService(db)
+        order = service.create_order(user_id, Decimal("30.00"))
+        # The ledger already holds this order's earn entry, e.g. from an earlier partial run.
+        service.point_service.earn_points_from_order(user_id, order.id, order.amount)
+
+        with pytest.raises(BusinessException) as exc:
+            service.complete_order(order.id, user_id)
+        assert exc.value.code == ErrorCode.IDEMPOTENCY_CONFLICT[0]
+
+        db.expire_all()
+        order = db.get(Order, order.id)
+        assert (order.status, order.version) == (OrderStatus.PENDING, 1)
+        assert db.get(User, user_id).available_points == 30
+    finally:
+        db.close()
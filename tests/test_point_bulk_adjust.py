@@ -0,0 +1,156 @@
+import tempfile
+
+import httpx
+import pytest
+
+from app.core.job_store import job_store, JobStatus
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.models.admin import AdminUser, AuditLog, Permission, Role, admin_user_roles, role_permissions
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.services.point_bulk_adjust_service import PointBulkAdjustService, run_bulk_adjust_job
+
+
+def _spool(text: str) -> str:
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+        f.write(text)
+    return f.name
+
+
+def test_bulk_adjust_job_applies_rows_once_and_reports_errors():
+    db = SessionLocal()
+    try:
+        rich, poor = (UserRepository(db).create(email=f"bulk{i}@example.com") for i in range(2))
+        rich.available_points = 100
+        db.commit()
+        rich_id, poor_id = rich.id, poor.id
+    finally:
+        db.close()
+
+    csv_data = (
+        "user_id,points,reason\n"
+        f"{rich_id},50,campaign\n"
+        f"{rich_id},-20,\n"
+        f"{poor_id},-5,\n"
+        "999999,10,\n"
+        f"{rich_id},0,\n"
+        "abc,10,\n"
+    )
+
+    for _ in range(2):
+        job = job_store.create("points_bulk_adjust", created_by=1, permission="points.bulk_adjust")
+        run_bulk_adjust_job(job["id"], _spool(csv_data), admin_user_id=1, reason="spring campaign", batch_key="spring")
+
+    job = job_store.get(job["id"])
+    assert job["status"] == JobStatus.COMPLETED
+    assert job["progress"]["total_rows"] == 6
+    assert job["progress"]["applied"] == 0
+    assert job["progress"]["already_applied"] == 2
+    assert job["progress"]["failed"] == 4
+    errors = sorted((e["line"], e["error"]) for e in job["errors"])
+    assert errors[:2] == [(4, "insufficient points"), (5, "user not found")]
+    assert [line for line, _ in errors[2:]] == [6, 7]
+
+    db = SessionLocal()
+    try:
+        assert db.get(User, rich_id).available_points == 130
+        assert db.get(User, poor_id).available_points == 0
+        assert db.query(AuditLog).filter(AuditLog.action == "bulk_adjust").count() == 2
+    finally:
+        db.close()
+
+
+def test_bulk_adjust_rejects_only_overdrawing_debits_in_file_order():
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).create(email="mixed@example.com")
+        user.available_points = 10
+        db.commit()
+        user_id = user.id
+    finally:
+        db.close()
+
+    csv_data = (
+        "user_id,points\n"
+        f"{user_id},-30\n"
+        f"{user_id},5\n"
+        f"{user_id},-15\n"
+        f"{user_id},-20\n"
+        "oops,1\n"
+        f"{user_id},8\n"
+    )
+    job = job_store.create("points_bulk_adjust", created_by=1, permission="points.bulk_adjust")
+    run_bulk_adjust_job(job["id"], _spool(csv_data), admin_user_id=1, reason="mixed", batch_key="mixed")
+
+    job = job_store.get(job["id"])
+    assert job["progress"]["applied"] == 3
+    # The parse error on line 6 is found first; errors are still reported in line order.
+    assert [e["line"] for e in job["errors"]] == [2, 5, 6]
+    assert [e["error"] for e in job["errors"][:2]] == ["insufficient points", "insufficient points"]
+
+    db = SessionLocal()
+    try:
+        # 10 - 30 rejected, + 5, - 15, - 20 rejected, + 8
+        assert db.get(User, user_id).available_points == 8
+    finally:
+        db.close()
+
+
+
+def test_bulk_adjust_failure_is_audited_when_the_job_record_is_gone(monkeypatch):
+    def broken(self, *args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(PointBulkAdjustService, "adjust_stream", broken)
+    path = _spool("user_id,points\n")
+
+    # No job record: it expired or was never stored.
+    run_bulk_adjust_job("missing-job", path, admin_user_id=1, reason="r", batch_key="b")
+
+    db = SessionLocal()
+    try:
+        audit = db.query(AuditLog).filter_by(action="bulk_adjust").one()
+        assert audit.resource_id == "missing-job"
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_reuploading_a_file_without_batch_key_is_a_no_op(app):
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="reupload@example.com").id
+        admin = AdminUser(username="bulk", email="bulk@example.com", password_hash="x")
+        role = Role(name="bulk-role")
+        permission = Permission(resource="points", action="bulk_adjust")
+        db.add_all([admin, role, permission])
+        db.flush()
+        db.execute(role_permissions.insert().values(role_id=role.id, permission_id=permission.id))
+        db.execute(admin_user_roles.insert().values(admin_user_id=admin.id, role_id=role.id))
+        db.commit()
+        token, _ = create_access_token(subject_id=admin.id, role="admin")
+    finally:
+        db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        jobs = []
+        for _ in range(2):
+            resp = await client.post(
+                "/api/v1/admin/points/bulk-adjust",
+                data={"reason": "goodwill"},
+                files={"file": ("adjust.csv", f"user_id,points\n{user_id},40\n".encode())},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            assert resp.status_code == 202
+            jobs.append(job_store.get(resp.json()["id"]))
+
+    assert jobs[0]["params"]["batch_key"] == jobs[1]["params"]["batch_key"]
+    assert [j["progress"]["applied"] for j in jobs] == [1, 0]
+    assert jobs[1]["progress"]["already_applied"] == 1
+    db = SessionLocal()
+    try:
+        assert db.get(User, user_id).available_points == 40
+    finally:
+        db.close()
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from app.db.session import SessionLocal
+from app.models.point_lot import PointLot
+from app.models.point_transaction import PointTransaction, PointTransactionType
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.services.point_expiry_service import PointExpiryService
+from app.services.point_service import PointService
+from app.utils.timezone_utils import utc_now
+
+
+def _user_with_unbacked_balance(points: int) -> int:
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).create(email="expiry@example.com")
+        user.available_points = points
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def test_debits_consume_lots_fifo_and_sweep_expires_the_rest():
+    user_id = _user_with_unbacked_balance(20)
+    now = utc_now()
+
+    db = SessionLocal()
+    try:
+        service = PointService(db)
+        service.adjust_points(user_id, 100, "first", admin_user_id=1)
+        service.adjust_points(user_id, 50, "second", admin_user_id=1)
+        service.adjust_points(user_id, -120, "spend", admin_user_id=1)
+
+        lots = db.query(PointLot).order_by(PointLot.id).all()
+        assert [lot.remaining_points for lot in lots] == [0, 30]
+
+        # The spent lot and the second lot are past due; a third, unexpired lot is added.
+        lots[0].expires_at = now - timedelta(days=2)
+        lots[1].expires_at = now - timedelta(days=1)
+        db.commit()
+        db.add(PointLot(user_id=user_id, transaction_id=lots[1].transaction_id, points=5,
+                        remaining_points=5, expires_at=now + timedelta(days=1)))
+        db.execute(User.__table__.update().where(User.id == user_id).values(available_points=55))
+        db.commit()
+
+        summary = PointExpiryService(db).expire_due(now, batch_size=1)
+        assert (summary.lots_expired, summary.points_expired, summary.users_affected) == (1, 30, 1)
+        assert PointExpiryService(db).expire_due(now).lots_expired == 0
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        assert user.available_points == 25
+        assert user.total_earned_points == 150
+
+        expired = db.query(PointTransaction).filter(
+            PointTransaction.transaction_type == PointTransactionType.EXPIRE
+        ).one()
+        assert (expired.points, expired.balance_after) == (-30, 25)
+        assert [lot.remaining_points for lot in db.query(PointLot).order_by(PointLot.id)] == [0, 0, 5]
+    finally:
+        db.close()
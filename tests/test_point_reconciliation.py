@@ -0,0 +1,56 @@
+import json
+
+from app.db.session import SessionLocal
+from app.jobs import reconcile_points
+from app.models.point_checkpoint import PointBalanceCheckpoint
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.services.point_service import PointService
+
+
+def test_reconciliation_reports_drift_and_advances_checkpoints(tmp_path):
+    db = SessionLocal()
+    try:
+        user_ids = [UserRepository(db).create(email=f"r{i}@example.com").id for i in range(5)]
+        points = PointService(db)
+        for user_id in user_ids:
+            points.adjust_points(user_id, 50, "seed", admin_user_id=1)
+            points.adjust_points(user_id, -20, "spend", admin_user_id=1)
+
+        # Corrupt one denormalized balance behind the ledger's back.
+        tampered = db.get(User, user_ids[2])
+        tampered.available_points += 7
+        db.commit()
+    finally:
+        db.close()
+
+    report = tmp_path / "drift.ndjson"
+    args = ["--workers", "2", "--chunk-size", "2", "--chunks-per-range", "1", "--checkpoint", "--output", str(report)]
+    assert reconcile_points.main(args) == 1
+
+    drift = [json.loads(line) for line in report.read_text().splitlines()]
+    assert drift == [{
+        "user_id": user_ids[2],
+        "available_points": 37,
+        "expected_available_points": 30,
+        "total_earned_points": 50,
+        "expected_total_earned_points": 50,
+        "checkpoint_transaction_id": 0,
+        "transactions_since_checkpoint": 2,
+    }]
+
+    db = SessionLocal()
+    try:
+        checkpoints = {c.user_id: c for c in db.query(PointBalanceCheckpoint).all()}
+        assert set(checkpoints) == set(user_ids) - {user_ids[2]}
+        assert checkpoints[user_ids[0]].available_points == 30
+
+        # Later activity is reconciled as checkpoint + delta.
+        PointService(db).adjust_points(user_ids[0], 5, "bonus", admin_user_id=1)
+        fixed = db.get(User, user_ids[2])
+        fixed.available_points -= 7
+        db.commit()
+    finally:
+        db.close()
+
+    assert reconcile_points.main(args) == 0
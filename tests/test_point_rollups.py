@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+from app.db.session import SessionLocal
+from app.models.point_rollup import PointRollup
+from app.repositories.user_repository import UserRepository
+from app.services.point_rollup_service import PointRollupService
+from app.services.point_service import PointService
+from app.utils.timezone_utils import current_beijing_period
+
+
+def _rollups(db):
+    return sorted(
+        (r.user_id, r.period, r.reason.value, r.points_earned, r.points_spent, r.transaction_count)
+        for r in db.query(PointRollup).all()
+    )
+
+
+def test_rollups_track_writes_and_match_rebuild():
+    db = SessionLocal()
+    try:
+        user_id = UserRepository(db).create(email="rollup@example.com").id
+        db.commit()
+
+        service = PointService(db)
+        service.earn_points_from_order(user_id, order_id=1, amount=Decimal("30"))
+        service.earn_points_from_order(user_id, order_id=2, amount=Decimal("12.5"))
+        service.redeem_points(user_id, 10, "r1")
+        service.adjust_points(user_id, -2, "fix", admin_user_id=1)
+
+        period = current_beijing_period()
+        summary = service.get_summary(user_id, period, period)
+        assert (summary.points_earned, summary.points_spent, summary.net_points) == (42, 12, 30)
+        assert [(r.reason, r.transaction_count) for r in summary.periods[0].reasons] == [
+            ("admin_adjust", 1), ("order_complete", 2), ("points_redeem", 1),
+        ]
+
+        incremental = _rollups(db)
+        db.query(PointRollup).delete()
+        db.commit()
+        PointRollupService(db).rebuild_range(user_id, user_id + 1)
+        assert _rollups(db) == incremental
+    finally:
+        db.close()
@@ -0,0 +1,156 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.error_codes import BusinessException, ErrorCode
+from app.db.session import SessionLocal
+from app.models.point_transaction import PointTransaction
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.services.point_service import PointService
+
+THREADS = 8
+OPS_PER_THREAD = 25
+
+
+def _create_user(points: int = 0) -> int:
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).create(email="concurrent@example.com")
+        user.available_points = points
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def _run_concurrently(fn):
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return [f.result() for f in [pool.submit(fn) for _ in range(THREADS * OPS_PER_THREAD)]]
+
+
+def _adjust(user_id: int, points: int):
+    db = SessionLocal()
+    try:
+        PointService(db).adjust_points(user_id, points, "concurrency test", admin_user_id=1)
+        return True
+    except BusinessException as e:
+        assert e.code == ErrorCode.INSUFFICIENT_POINTS[0]
+        return False
+    finally:
+        db.close()
+
+
+def _load(user_id: int):
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        ledger = db.query(PointTransaction).filter(PointTransaction.user_id == user_id).all()
+        return user, ledger
+    finally:
+        db.close()
+
+
+def test_concurrent_credits_are_not_lost():
+    user_id = _create_user()
+
+    _run_concurrently(lambda: _adjust(user_id, 1))
+
+    user, ledger = _load(user_id)
+    assert user.available_points == THREADS * OPS_PER_THREAD
+    assert user.total_earned_points == THREADS * OPS_PER_THREAD
+    assert len(ledger) == THREADS * OPS_PER_THREAD
+    assert sorted(t.balance_after for t in ledger) == list(range(1, THREADS * OPS_PER_THREAD + 1))
+
+
+def test_concurrent_deductions_never_overdraw():
+    starting_balance = 100
+    user_id = _create_user(points=starting_balance)
+
+    results = _run_concurrently(lambda: _adjust(user_id, -1))
+
+    user, ledger = _load(user_id)
+    assert results.count(True) == starting_balance
+    assert user.available_points == 0
+    assert len(ledger) == starting_balance
+
+
+def test_concurrent_order_credit_is_applied_once():
+    user_id = _create_user()
+
+    def earn():
+        db = SessionLocal()
+        try:
+            return PointService(db).earn_points_from_order(user_id, order_id=42, amount=Decimal("99.90")).id
+        finally:
+            db.close()
+
+    transaction_ids = _run_concurrently(earn)
+
+    user, ledger = _load(user_id)
+    assert len(set(transaction_ids)) == 1
+    assert len(ledger) == 1
+    assert user.available_points == 99
+
+
+def test_uncommitted_post_maps_only_a_recorded_key_to_a_conflict(monkeypatch):
+    user_id = _create_user()
+    db = SessionLocal()
+    try:
+        PointService(db).earn_points_from_order(user_id, order_id=7, amount=Decimal("10"))
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        service = PointService(db)
+        # The key lands between the pre-check and the insert.
+        monkeypatch.setattr(service.point_repo, "get_by_idempotency_key", lambda key: None)
+        with pytest.raises(BusinessException) as exc:
+            service.earn_points_from_order(user_id, order_id=7, amount=Decimal("10"), commit=False)
+        assert exc.value.code == ErrorCode.IDEMPOTENCY_CONFLICT[0]
+        db.rollback()
+
+        def broken_insert(**kwargs):
+            raise IntegrityError("INSERT INTO point_transactions", {}, Exception("NOT NULL constraint failed"))
+
+        monkeypatch.setattr(service.point_repo, "create", broken_insert)
+        with pytest.raises(IntegrityError):
+            service.earn_points_from_order(user_id, order_id=8, amount=Decimal("10"), commit=False)
+        db.rollback()
+    finally:
+        db.close()
+
+    user, ledger = _load(user_id)
+    assert user.available_points == 10 and len(ledger) == 1
+
+
+def test_concurrent_redemptions_with_retries():
+    starting_balance = 100
+    user_id = _create_user(points=starting_balance)
+    counter = itertools.count()
+
+    def redeem():
+        key = f"k{next(counter) // 2}"  # every key is sent twice
+        db = SessionLocal()
+        try:
+            return key, PointService(db).redeem_points(user_id, 1, key).id
+        except BusinessException as e:
+            assert e.code == ErrorCode.INSUFFICIENT_POINTS[0]
+            return key, None
+        finally:
+            db.close()
+
+    results = _run_concurrently(redeem)
+
+    user, ledger = _load(user_id)
+    redeemed = {}
+    for key, transaction_id in results:
+        if transaction_id is not None:
+            assert redeemed.setdefault(key, transaction_id) == transaction_id
+    assert len(redeemed) == starting_balance
+    assert user.available_points == 0
+    assert len(ledger) == starting_balance
@@ -0,0 +1,90 @@
+import logging
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.error_codes import BusinessException, ErrorCode
+from app.db.query_stats import assert_max_queries, query_budget, QueryBudgetExceeded
+from app.db.session import SessionLocal
+from app.middleware.error_handler import error_handler_middleware
+from app.middleware.query_stats import query_stats_middleware
+
+
+def _run_statements(n: int) -> None:
+    db = SessionLocal()
+    try:
+        for _ in range(n):
+            db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+
+
+def test_assert_max_queries_fails_when_budget_exceeded():
+    with assert_max_queries(2) as stats:
+        _run_statements(2)
+    assert stats.count == 2
+
+    with pytest.raises(QueryBudgetExceeded):
+        with assert_max_queries(2):
+            _run_statements(3)
+
+
+@pytest.mark.asyncio
+async def test_route_budget_reported_in_headers_and_enforced():
+    app = FastAPI()
+    app.middleware("http")(query_stats_middleware)
+
+    @app.get("/within", dependencies=[Depends(query_budget(2))])
+    async def within():
+        _run_statements(2)
+        return {}
+
+    @app.get("/over", dependencies=[Depends(query_budget(2))])
+    async def over():
+        _run_statements(3)
+        return {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/within")
+        assert resp.status_code == 200
+        assert resp.headers["X-DB-Query-Count"] == "2"
+        assert float(resp.headers["X-DB-Time-Ms"]) >= 0
+
+        with pytest.raises(QueryBudgetExceeded):
+            await client.get("/over")
+
+
+@pytest.mark.asyncio
+async def test_business_errors_keep_headers_and_warnings_carry_trace_id(caplog):
+    app = FastAPI()
+    app.middleware("http")(query_stats_middleware)
+    app.middleware("http")(error_handler_middleware)
+
+    @app.get("/rejected", dependencies=[Depends(query_budget(5))])
+    async def rejected():
+        _run_statements(1)
+        raise BusinessException(ErrorCode.INSUFFICIENT_POINTS)
+
+    @app.get("/fan-out")
+    async def fan_out(request: Request):
+        _run_statements(settings.DB_N_PLUS_ONE_THRESHOLD)
+        return {"trace_id": request.state.trace_id}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/rejected")
+        assert resp.status_code == 400
+        assert resp.json()["code"] == ErrorCode.INSUFFICIENT_POINTS[0]
+        assert resp.headers["X-DB-Query-Count"] == "1"
+        assert "X-DB-Time-Ms" in resp.headers
+
+        with caplog.at_level(logging.WARNING, logger="app.db.query_stats"):
+            resp = await client.get("/fan-out")
+        trace_id = resp.json()["trace_id"]
+        assert any(
+            r.getMessage().startswith(f"Possible N+1 in GET /fan-out (trace_id={trace_id})") for r in caplog.records
+        )